@@ -0,0 +1,119 @@
+"""Shared fixtures, and the comparison against the stored baseline.
+
+Each benchmark's median time is compared to `baseline.json`. A benchmark that
+is more than `--max-ratio` times slower than its baseline fails.
+`--update-baseline` rewrites the baseline from the current run instead.
+"""
+import json
+import pathlib
+import random
+from typing import List
+
+import pytest
+
+from tordle import check, word_list
+
+LENGTHS = list(range(3, 11))
+SEED = 1234
+
+_DEFAULT_BASELINE = pathlib.Path(__file__).parent.joinpath("baseline.json")
+
+# Maps each benchmark to its median time in seconds, for this run.
+_results = {}
+
+
+def pytest_addoption(parser):
+  group = parser.getgroup("tordle benchmarks")
+  group.addoption(
+      "--baseline",
+      default=str(_DEFAULT_BASELINE),
+      help="The JSON file of baseline median times to compare against.")
+  group.addoption(
+      "--max-ratio",
+      type=float,
+      default=2.0,
+      help="Fail benchmarks that are this many times slower than baseline.")
+  group.addoption(
+      "--update-baseline",
+      action="store_true",
+      help="Write this run's median times to the baseline file.")
+  group.addoption(
+      "--results",
+      default=None,
+      help="Write this run's median times and ratios to this JSON file.")
+
+
+def _load_baseline(config) -> dict:
+  path = pathlib.Path(config.getoption("--baseline"))
+  if not path.is_file():
+    return {}
+  with open(path) as baseline_file:
+    return json.load(baseline_file)
+
+
+def pytest_configure(config):
+  config.tordle_baseline = _load_baseline(config)
+
+
+def _benchmark_name(item) -> str:
+  return f"{item.module.__name__.split('.')[-1]}::{item.name}"
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+  outcome = yield
+  report = outcome.get_result()
+  if call.when != "call" or not report.passed:
+    return
+  fixture = getattr(item, "funcargs", {}).get("benchmark")
+  if fixture is None or fixture.stats is None:
+    return
+  name = _benchmark_name(item)
+  median = fixture.stats.stats.median
+  baseline = item.config.tordle_baseline.get(name)
+  _results[name] = {"median": median, "baseline": baseline, "ratio": None}
+  if baseline is None or item.config.getoption("--update-baseline"):
+    return
+  ratio = median / baseline
+  _results[name]["ratio"] = ratio
+  max_ratio = item.config.getoption("--max-ratio")
+  if ratio > max_ratio:
+    report.outcome = "failed"
+    report.longrepr = (f"{name} regressed: median {median * 1e6:.1f}us vs "
+                       f"baseline {baseline * 1e6:.1f}us "
+                       f"({ratio:.2f}x, limit {max_ratio:.2f}x)")
+
+
+def pytest_sessionfinish(session):
+  config = session.config
+  if config.getoption("--results"):
+    with open(config.getoption("--results"), "w") as results_file:
+      json.dump(_results, results_file, indent=2, sort_keys=True)
+  if config.getoption("--update-baseline") and _results:
+    baseline = dict(config.tordle_baseline)
+    baseline.update({name: r["median"] for name, r in _results.items()})
+    with open(config.getoption("--baseline"), "w") as baseline_file:
+      json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+      baseline_file.write("\n")
+
+
+@pytest.fixture(scope="session")
+def words() -> word_list.WordList:
+  return word_list.WordList()
+
+
+@pytest.fixture
+def rng() -> random.Random:
+  return random.Random(SEED)
+
+
+def sample_words(words: word_list.WordList, length: int, count: int,
+                 rng: random.Random) -> List[str]:
+  """Returns `count` words of `length` that are valid guesses."""
+  encoded = words.get_encoded(length)
+  valid = [
+      words.get_words(length)[i]
+      for i, ok in enumerate(check.valid_word_mask(encoded))
+      if ok
+  ]
+  return [rng.choice(valid) for _ in range(count)]
@@ -0,0 +1,40 @@
+import pytest
+
+from tordle import check, word_list
+
+from .conftest import LENGTHS, sample_words
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_get_hints(benchmark, words, rng, length):
+  guess, target = sample_words(words, length, 2, rng)
+  benchmark(check.get_hints, guess, target, words)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_get_hints_by_id(benchmark, words, rng, length):
+  guess, target = sample_words(words, length, 2, rng)
+  benchmark(check.get_hints_by_id, words.word_id(guess), words.word_id(target),
+            words)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_get_hints_cached(benchmark, rng, length):
+  words = word_list.WordList()
+  words.set_cache_size(1024)
+  guess, target = sample_words(words, length, 2, rng)
+  benchmark(check.get_hints, guess, target, words)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_validate_guess(benchmark, words, rng, length):
+  guess, = sample_words(words, length, 1, rng)
+  benchmark(check.validate_guess, guess, length, words)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_get_pattern_codes_one_guess(benchmark, words, rng, length):
+  guess, = sample_words(words, length, 1, rng)
+  encoded_guess = check.encode_words([guess])
+  encoded = words.get_encoded(length)
+  benchmark(check.get_pattern_codes, encoded_guess, encoded)
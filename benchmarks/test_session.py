@@ -0,0 +1,94 @@
+import pytest
+
+from tordle import session
+
+from .conftest import LENGTHS, sample_words
+
+_TOTAL_GUESSES = 6
+
+
+def _played_session(words, length, rng, num_guesses):
+  target, *guesses = sample_words(words, length, num_guesses + 1, rng)
+  sess = session.Session(
+      target=target, total_guesses=_TOTAL_GUESSES, words=words)
+  for guess in guesses:
+    if sess.status == session.SessionStatus.ACTIVE:
+      sess.guess(guess)
+  return sess
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_guess(benchmark, words, rng, length):
+
+  def setup():
+    sess = _played_session(words, length, rng, 0)
+    guess, = sample_words(words, length, 1, rng)
+    return (sess, guess), {}
+
+  benchmark.pedantic(
+      session.Session.guess, setup=setup, rounds=200, warmup_rounds=5)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_guess_id(benchmark, words, rng, length):
+
+  def setup():
+    sess = _played_session(words, length, rng, 0)
+    guess, = sample_words(words, length, 1, rng)
+    return (sess, words.word_id(guess)), {}
+
+  benchmark.pedantic(
+      session.Session.guess_id, setup=setup, rounds=200, warmup_rounds=5)
+
+
+@pytest.mark.parametrize("boards", [4, 8])
+def test_multi_guess(benchmark, words, rng, boards):
+
+  def setup():
+    targets = words.get_random_words(5, boards)
+    sess = session.MultiSession(
+        targets=targets, total_guesses=boards + 5, words=words)
+    guess, = sample_words(words, 5, 1, rng)
+    return (sess, guess), {}
+
+  benchmark.pedantic(
+      session.MultiSession.guess, setup=setup, rounds=200, warmup_rounds=5)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_guess_tracking_candidates(benchmark, words, rng, length):
+
+  def setup():
+    sess = _played_session(words, length, rng, 0)
+    sess.candidate_indices  # Builds the candidate set.
+    guess, = sample_words(words, length, 1, rng)
+    return (sess, guess), {}
+
+  benchmark.pedantic(
+      session.Session.guess, setup=setup, rounds=200, warmup_rounds=5)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_get_hint_alphabet(benchmark, words, rng, length):
+  sess = _played_session(words, length, rng, _TOTAL_GUESSES - 1)
+  benchmark(sess.get_hint_alphabet)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_remaining_candidate_count(benchmark, words, rng, length):
+
+  def setup():
+    return (_played_session(words, length, rng, 2),), {}
+
+  benchmark.pedantic(
+      session.Session.remaining_candidate_count.fget,
+      setup=setup,
+      rounds=200,
+      warmup_rounds=5)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_find_candidates(benchmark, words, rng, length):
+  sess = _played_session(words, length, rng, 2)
+  benchmark(session.find_candidates, words, length, sess.guess_history,
+            sess.hint_history)
@@ -0,0 +1,40 @@
+import os
+
+from tordle import session
+
+from .conftest import sample_words
+
+# The number of live sessions to host, and the RAM they must fit in.
+_NUM_SESSIONS = int(os.environ.get("TORDLE_BENCH_SESSIONS", 1_000_000))
+_BUDGET_BYTES = 512 * 1024 * 1024
+
+
+def _rss_bytes() -> int:
+  """Returns the current resident set size. Linux only."""
+  with open("/proc/self/statm") as statm:
+    resident_pages = int(statm.read().split()[1])
+  return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def test_million_sessions_fit_in_budget(benchmark, words, rng):
+  targets = sample_words(words, 5, 1000, rng)
+  guesses = sample_words(words, 5, 1000, rng)
+  sessions = []
+
+  def host_sessions():
+    for i in range(_NUM_SESSIONS):
+      sess = session.Session(
+          target=targets[i % len(targets)], total_guesses=6, words=words)
+      sess.guess(guesses[i % len(guesses)])
+      sessions.append(sess)
+
+  # The list of sessions is part of the cost of hosting them.
+  rss_before = _rss_bytes()
+  benchmark.pedantic(host_sessions, rounds=1, iterations=1)
+  used = _rss_bytes() - rss_before
+  benchmark.extra_info["sessions"] = len(sessions)
+  benchmark.extra_info["bytes_per_session"] = used / len(sessions)
+  assert len(sessions) == _NUM_SESSIONS
+  assert used < _BUDGET_BYTES * _NUM_SESSIONS / 1_000_000, (
+      f"{len(sessions)} sessions took {used / 2**20:.0f} MiB, "
+      f"{used / len(sessions):.0f} bytes each")
@@ -0,0 +1,14 @@
+import subprocess
+import sys
+
+
+def _run(*args: str):
+  subprocess.run([sys.executable, *args], check=True, capture_output=True)
+
+
+def test_import_cli(benchmark):
+  benchmark(_run, "-c", "import tordle.tordle")
+
+
+def test_help(benchmark):
+  benchmark(_run, "-m", "tordle.tordle", "--help")
@@ -0,0 +1,61 @@
+import io
+
+import pytest
+from rich import console
+
+from tordle import session, widgets
+
+from .conftest import LENGTHS, sample_words
+
+_TOTAL_GUESSES = 6
+
+
+@pytest.fixture(scope="module")
+def null_console():
+  return console.Console(file=io.StringIO(), width=120)
+
+
+def _played_session(words, length, rng):
+  target, *guesses = sample_words(words, length, _TOTAL_GUESSES, rng)
+  sess = session.Session(
+      target=target, total_guesses=_TOTAL_GUESSES, words=words)
+  for guess in guesses[:_TOTAL_GUESSES - 1]:
+    if sess.status == session.SessionStatus.ACTIVE:
+      sess.guess(guess)
+  return sess
+
+
+def _draw(widget, null_console):
+  return null_console.render_lines(widget.render())
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_guess_table_render(benchmark, words, rng, length):
+  guess_table = widgets.GuessTable(_played_session(words, length, rng))
+  benchmark(guess_table.render)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_guess_table_draw(benchmark, words, rng, null_console, length):
+  guess_table = widgets.GuessTable(_played_session(words, length, rng))
+  benchmark(_draw, guess_table, null_console)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_hint_alphabet_render(benchmark, words, rng, length):
+  alphabet = widgets.HintAlphabet(_played_session(words, length, rng))
+  benchmark(alphabet.render)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_pending_guess_render(benchmark, length):
+  pending = widgets.PendingGuessPanel(length)
+  pending.add_letter("a")
+  benchmark(pending.render)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_root_grid_draw(benchmark, words, rng, null_console, length):
+  root = widgets.RootGrid(
+      _played_session(words, length, rng), show_alphabet=True)
+  benchmark(_draw, root, null_console)
@@ -0,0 +1,50 @@
+import pytest
+
+from tordle import word_list
+
+from .conftest import LENGTHS, sample_words
+
+
+def test_init_default(benchmark):
+  benchmark(word_list.WordList)
+
+
+def test_init_text(benchmark):
+  lines = word_list._load_default_word_list()
+  benchmark(word_list.WordList, lines)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_contains(benchmark, words, rng, length):
+  word, = sample_words(words, length, 1, rng)
+  benchmark(words.__contains__, word)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_contains_missing(benchmark, words, length):
+  benchmark(words.__contains__, "Q" * length)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_get_random_word(benchmark, words, length):
+  benchmark(words.get_random_word, length)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_dawg_has_prefix(benchmark, words, rng, length):
+  word, = sample_words(words, length, 1, rng)
+  dawg = words.get_dawg(length)
+  benchmark(dawg.has_prefix, word[:length - 1], length)
+
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_dawg_match(benchmark, words, rng, length):
+  word, = sample_words(words, length, 1, rng)
+  pattern = "".join(c if i % 2 == 0 else "?" for i, c in enumerate(word))
+  dawg = words.get_dawg(length)
+  benchmark(lambda: list(dawg.match(pattern, exclude="QZ")))
+
+
+def test_build_dawg(benchmark, words):
+  benchmark.pedantic(
+      lambda: word_list.WordList().get_dawg(), rounds=3, iterations=1)
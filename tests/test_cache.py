@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from tordle import cache, check, word_list
+
+
+def test_lru_eviction():
+  lru = cache.LRUCache(2)
+  lru.put("a", 1)
+  lru.put("b", 2)
+  assert lru.get("a") == 1
+  lru.put("c", 3)
+  # "b" was the least recently used.
+  assert lru.get("b") is None
+  assert lru.get("b", "missing") == "missing"
+  assert lru.get("c") == 3
+  assert lru.stats() == cache.CacheStats(
+      hits=2, misses=2, evictions=1, size=2, maxsize=2)
+  assert lru.stats().hit_rate == 0.5
+  lru.clear()
+  assert len(lru) == 0
+
+
+def test_lru_bad_size():
+  with pytest.raises(ValueError):
+    cache.LRUCache(0)
+
+
+def test_lru_threads():
+  lru = cache.LRUCache(64)
+
+  def work(offset):
+    for i in range(2000):
+      key = (offset + i) % 100
+      if lru.get(key) is None:
+        lru.put(key, key)
+
+  threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  stats = lru.stats()
+  assert stats.hits + stats.misses == 8 * 2000
+  assert stats.size == 64
+
+
+def test_word_list_caches():
+  words = word_list.WordList(["ABC", "ABD"])
+  assert words.hint_cache is None
+  words.set_cache_size(16)
+  assert "abc" in words
+  assert "abc" in words
+  assert "xyz" not in words
+  assert "xyz" not in words
+  assert words.lookup_cache.stats()[:2] == (2, 2)
+  hints = check.get_hints("abd", "abc", words)
+  assert check.get_hints("ABD", "ABC", words) is hints
+  assert isinstance(hints, tuple)
+  assert words.hint_cache.stats()[:2] == (1, 1)
+  # Invalid guesses are never cached.
+  with pytest.raises(ValueError):
+    check.get_hints("xyz", "abc", words)
+  with pytest.raises(ValueError):
+    check.get_hints("xyz", "abc", words)
+  words.set_cache_size(0)
+  assert words.lookup_cache is None
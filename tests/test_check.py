@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from tordle import check, word_list
@@ -44,29 +45,152 @@ def test_validate_word_empty():
 
 def test_get_hints_all_hit():
   words = word_list.WordList(["abc"])
-  assert check.get_hints("abc", "abc", words) == [check.HintCategory.HIT] * 3
+  assert check.get_hints("abc", "abc", words) == (check.HintCategory.HIT,) * 3
 
 
 def test_get_hints_all_miss():
   words = word_list.WordList(["abc", "efg"])
-  assert check.get_hints("abc", "efg", words) == [check.HintCategory.MISS] * 3
+  assert check.get_hints("abc", "efg", words) == (check.HintCategory.MISS,) * 3
 
 
 def test_get_hints_all_close():
   words = word_list.WordList(["abc", "bca"])
-  assert check.get_hints("abc", "bca", words) == [check.HintCategory.CLOSE] * 3
+  assert check.get_hints("abc", "bca", words) == (check.HintCategory.CLOSE,) * 3
 
 
 def test_get_hints_duplicate_in_target():
   words = word_list.WordList(["AAAC", "BABA"])
-  assert check.get_hints("AAAC", "BABA", words) == [
+  assert check.get_hints("AAAC", "BABA", words) == (
       check.HintCategory.CLOSE,  # A != B, but there's another A
       check.HintCategory.HIT,  # A == A, hit.
       check.HintCategory.MISS,  # A != B, and the other is "claimed."
       check.HintCategory.MISS,  # C != B, and there's no C.
-  ]
+  )
 
 
 def test_get_hints_ignore_case():
   words = word_list.WordList(["abc", "ABC"])
-  assert check.get_hints("abc", "ABC", words) == [check.HintCategory.HIT] * 3
+  assert check.get_hints("abc", "ABC", words) == (check.HintCategory.HIT,) * 3
+
+
+def test_pattern_round_trip():
+  hints = (check.HintCategory.CLOSE, check.HintCategory.HIT,
+           check.HintCategory.MISS, check.HintCategory.MISS)
+  code = check.hints_to_pattern(hints)
+  assert check.pattern_to_hints(code, len(hints)) == hints
+
+
+def test_all_hit_pattern():
+  assert check.pattern_to_hints(check.all_hit_pattern(3),
+                                3) == (check.HintCategory.HIT,) * 3
+
+
+def test_pattern_dtype():
+  assert check.pattern_dtype(5) == np.uint8
+  assert check.pattern_dtype(6) == np.uint16
+  assert check.pattern_dtype(11) == np.uint32
+
+
+def test_encode_words():
+  encoded = check.encode_words(["abc", "XYZ"])
+  assert encoded.dtype == np.uint8
+  assert encoded.tolist() == [[ord("A"), ord("B"), ord("C")],
+                              [ord("X"), ord("Y"), ord("Z")]]
+
+
+def test_encode_words_bad_len():
+  with pytest.raises(ValueError):
+    check.encode_words(["abc", "ab"])
+
+
+def test_encode_words_no_symb():
+  with pytest.raises(ValueError):
+    check.encode_words(["a$c"])
+
+
+def test_get_pattern_codes_matches_get_hints():
+  all_words = ["AAAC", "BABA", "ABCA", "CCAA", "ACAB", "BBBB"]
+  words = word_list.WordList(all_words)
+  codes = check.get_pattern_codes(all_words, all_words)
+  assert codes.shape == (len(all_words), len(all_words))
+  for i, guess in enumerate(all_words):
+    for j, target in enumerate(all_words):
+      expected = check.get_hints(guess, target, words)
+      assert check.pattern_to_hints(codes[i, j], 4) == expected
+
+
+def test_get_pattern_codes_one_guess():
+  all_words = ["AAAC", "BABA", "ABCA", "CCAA", "ACAB", "BBBB"]
+  words = word_list.WordList(all_words)
+  for guess in all_words:
+    codes = check.get_pattern_codes([guess], all_words)
+    assert codes.shape == (1, len(all_words))
+    for j, target in enumerate(all_words):
+      expected = check.get_hints(guess, target, words)
+      assert check.pattern_to_hints(codes[0, j], 4) == expected
+
+
+def test_get_pattern_codes_bad_len():
+  with pytest.raises(ValueError):
+    check.get_pattern_codes(["abc"], ["abcd"])
+
+
+def test_get_pattern_codes_empty():
+  assert check.get_pattern_codes(["abc"], []).shape == (1, 0)
+
+
+def test_hint_constraints_update():
+  constraints = check.HintConstraints(4)
+  words = word_list.WordList(["AAAC", "BABA"])
+  constraints.update("AAAC", check.get_hints("AAAC", "BABA", words))
+  assert constraints.get_fixed(1) == "A"
+  assert constraints.get_fixed(0) is None
+  assert constraints.is_banned("A", 0)
+  assert not constraints.is_banned("A", 1)
+  assert constraints.get_min_count("A") == 2
+  assert constraints.get_max_count("A") == 2
+  assert constraints.get_max_count("C") == 0
+  assert constraints.get_max_count("B") == 4
+
+
+def test_validate_hard_mode():
+  constraints = check.HintConstraints(4)
+  words = word_list.WordList(["AAAC", "BABA"])
+  constraints.update("AAAC", check.get_hints("AAAC", "BABA", words))
+  check.validate_hard_mode("BABA", constraints)
+  # Moves the hit.
+  with pytest.raises(ValueError):
+    check.validate_hard_mode("ABAB", constraints)
+  # Only has one A.
+  with pytest.raises(ValueError):
+    check.validate_hard_mode("BABB", constraints)
+  # Has too many A's.
+  with pytest.raises(ValueError):
+    check.validate_hard_mode("BAAA", constraints)
+  # Uses the excluded C.
+  with pytest.raises(ValueError):
+    check.validate_hard_mode("DACA", constraints)
+  # Puts the close A where it was already tried.
+  with pytest.raises(ValueError):
+    check.validate_hard_mode("AABB", constraints)
+
+
+def test_resolve_word():
+  words = word_list.WordList(["abc", "a'c"])
+  assert check.resolve_word(" abc ", words) == words.word_id("ABC")
+  assert check.resolve_guess("abc", 3, words) == words.word_id("ABC")
+  with pytest.raises(ValueError):
+    check.resolve_word("a'c", words)
+  with pytest.raises(ValueError):
+    check.resolve_guess("abc", 4, words)
+
+
+def test_get_hints_by_id():
+  words = word_list.WordList(["abc", "bca", "abcd", "a'c"])
+  assert check.get_hints_by_id(
+      words.word_id("abc"), words.word_id("bca"),
+      words) == check.get_hints("abc", "bca", words)
+  with pytest.raises(ValueError):
+    check.get_hints_by_id(words.word_id("abc"), words.word_id("abcd"), words)
+  with pytest.raises(ValueError, match="only contain letters"):
+    check.get_hints_by_id(words.word_id("a'c"), words.word_id("abc"), words)
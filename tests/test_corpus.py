@@ -0,0 +1,60 @@
+import io
+
+from click import testing
+
+from tordle import corpus, tordle
+
+
+def test_iter_words():
+  lines = ["The cat's \"hat\", isn't it?", "  Rock-and-roll  café 42 A"]
+  assert list(corpus.iter_words(lines)) == ["THE", "HAT", "IT", "A"]
+  assert list(corpus.iter_words(lines, min_length=2, max_length=2)) == ["IT"]
+
+
+def test_exact_counts():
+  counter = corpus.FrequencyCounter()
+  counter.update(["THE", "CAT", "THE", "DOG", "THE", "CAT", "AN"])
+  assert counter.exact
+  assert counter.total == 7
+  assert counter.lengths() == [2, 3]
+  assert counter.ranked(3) == [("THE", 3), ("CAT", 2), ("DOG", 1)]
+  assert counter.ranked(4) == []
+
+
+def test_bounded_capacity():
+  counter = corpus.FrequencyCounter(capacity=2)
+  counter.update(["AAA"] * 10 + ["BBB"] * 5 + ["CCC", "DDD", "EEE"])
+  counter.update(["AAA"] * 3 + ["FFF"])
+  assert not counter.exact
+  ranked = counter.ranked(3)
+  assert len(ranked) <= 2
+  assert [w for w, _ in ranked][:2] == ["AAA", "BBB"]
+  # Counts never overestimate.
+  assert dict(ranked)["AAA"] <= 13
+
+
+def test_ranked_words():
+  counter = corpus.FrequencyCounter()
+  counter.update(["THE"] * 3 + ["CAT"] * 2 + ["DOG", "AN", "AN"])
+  assert corpus.get_ranked_words(counter) == {
+      2: ["AN"],
+      3: ["THE", "CAT", "DOG"]
+  }
+  assert corpus.get_ranked_words(
+      counter, min_count=2, top=1) == {
+          2: ["AN"],
+          3: ["THE"]
+      }
+  out = io.StringIO()
+  corpus.write_ranked_words({3: ["THE", "CAT"], 2: ["AN"]}, out)
+  assert out.getvalue() == "AN\nTHE\nCAT\n"
+
+
+def test_build_wordlist_stdin():
+  # Stdin is not always UTF-8. Undecodable bytes drop their word, like any other
+  # non-letter.
+  result = testing.CliRunner().invoke(
+      tordle.main, ["build-wordlist"], input=b"caf\xe9 the cat\n")
+  assert result.exit_code == 0, result.output
+  assert "CAT\nTHE\n" in result.output
+  assert "CAF" not in result.output
@@ -0,0 +1,66 @@
+import itertools
+import random
+
+from tordle import dawg, word_list
+
+
+def test_membership_and_prefix():
+  d = dawg.Dawg(["CAT", "CATS", "DOG", "DOGS", "CAR"])
+  assert len(d) == 5
+  assert "CAT" in d
+  assert "CATS" in d
+  assert "CA" not in d
+  assert "COW" not in d
+  assert d.has_prefix("CA")
+  assert d.has_prefix("")
+  assert not d.has_prefix("CO")
+  assert d.has_prefix("CA", length=4)
+  assert not d.has_prefix("CAR", length=4)
+  assert not d.has_prefix("CATS", length=3)
+
+
+def test_shares_suffixes():
+  d = dawg.Dawg(["CATS", "DOGS", "BATS"])
+  # The trie has 13 nodes. "ATS" is shared, and so is the final "S".
+  assert d.node_count == 7
+
+
+def test_match():
+  d = dawg.Dawg(["SCALE", "SHAME", "STAKE", "SNARE", "SPACE", "SLATE", "SCORE"])
+  assert list(d.match("S?A?E")) == [
+      "SCALE", "SHAME", "SLATE", "SNARE", "SPACE", "STAKE"
+  ]
+  assert list(d.match("S?A?E", include="C")) == ["SCALE", "SPACE"]
+  assert list(d.match("?????", exclude="CM")) == ["SLATE", "SNARE", "STAKE"]
+  assert list(d.match("SC???")) == ["SCALE", "SCORE"]
+  assert list(d.match("?????", include="TK")) == ["STAKE"]
+  assert list(d.match("????")) == []
+
+
+def test_matches_brute_force():
+  rng = random.Random(0)
+  words = {
+      "".join(rng.choice("ABCD")
+              for _ in range(rng.randint(1, 5)))
+      for _ in range(300)
+  }
+  d = dawg.Dawg(words)
+  assert len(d) == len(words)
+  for word in words:
+    assert word in d
+  for pattern in itertools.product("AB?", repeat=4):
+    pattern = "".join(pattern)
+    for include, exclude in [("", ""), ("C", "D"), ("CD", "")]:
+      expected = sorted(
+          w for w in words if len(w) == len(pattern) and all(
+              p in (dawg.WILDCARD, c) for p, c in zip(pattern, w)) and
+          set(include) <= set(w) and not set(exclude) & set(w))
+      assert list(d.match(pattern, include, exclude)) == expected
+
+
+def test_word_list_dawg():
+  words = word_list.WordList(["abc", "abd", "xyzw"])
+  assert "ABC" in words.get_dawg()
+  assert "XYZW" in words.get_dawg()
+  assert "XYZW" not in words.get_dawg(3)
+  assert words.get_dawg(3) is words.get_dawg(3)
@@ -0,0 +1,69 @@
+import pytest
+
+from tordle import difficulty, word_list
+
+_WORDS = ["ABC", "ABD", "ABE", "XYZ", "XBC", "QRS", "AB", "CD"]
+
+
+def test_compute_scores():
+  words = word_list.WordList(_WORDS)
+  scores = difficulty.compute_scores(words, 3)
+  assert sorted(scores["index"]) == list(range(6))
+  assert list(scores["guesses"]) == sorted(scores["guesses"])
+  # The opener is always the easiest target.
+  assert scores[0]["guesses"] == 1
+  assert scores[0]["bucket"] == 1
+  opener = words.get_words(3)[scores[0]["index"]]
+  assert difficulty.get_best_opener(words, 3) == opener
+  for record in scores:
+    target = words.get_words(3)[record["index"]]
+    assert difficulty.count_guesses(words, target, opener) == record["guesses"]
+
+
+def test_write_and_load(tmp_path):
+  words = word_list.WordList(_WORDS)
+  path = tmp_path / "words.twd"
+  difficulty.build_index(path, words=words)
+  index = difficulty.load_index(words, path)
+  assert index.lengths() == [2, 3]
+  expected = difficulty.compute_scores(words, 3)
+  assert index.get_scores(3).tolist() == expected.tolist()
+  bands = [list(index.get_band(3, band)) for band in difficulty.BANDS]
+  assert [len(band) for band in bands] == [2, 2, 2]
+  assert sum(bands, []) == list(expected["index"])
+  hard = [words.get_words(3)[i] for i in bands[-1]]
+  assert sorted(index.get_random_words(3, "hard", 2)) == sorted(hard)
+  assert index.get_random_word(
+      3, "easy") in [words.get_words(3)[i] for i in bands[0]]
+  with pytest.raises(ValueError):
+    index.get_random_words(3, "easy", 3)
+  with pytest.raises(ValueError):
+    index.get_band(3, "impossible")
+  with pytest.raises(ValueError):
+    index.get_band(4, "easy")
+
+
+def test_custom_answers(tmp_path):
+  path = tmp_path / "words.twd"
+  difficulty.build_index(path, words=word_list.WordList(_WORDS))
+  words = word_list.WordList(_WORDS, answers=["XYZ", "QRS"])
+  index = difficulty.load_index(words, path)
+  targets = {
+      words.get_words(3)[i]
+      for band in difficulty.BANDS
+      for i in index.get_band(3, band)
+  }
+  assert targets == {"XYZ", "QRS"}
+
+
+def test_load_errors(tmp_path):
+  words = word_list.WordList(_WORDS)
+  with pytest.raises(FileNotFoundError, match="build-difficulty"):
+    difficulty.load_index(words, tmp_path / "missing.twd")
+  path = tmp_path / "words.twd"
+  difficulty.build_index(path, words=words)
+  with pytest.raises(ValueError, match="does not match"):
+    difficulty.load_index(word_list.WordList(["ABC", "AB", "CD"]), path)
+  path.write_bytes(b"nope" + bytes(4))
+  with pytest.raises(ValueError, match="Not a difficulty index"):
+    difficulty.load_index(words, path)
@@ -0,0 +1,138 @@
+import pytest
+
+from tordle import check, game_log, session, word_list
+
+
+def _play(words, log, target, guesses, give_up=False):
+  sess = session.Session(target=target, total_guesses=3, words=words, log=log)
+  for guess in guesses:
+    sess.guess(guess)
+  if give_up:
+    sess.give_up()
+  return sess
+
+
+def test_round_trip(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "ABD", "XYZ", "AXE"])
+  with game_log.GameLogWriter(path) as log:
+    won = _play(words, log, "ABC", ["XYZ", "ABC"])
+    _play(words, log, "ABD", ["ABC"], give_up=True)
+    _play(words, log, "AXE", ["ABC", "ABD", "XYZ"])
+    _play(words, log, "ABC", ["XYZ"])
+  games = list(game_log.iter_games(path))
+  assert [g.target for g in games] == ["ABC", "ABD", "AXE", "ABC"]
+  assert [g.finished for g in games] == [True, True, True, False]
+  assert [g.won for g in games] == [True, False, False, False]
+  assert [g.gave_up for g in games] == [False, True, False, False]
+  assert games[0].guesses == ["XYZ", "ABC"]
+  assert games[0].patterns == won.pattern_history
+  assert games[0].patterns[-1] == check.all_hit_pattern(3)
+
+
+def test_replay(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "ABD", ["XYZ", "ABC", "ABD"])
+  (game,) = game_log.iter_games(path)
+  sess = game_log.replay(game, words)
+  assert sess.status == session.SessionStatus.VICTORY
+  assert sess.pattern_history == game.patterns
+
+
+def test_many_guesses(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    session.Session(target="ABC", total_guesses=300, words=words, log=log)
+    with pytest.raises(ValueError):
+      log.start_game("ABC", 1 << 32)
+  (game,) = game_log.iter_games(path)
+  assert game.total_guesses == 300
+
+
+def test_evil_logs_final_target(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "ABD", "ABE", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    sess = session.EvilSession(
+        target_length=3, total_guesses=1, words=words, log=log)
+    sess.guess("XYZ")
+  (game,) = game_log.iter_games(path)
+  assert game.evil
+  assert game.target == sess.target
+
+
+def test_appends_and_ignores_partial_record(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "ABC", ["ABC"])
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "XYZ", ["XYZ"])
+  with open(path, "ab") as f:
+    f.write(b"\x20\x00\x01")
+  assert [g.target for g in game_log.iter_games(path)] == ["ABC", "XYZ"]
+
+
+def test_skips_torn_records(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "ABC", ["ABC"])
+  with open(path, "ab") as f:
+    f.write(b"\x20\x00\x01")
+  with game_log.GameLogWriter(path) as log:
+    for target in ["XYZ", "ABC", "XYZ"]:
+      _play(words, log, target, [target])
+  assert [g.target for g in game_log.iter_games(path)
+         ] == ["ABC", "XYZ", "ABC", "XYZ"]
+  # A crash before the magic was written leaves a log that is just as good as
+  # empty.
+  path.write_bytes(b"TG")
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "ABC", ["ABC"])
+  assert [g.target for g in game_log.iter_games(path)] == ["ABC"]
+
+
+def test_resyncs_across_chunks(tmp_path, monkeypatch):
+  monkeypatch.setattr(game_log, "_READ_SIZE", 7)
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "ABC", ["XYZ", "ABC"])
+  data = bytearray(path.read_bytes())
+  # Corrupt the first record of the game without touching its sync marker.
+  data[len(game_log._MAGIC) + game_log._PREFIX.size] ^= 0xff
+  path.write_bytes(bytes(data) + game_log._SYNC)
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "XYZ", ["XYZ"])
+  assert [g.target for g in game_log.iter_games(path)] == ["XYZ"]
+
+
+def test_bad_log(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  path.write_bytes(b"nope")
+  with pytest.raises(ValueError):
+    list(game_log.iter_games(path))
+  with pytest.raises(ValueError):
+    game_log.GameLogWriter(path)
+
+
+def test_stats(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  with game_log.GameLogWriter(path) as log:
+    _play(words, log, "ABC", ["ABC"])
+    _play(words, log, "ABD", ["ABC", "ABD"])
+    _play(words, log, "XYZ", ["ABC", "ABD", "ABC"])
+    _play(words, log, "ABC", ["XYZ", "ABC"])
+  stats = game_log.get_stats(path)
+  assert stats.games == 4
+  assert stats.wins == 3
+  assert stats.max_streak == 2
+  assert stats.current_streak == 1
+  assert stats.distribution == {1: 1, 2: 2}
+  assert stats.hardest_words(1) == [("XYZ", 0.0, 4.0)]
+  assert "max streak 2" in stats.report()
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+
+from tordle import check, letter_index, session, word_list
+
+
+def _brute_force(words, length, guesses, target):
+  return [
+      i for i, word in enumerate(words.get_words(length))
+      if word.isalpha() and all(
+          check.get_hints(g, word, words) == check.get_hints(g, target, words)
+          for g in guesses)
+  ]
+
+
+def test_no_constraints():
+  words = word_list.WordList(["ABC", "ABD", "A'B", "XYZ"])
+  index = letter_index.get_letter_index(words, 3)
+  constraints = check.HintConstraints(3)
+  assert index.count(constraints) == 3
+  assert list(index.indices(constraints)) == [1, 2, 3]
+
+
+def test_all_words():
+  words = word_list.WordList(["AB'", "ABC", "ABD", "XYZ"], answers=["ABC"])
+  index = letter_index.get_letter_index(words, 3)
+  constraints = check.HintConstraints(3)
+  constraints.update("XYZ", check.get_hints("XYZ", "ABC", words))
+  assert list(index.indices(constraints)) == [1]
+  # Words with punctuation cannot be guessed, so they never match.
+  assert list(index.indices(constraints, answers_only=False)) == [1, 2]
+
+
+def test_matches_brute_force():
+  rng = random.Random(0)
+  vocab = sorted(
+      {"".join(rng.choice("ABCDE") for _ in range(4)) for _ in range(400)})
+  words = word_list.WordList(vocab)
+  index = letter_index.get_letter_index(words, 4)
+  for _ in range(200):
+    target = rng.choice(vocab)
+    guesses = rng.sample(vocab, rng.randint(0, 3))
+    constraints = check.HintConstraints(4)
+    for guess in guesses:
+      constraints.update(guess, check.get_hints(guess, target, words))
+    expected = _brute_force(words, 4, guesses, target)
+    assert list(index.indices(constraints)) == expected
+    assert index.count(constraints) == len(expected)
+
+
+def test_more_than_one_block():
+  vocab = [a + b for a in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" for b in "ABCDEFGH"]
+  words = word_list.WordList(vocab)
+  index = letter_index.get_letter_index(words, 2)
+  constraints = check.HintConstraints(2)
+  constraints.update("ZH", check.get_hints("ZH", "ZA", words))
+  assert [words.get_words(2)[i] for i in index.indices(constraints)
+         ] == ["ZA", "ZB", "ZC", "ZD", "ZE", "ZF", "ZG"]
+
+
+def test_popcount():
+  bits = np.array([0, 1, 2**64 - 1], dtype=np.uint64)
+  assert letter_index.popcount(bits) == 65
+
+
+def test_session_count_without_candidates():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  sess = session.Session(target="ABC", total_guesses=3, words=words)
+  sess.guess("ABD")
+  assert sess.remaining_candidate_count == 1
+  assert list(sess.iter_candidates()) == ["ABC"]
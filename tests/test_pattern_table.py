@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from tordle import check, pattern_table, word_list
+
+
+def test_load_builds_table(tmp_path):
+  words = word_list.WordList(["AAAC", "BABA", "ABCA", "ABC"])
+  table = pattern_table.load_pattern_table(words, 4, cache_dir=tmp_path)
+  assert isinstance(table, np.memmap)
+  encoded = words.get_encoded(4)
+  assert np.array_equal(table, check.get_pattern_codes(encoded, encoded))
+
+
+def test_load_without_build(tmp_path):
+  words = word_list.WordList(["ABC"])
+  with pytest.raises(FileNotFoundError):
+    pattern_table.load_pattern_table(words, 3, cache_dir=tmp_path, build=False)
+
+
+def test_build_all_lengths(tmp_path):
+  words = word_list.WordList(["AB", "BA", "ABC"])
+  paths = pattern_table.build_pattern_tables(words, cache_dir=tmp_path)
+  assert set(paths) == {2, 3}
+  assert all(p.is_file() for p in paths.values())
+  table = pattern_table.load_pattern_table(
+      words, 2, cache_dir=tmp_path, build=False)
+  assert table.shape == (2, 2)
+
+
+def test_table_keyed_by_word_list(tmp_path):
+  first = word_list.WordList(["AB", "BA"])
+  second = word_list.WordList(["AB", "CD"])
+  assert (pattern_table.get_table_path(first, 2, tmp_path) !=
+          pattern_table.get_table_path(second, 2, tmp_path))
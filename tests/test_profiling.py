@@ -0,0 +1,88 @@
+import pytest
+
+from tordle import check, profiling, session, word_list
+
+
+@profiling.timed
+def _add(a, b):
+  if a < 0:
+    raise ValueError("negative")
+  return a + b
+
+
+class _Counter():
+
+  @profiling.timed
+  def step(self):
+    return 1
+
+
+@pytest.fixture
+def enabled():
+  profiling.reset()
+  profiling.enable()
+  yield
+  profiling.disable()
+  profiling.reset()
+
+
+def _get_timer(name):
+  return {t.name: t for t in profiling.get_timers()}.get(name)
+
+
+def test_disabled_functions_are_unchanged():
+  assert not profiling.is_enabled()
+  assert not hasattr(_add, "__wrapped__")
+  assert not hasattr(check.get_hints, "__wrapped__")
+  assert _add(1, 2) == 3
+
+
+def test_records_calls_and_errors(enabled):
+  assert _add(1, 2) == 3
+  with pytest.raises(ValueError):
+    _add(-1, 2)
+  _Counter().step()
+  timer = _get_timer("tests.test_profiling._add")
+  assert timer.calls == 2
+  assert timer.errors == 1
+  assert sum(timer.buckets) == 2
+  assert 0 < timer.percentile(50) <= timer.percentile(99) <= timer.max_ns
+  assert _get_timer("tests.test_profiling._Counter.step").calls == 1
+
+
+def test_patches_repo_hot_paths(enabled):
+  words = word_list.WordList(["ABC", "ABD"])
+  check.get_hints("ABC", "ABD", words)
+  assert _get_timer("check.get_hints").calls == 1
+  assert _get_timer("check.validate_guess").calls == 1
+  assert _get_timer("word_list.WordList.word_id").calls == 1
+
+
+def test_times_session_guesses(enabled):
+  words = word_list.WordList(["ABC", "ABD"])
+  sess = session.Session(target="ABD", total_guesses=3, words=words)
+  sess.guess("ABC")
+  sess.guess("ABD")
+  assert sess.status == session.SessionStatus.VICTORY
+  assert _get_timer("check.resolve_guess").calls == 2
+  # The target is checked too.
+  assert _get_timer("check.resolve_word").calls == 3
+  assert _get_timer("check.get_valid_hints").calls == 2
+
+
+def test_disable_restores():
+  profiling.enable()
+  assert hasattr(check.get_hints, "__wrapped__")
+  profiling.disable()
+  assert not hasattr(check.get_hints, "__wrapped__")
+
+
+def test_summary(enabled):
+  _add(1, 2)
+  summary = profiling.format_summary(histograms=True)
+  header, row, histogram = summary.splitlines()
+  assert header.split() == [
+      "function", "calls", "errors", "total", "mean", "p50", "p99", "max"
+  ]
+  assert row.split()[:3] == ["tests.test_profiling._add", "1", "0"]
+  assert histogram.strip().endswith(":1")
@@ -0,0 +1,168 @@
+import asyncio
+import json
+
+from tordle import game_log, loadgen, server, word_list
+
+
+def _run(coro):
+  return asyncio.run(coro)
+
+
+def test_play_game():
+  words = word_list.WordList(["ABC"])
+  game_server = server.GameServer(words)
+
+  async def play():
+    game = await game_server.handle_request({"op": "new", "length": 3})
+    assert game["ok"]
+    assert game["status"] == "ACTIVE"
+    assert "target" not in game
+    reply = await game_server.handle_request({
+        "op": "guess",
+        "game": game["game"],
+        "word": "abc"
+    })
+    assert reply["ok"]
+    assert reply["hints"] == ["HIT", "HIT", "HIT"]
+    assert reply["status"] == "VICTORY"
+    assert reply["target"] == "ABC"
+    assert reply["guesses"] == ["ABC"]
+
+  _run(play())
+
+
+def test_errors():
+  words = word_list.WordList(["ABC", "ABD"])
+  game_server = server.GameServer(words)
+
+  async def play():
+    reply = await game_server.handle_request({"op": "guess", "game": "nope"})
+    assert not reply["ok"]
+    game = await game_server.handle_request({"op": "new", "length": 3})
+    reply = await game_server.handle_request({
+        "op": "guess",
+        "game": game["game"],
+        "word": "XYZ"
+    })
+    assert not reply["ok"]
+    assert "XYZ" in reply["error"]
+    reply = await game_server.handle_request({"op": "new", "length": 9})
+    assert not reply["ok"]
+    reply = await game_server.handle_request({
+        "op": "fly",
+        "game": game["game"]
+    })
+    assert not reply["ok"]
+    reply = await game_server.handle_request({"op": "new", "length": 1e400})
+    assert not reply["ok"]
+
+  _run(play())
+
+
+def test_bad_request_lines(tmp_path):
+  words = word_list.WordList(["ABC", "ABD"])
+  path = str(tmp_path.joinpath("tordle.sock"))
+
+  async def play():
+    game_server = server.GameServer(words)
+    listener = await game_server.start_unix(path)
+    try:
+      async with listener:
+        reader, writer = await asyncio.open_unix_connection(path)
+        replies = []
+        lines = [
+            b"\xff\xfe\n", b"{nope\n", b"[" * 5000 + b"\n",
+            b'{"op": "new", "length": 3}\n'
+        ]
+        for line in lines:
+          writer.write(line)
+          replies.append(json.loads(await reader.readline()))
+        writer.close()
+        return replies
+    finally:
+      game_server.close()
+
+  bad_bytes, bad_json, too_deep, new_game = _run(play())
+  assert not bad_bytes["ok"]
+  assert not bad_json["ok"]
+  assert too_deep == {"ok": False, "error": "Requests must be JSON objects."}
+  assert new_game["ok"]
+
+
+def test_give_up_and_evict():
+  words = word_list.WordList(["ABC", "ABD"])
+  game_server = server.GameServer(words, idle_timeout=10)
+
+  async def play():
+    game = await game_server.handle_request({"op": "new", "length": 3})
+    reply = await game_server.handle_request({
+        "op": "give_up",
+        "game": game["game"]
+    })
+    assert reply["status"] == "DEFEAT"
+    assert reply["target"] in ("ABC", "ABD")
+    assert game_server.evict_idle() == 0
+    assert game_server.evict_idle(now=1e12) == 1
+    assert game_server.game_count == 0
+
+  _run(play())
+
+
+def test_evicted_games_are_logged(tmp_path):
+  path = tmp_path.joinpath("games.log")
+  words = word_list.WordList(["ABC", "ABD"])
+
+  async def play():
+    with game_log.GameLogWriter(path) as log:
+      game_server = server.GameServer(words, idle_timeout=10, log=log)
+      await game_server.handle_request({"op": "new", "length": 3})
+      assert game_server.evict_idle(now=1e12) == 1
+
+  _run(play())
+  (game,) = game_log.iter_games(path)
+  assert game.finished
+  assert game.gave_up
+
+
+def test_load_over_unix_socket(tmp_path):
+  words = word_list.WordList(["ABC", "ABD", "ABE", "XYZ"])
+  path = str(tmp_path.joinpath("tordle.sock"))
+
+  async def play():
+    game_server = server.GameServer(words)
+    listener = await game_server.start_unix(path)
+    try:
+      async with listener:
+        return await loadgen.run_load(
+            connections=20,
+            games_per_connection=3,
+            target_length=3,
+            unix_path=path,
+            words=words)
+    finally:
+      game_server.close()
+
+  report = _run(play())
+  assert report.games == 60
+  assert report.errors == 0
+  assert report.latencies
+  assert report.percentile(50) <= report.percentile(99)
+
+
+def test_daily_game():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  game_server = server.GameServer(words)
+
+  async def play():
+    reply = await game_server.handle_request({
+        "op": "new",
+        "length": 3,
+        "daily": True
+    })
+    reply = await game_server.handle_request({
+        "op": "give_up",
+        "game": reply["game"]
+    })
+    return reply["target"]
+
+  assert _run(play()) == words.get_daily_word(3)
@@ -8,7 +8,7 @@ def test_one_guess_correct():
   sess = session.Session(target="ABCDE", total_guesses=1, words=words)
   assert sess.status == session.SessionStatus.ACTIVE
   hints = sess.guess("ABCDE")
-  assert hints == [check.HintCategory.HIT] * 5
+  assert hints == (check.HintCategory.HIT,) * 5
   assert sess.status == session.SessionStatus.VICTORY
   assert sess.guess_history == ["ABCDE"]
 
@@ -18,7 +18,7 @@ def test_one_guess_all_wrong():
   sess = session.Session(target="ABCDE", total_guesses=1, words=words)
   assert sess.status == session.SessionStatus.ACTIVE
   hints = sess.guess("GHIJK")
-  assert hints == [check.HintCategory.MISS] * 5
+  assert hints == (check.HintCategory.MISS,) * 5
   assert sess.status == session.SessionStatus.DEFEAT
   assert sess.guess_history == ["GHIJK"]
 
@@ -30,25 +30,22 @@ def test_three_guesses():
   assert sess.remaining_guesses == 3
 
   hints = sess.guess("AAA")
-  assert hints == [
-      check.HintCategory.HIT, check.HintCategory.MISS, check.HintCategory.MISS
-  ]
+  assert hints == (check.HintCategory.HIT, check.HintCategory.MISS,
+                   check.HintCategory.MISS)
   assert sess.status == session.SessionStatus.ACTIVE
   assert sess.remaining_guesses == 2
   assert sess.guess_history == ["AAA"]
 
   hints = sess.guess("BBB")
-  assert hints == [
-      check.HintCategory.MISS, check.HintCategory.HIT, check.HintCategory.MISS
-  ]
+  assert hints == (check.HintCategory.MISS, check.HintCategory.HIT,
+                   check.HintCategory.MISS)
   assert sess.status == session.SessionStatus.ACTIVE
   assert sess.remaining_guesses == 1
   assert sess.guess_history == ["AAA", "BBB"]
 
   hints = sess.guess("CCC")
-  assert hints == [
-      check.HintCategory.MISS, check.HintCategory.MISS, check.HintCategory.HIT
-  ]
+  assert hints == (check.HintCategory.MISS, check.HintCategory.MISS,
+                   check.HintCategory.HIT)
   assert sess.status == session.SessionStatus.DEFEAT
   assert sess.remaining_guesses == 0
   assert sess.guess_history == ["AAA", "BBB", "CCC"]
@@ -79,3 +76,206 @@ def test_get_hint_alphabet():
   sess.guess("XXXEEX")
   expected["E"] = check.HintCategory.HIT
   assert sess.get_hint_alphabet() == expected
+
+
+def test_candidates():
+  words = word_list.WordList(["ABC", "ABD", "ABE", "XYZ", "CBA", "AB1"])
+  sess = session.Session(target="ABC", total_guesses=3, words=words)
+  assert sess.remaining_candidate_count == 5
+  sess.guess("ABD")
+  assert sess.remaining_candidate_count == 2
+  assert set(sess.iter_candidates()) == {"ABC", "ABE"}
+  sess.guess("ABE")
+  assert list(sess.iter_candidates()) == ["ABC"]
+
+
+def test_candidates_replay_history():
+  words = word_list.WordList(["ABC", "ABD", "ABE", "XYZ", "CBA"])
+  sess = session.Session(target="ABC", total_guesses=3, words=words)
+  sess.guess("XYZ")
+  sess.guess("ABD")
+  # The candidates are first computed here, from the whole history.
+  assert set(sess.iter_candidates()) == {"ABC", "ABE"}
+
+
+def test_hard_mode():
+  words = word_list.WordList(["ABC", "XAX", "XYZ"])
+  sess = session.Session(
+      target="ABC", total_guesses=3, words=words, hard_mode=True)
+  sess.guess("XAX")
+  # The A was close, so it must be used, and not in the middle.
+  with pytest.raises(ValueError):
+    sess.guess("XYZ")
+  assert sess.guess_history == ["XAX"]
+  assert sess.remaining_guesses == 2
+  sess.guess("ABC")
+  assert sess.status == session.SessionStatus.VICTORY
+
+
+def test_no_hard_mode():
+  words = word_list.WordList(["ABC", "XAX", "XYZ"])
+  sess = session.Session(target="ABC", total_guesses=3, words=words)
+  sess.guess("XAX")
+  sess.guess("XYZ")
+  assert sess.guess_history == ["XAX", "XYZ"]
+
+
+def test_evil_picks_largest_partition():
+  words = word_list.WordList(["ABC", "ABD", "ABE", "XYZ"])
+  sess = session.EvilSession(target_length=3, total_guesses=2, words=words)
+  hints = sess.guess("XYZ")
+  # Three words miss on every letter, only one would be a win.
+  assert hints == (check.HintCategory.MISS,) * 3
+  assert sess.remaining_candidate_count == 3
+  assert sess.target in {"ABC", "ABD", "ABE"}
+  sess.guess("ABC")
+  assert sess.status == session.SessionStatus.DEFEAT
+  assert sess.target in {"ABD", "ABE"}
+
+
+def test_evil_concedes_last_word():
+  words = word_list.WordList(["ABC", "XYZ"])
+  sess = session.EvilSession(target_length=3, total_guesses=3, words=words)
+  sess.guess("ABC")
+  sess.guess(sess.target)
+  assert sess.status == session.SessionStatus.VICTORY
+
+
+def test_evil_no_words():
+  words = word_list.WordList(["ABC"])
+  with pytest.raises(ValueError):
+    session.EvilSession(target_length=4, total_guesses=3, words=words)
+
+
+def test_hint_alphabet_is_read_only():
+  words = word_list.WordList(["ABC", "XYZ"])
+  sess = session.Session(target="ABC", total_guesses=3, words=words)
+  alphabet = sess.get_hint_alphabet()
+  with pytest.raises(TypeError):
+    alphabet["A"] = check.HintCategory.HIT
+  sess.guess("XYZ")
+  # The view follows the session.
+  assert alphabet["X"] == check.HintCategory.MISS
+  assert len(alphabet) == 26
+  assert sorted(alphabet) == sorted(check.VALID_CHARS)
+
+
+def test_letter_counts():
+  words = word_list.WordList(["ABCDEE", "EEEXXX", "XXXXXE"])
+  sess = session.Session(target="ABCDEE", total_guesses=3, words=words)
+  assert sess.get_min_count("E") == 0
+  assert sess.get_exact_count("E") is None
+  sess.guess("XXXXXE")
+  assert sess.get_min_count("E") == 1
+  assert sess.get_exact_count("E") is None
+  assert sess.get_exact_count("X") == 0
+  sess.guess("EEEXXX")
+  assert sess.get_min_count("e") == 2
+  assert sess.get_exact_count("e") == 2
+
+
+def test_compact_history():
+  words = word_list.WordList(["ABC", "XYZ", "CAB"])
+  sess = session.Session(target="ABC", total_guesses=3, words=words)
+  assert not hasattr(sess, "__dict__")
+  sess.guess("XYZ")
+  sess.guess("CAB")
+  assert sess.guess_count == 2
+  assert sess.guess_history == ["XYZ", "CAB"]
+  assert sess.pattern_history == [
+      check.hints_to_pattern([check.HintCategory.MISS] * 3),
+      check.hints_to_pattern([check.HintCategory.CLOSE] * 3),
+  ]
+  assert sess.hint_history == [(check.HintCategory.MISS,) * 3,
+                               (check.HintCategory.CLOSE,) * 3]
+  assert sess.target == "ABC"
+
+
+def test_candidates_are_answers():
+  words = word_list.WordList(["ABC", "ABD", "ABE", "XYZ"],
+                             answers=["ABD", "ABE"])
+  sess = session.Session(target="ABD", total_guesses=3, words=words)
+  sess.guess("XYZ")
+  assert list(sess.iter_candidates()) == ["ABD", "ABE"]
+  sess.guess("ABC")
+  assert sess.remaining_candidate_count == 2
+
+
+def test_guess_id():
+  words = word_list.WordList(["ABC", "ABD", "XYZW", "A'C"])
+  sess = session.Session(
+      target="ABC", total_guesses=2, words=words, hard_mode=True)
+  assert sess.target_id == words.word_id("ABC")
+  hints = sess.guess_id(words.word_id("ABD"))
+  assert hints == check.get_hints("ABD", "ABC", words)
+  with pytest.raises(ValueError):
+    sess.guess_id(words.word_id("XYZW"))
+  # Words with punctuation have IDs, but cannot be guessed.
+  with pytest.raises(ValueError, match="only contain letters"):
+    sess.guess_id(words.word_id("A'C"))
+  multi = session.MultiSession(["ABC", "ABD"], total_guesses=2, words=words)
+  with pytest.raises(ValueError, match="only contain letters"):
+    multi.guess_id(words.word_id("A'C"))
+  assert multi.guess_count == 0
+  sess.guess_id(sess.target_id)
+  assert sess.status == session.SessionStatus.VICTORY
+  assert sess.guess_history == ["ABD", "ABC"]
+
+
+def test_multi_session():
+  words = word_list.WordList(["ABC", "ABD", "XYZ", "XYW"])
+  sess = session.MultiSession(
+      targets=["ABC", "XYZ"], total_guesses=3, words=words)
+  assert sess.targets == ["ABC", "XYZ"]
+  hints = sess.guess("abc")
+  assert hints == [(check.HintCategory.HIT,) * 3,
+                   (check.HintCategory.MISS,) * 3]
+  assert sess.boards[0].status == session.SessionStatus.VICTORY
+  assert sess.status == session.SessionStatus.ACTIVE
+  # Solved boards take no more guesses.
+  hints = sess.guess("XYW")
+  assert hints[0] is None
+  assert hints[1] == check.get_hints("XYW", "XYZ", words)
+  assert sess.boards[0].guess_history == ["ABC"]
+  assert sess.boards[1].guess_history == ["ABC", "XYW"]
+  assert sess.get_hint_alphabet()["W"] == check.HintCategory.MISS
+  assert sess.get_hint_alphabet()["X"] == check.HintCategory.HIT
+  sess.guess("XYZ")
+  assert sess.status == session.SessionStatus.VICTORY
+  assert sess.guess_count == 3
+  with pytest.raises(ValueError):
+    sess.guess("ABD")
+
+
+def test_multi_session_defeat():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  sess = session.MultiSession(
+      targets=["ABC", "XYZ"], total_guesses=1, words=words)
+  with pytest.raises(ValueError):
+    sess.guess("AB")
+  sess.guess("ABC")
+  assert sess.status == session.SessionStatus.DEFEAT
+  assert sess.boards[1].status == session.SessionStatus.DEFEAT
+
+
+def test_multi_session_give_up():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  sess = session.MultiSession(
+      targets=["ABC", "XYZ"], total_guesses=3, words=words)
+  sess.guess("ABC")
+  sess.give_up()
+  assert sess.status == session.SessionStatus.DEFEAT
+  assert [b.status for b in sess.boards
+         ] == [session.SessionStatus.VICTORY, session.SessionStatus.DEFEAT]
+
+
+def test_multi_session_hard_mode():
+  words = word_list.WordList(["ABC", "ABD", "XYZ", "AXE"])
+  sess = session.MultiSession(
+      targets=["ABD", "XYZ"], total_guesses=4, words=words, hard_mode=True)
+  sess.guess("ABC")
+  # Board 0 requires "AB" in place, so the guess changes no board.
+  with pytest.raises(ValueError):
+    sess.guess("XYZ")
+  assert sess.guess_count == 1
+  assert [b.guess_count for b in sess.boards] == [1, 1]
@@ -0,0 +1,69 @@
+import io
+import json
+import random
+
+from tordle import simulate, word_list
+
+
+def test_play_game():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  result = simulate.play_game(
+      words,
+      "ABC",
+      total_guesses=3,
+      strategy=simulate.RandomStrategy(),
+      rng=random.Random(0))
+  assert result.won
+  assert result.guesses[-1] == "ABC"
+  assert result.target_length == 3
+
+
+def test_run_simulation_is_deterministic():
+  config = simulate.GameConfig(target_length=4, total_guesses=6)
+  first = [
+      r for chunk in simulate.run_simulation(10, config, seed=1, chunk_size=3)
+      for r in chunk
+  ]
+  second = [
+      r for chunk in simulate.run_simulation(10, config, seed=1, chunk_size=4)
+      for r in chunk
+  ]
+  assert [r.game for r in first] == list(range(10))
+  assert first == second
+
+
+def test_run_simulation_parallel():
+  config = simulate.GameConfig(target_length=4, total_guesses=6)
+  serial = [r for c in simulate.run_simulation(6, config) for r in c]
+  parallel = [
+      r for c in simulate.run_simulation(6, config, processes=2, chunk_size=2)
+      for r in c
+  ]
+  assert serial == parallel
+
+
+def test_summary():
+  summary = simulate.SimulationSummary()
+  summary.add(simulate.GameResult(0, 3, 6, "ABC", True, ["XYZ", "ABC"]))
+  summary.add(simulate.GameResult(1, 3, 6, "ABC", True, ["XYZ", "ABC"]))
+  summary.add(simulate.GameResult(2, 3, 6, "ABC", False, ["XYZ"] * 6))
+  assert summary.total_games == 3
+  assert summary.win_rate(3, 6) == 2 / 3
+  assert summary.histogram(3, 6) == {2: 2}
+  assert "3 games" in summary.report()
+
+
+def test_write_formats():
+  results = [
+      simulate.GameResult(0, 3, 6, "ABC", True, ["ABC"]),
+      simulate.GameResult(1, 3, 6, "XYZ", False, ["ABC"]),
+  ]
+  out = io.StringIO()
+  simulate.write_jsonl(results, out)
+  lines = out.getvalue().splitlines()
+  assert [json.loads(l)["target"] for l in lines] == ["ABC", "XYZ"]
+  out = io.StringIO()
+  simulate.write_columnar(results, out)
+  columns = json.loads(out.getvalue())
+  assert columns["won"] == [True, False]
+  assert columns["guess_count"] == [1, 1]
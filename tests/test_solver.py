@@ -0,0 +1,108 @@
+import collections
+import math
+
+import numpy as np
+import pytest
+
+from tordle import check, pattern_table, session, solver, word_list
+
+_WORDS = ["ABC", "ABD", "ABE", "AXY", "XBC", "XYZ", "CAB", "BCA"]
+
+
+def _brute_force_scores(guesses, candidates):
+  entropies = []
+  expected_sizes = []
+  for guess in guesses:
+    counts = collections.Counter(
+        check.hints_to_pattern(
+            check.get_hints(guess, c, word_list.WordList(_WORDS)))
+        for c in candidates)
+    total = len(candidates)
+    entropies.append(-sum(n / total * math.log2(n / total)
+                          for n in counts.values()))
+    expected_sizes.append(sum(n * n for n in counts.values()) / total)
+  return entropies, expected_sizes
+
+
+def test_score_guesses():
+  encoded = check.encode_words(_WORDS)
+  entropies, expected_sizes = _brute_force_scores(_WORDS, _WORDS)
+  assert np.allclose(solver.score_guesses(encoded, encoded), entropies)
+  assert np.allclose(
+      solver.score_guesses(
+          encoded, encoded, metric=solver.Metric.EXPECTED_SIZE), expected_sizes)
+
+
+def test_score_guesses_parallel():
+  encoded = check.encode_words(_WORDS)
+  expected = solver.score_guesses(encoded, encoded)
+  actual = solver.score_guesses(encoded, encoded, processes=2)
+  assert np.allclose(actual, expected)
+
+
+def test_score_guesses_from_table(tmp_path):
+  words = word_list.WordList(_WORDS)
+  table = pattern_table.load_pattern_table(words, 3, cache_dir=tmp_path)
+  encoded = words.get_encoded(3)
+  guesses = np.arange(len(encoded))
+  candidates = np.array([0, 2, 5])
+  expected = solver.score_guesses(encoded, encoded[candidates])
+  assert np.allclose(
+      solver.score_guesses(guesses, candidates, table=table), expected)
+  assert np.allclose(
+      solver.score_guesses(guesses, candidates, processes=2, table=table),
+      expected)
+
+
+def test_best_guess_uses_cached_table(tmp_path, monkeypatch):
+  words = word_list.WordList(_WORDS)
+  sess = session.Session(target="ABC", total_guesses=6, words=words)
+  expected = solver.best_guess(sess)
+  monkeypatch.setenv("TORDLE_CACHE_DIR", str(tmp_path))
+  pattern_table.build_pattern_tables(words)
+
+  def fail(*args):
+    raise AssertionError("Patterns should come from the table.")
+
+  monkeypatch.setattr(check, "get_pattern_codes", fail)
+  assert solver.best_guess(sess) == expected
+
+
+def test_best_guess():
+  words = word_list.WordList(_WORDS)
+  sess = session.Session(target="ABC", total_guesses=6, words=words)
+  encoded = check.encode_words(_WORDS)
+  scores = solver.score_guesses(encoded, encoded)
+  best = solver.best_guess(sess)
+  assert scores[_WORDS.index(best)] == scores.max()
+
+
+def test_best_guess_few_candidates():
+  words = word_list.WordList(_WORDS)
+  sess = session.Session(target="ABC", total_guesses=6, words=words)
+  sess.guess("ABD")
+  # Only ABC and ABE are left, so one of them is the best guess.
+  assert solver.best_guess(sess) in {"ABC", "ABE"}
+
+
+def test_hard_mode_guesses_beyond_answers():
+  words = word_list.WordList(["BAT", "BCH", "CAT", "HAT", "MAT"],
+                             answers=["BAT", "CAT", "HAT", "MAT"])
+  sess = session.Session(
+      target="BAT", total_guesses=6, words=words, hard_mode=True)
+  # Only BCH tells the four answers apart, and hard mode allows it.
+  assert solver.best_guess(sess) == "BCH"
+
+
+def test_best_guess_from_history():
+  words = word_list.WordList(_WORDS)
+  hints = check.get_hints("XYZ", "ABC", words)
+  guess = solver.best_guess_from_history(["XYZ"], [hints], words, 3)
+  assert guess in _WORDS
+
+
+def test_best_guess_no_candidates():
+  words = word_list.WordList(_WORDS)
+  hints = [check.HintCategory.HIT] * 3
+  with pytest.raises(ValueError):
+    solver.best_guess_from_history(["XYZ", "ABC"], [hints, hints], words, 3)
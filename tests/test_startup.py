@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+from tordle import difficulty, simulate, tordle
+
+# The most time importing the CLI may take, in microseconds. It takes ~45ms,
+# mostly in click, so this leaves room for slow machines.
+_IMPORT_BUDGET_US = 150000
+
+# Modules the CLI must not import until a command needs them.
+_HEAVY_MODULES = ("asyncio", "numpy", "rich", "textual")
+
+
+def _run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+  return subprocess.run([sys.executable, *args, "-c", code],
+                        capture_output=True,
+                        text=True,
+                        check=True)
+
+
+def _get_imported(code: str) -> set:
+  """Returns the top-level packages imported by running `code`."""
+  code += "\nimport sys\nprint(' '.join(sys.modules))"
+  return {m.split(".")[0] for m in _run_python(code).stdout.split()}
+
+
+def test_import_budget():
+  stderr = _run_python("import tordle.tordle", "-X", "importtime").stderr
+  # Lines look like "import time: self [us] | cumulative | module".
+  cumulative = {
+      fields[2].strip(): int(fields[1])
+      for fields in (line.split("|") for line in stderr.splitlines())
+      if len(fields) == 3 and fields[1].strip().isdigit()
+  }
+  assert cumulative["tordle.tordle"] < _IMPORT_BUDGET_US
+
+
+def test_help_is_lightweight():
+  imported = _get_imported("from tordle import tordle\n"
+                           "tordle.main(['--help'], standalone_mode=False)")
+  assert imported.isdisjoint(_HEAVY_MODULES)
+
+
+def test_headless_commands_skip_the_ui():
+  imported = _get_imported(
+      "from tordle import tordle\n"
+      "tordle.main(['simulate', '-n', '1', '-l', '3'], standalone_mode=False)")
+  assert "numpy" in imported
+  assert imported.isdisjoint({"rich", "textual"})
+  imported = _get_imported("from tordle import check, word_list\n"
+                           "check.validate_word('ABC', word_list.WordList())")
+  assert imported.isdisjoint({"rich", "textual"})
+
+
+def test_choices_match():
+  assert tordle._STRATEGIES == tuple(sorted(simulate.STRATEGIES))
+  assert tordle._BANDS == difficulty.BANDS
@@ -0,0 +1,49 @@
+from tordle import session, widgets, word_list
+
+
+def _get_session():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  return session.Session(target="ABC", total_guesses=3, words=words)
+
+
+def test_guess_table_caches_until_guess():
+  sess = _get_session()
+  guess_table = widgets.GuessTable(sess)
+  alphabet = widgets.HintAlphabet(sess)
+  table_before = guess_table.render()
+  alphabet_before = alphabet.render()
+  assert guess_table.render() is table_before
+  assert alphabet.render() is alphabet_before
+  sess.guess("ABD")
+  table_after = guess_table.render()
+  alphabet_after = alphabet.render()
+  assert table_after is not table_before
+  assert alphabet_after is not alphabet_before
+  assert guess_table.render() is table_after
+  assert alphabet.render() is alphabet_after
+
+
+def test_multi_alphabet_rebuilds_on_give_up():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  sess = session.MultiSession(
+      targets=["ABC", "XYZ"], total_guesses=3, words=words)
+  alphabet = widgets.HintAlphabet(sess)
+  sess.guess("ABC")
+  active = alphabet.render()
+  assert alphabet.render() is active
+  # Once the game is over, the alphabet covers the solved board again.
+  sess.give_up()
+  assert alphabet.render() is not active
+
+
+def test_pending_guess_rebuilds_on_change():
+  sess = _get_session()
+  panel = widgets.PendingGuessPanel(sess.target_length, sess.words)
+  empty = panel.render()
+  assert panel.render() is empty
+  panel.add_letter("a")
+  typed = panel.render()
+  assert typed is not empty
+  assert panel.render() is typed
+  panel.remove_letter()
+  assert panel.render() is not typed
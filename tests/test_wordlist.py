@@ -1,5 +1,8 @@
+import datetime
 import string
 
+import pytest
+
 from tordle import word_list
 
 
@@ -42,3 +45,189 @@ def test_not_in():
   words = word_list.WordList(expected)
   assert "B" not in words
   assert "EE" not in words
+
+
+def test_get_words():
+  words = word_list.WordList(["b", "a", "cc"])
+  assert words.lengths() == [1, 2]
+  assert list(words.get_words(1)) == ["A", "B"]
+  assert list(words.get_words(3)) == []
+
+
+def test_get_encoded():
+  words = word_list.WordList(["ab", "ba"])
+  assert words.get_encoded(2).tolist() == [[ord("A"), ord("B")],
+                                           [ord("B"), ord("A")]]
+
+
+def test_fingerprint():
+  assert (word_list.WordList(["a", "b"]).fingerprint() == word_list.WordList(
+      ["B", "A"]).fingerprint())
+  assert (word_list.WordList(["a"]).fingerprint() != word_list.WordList(
+      ["b"]).fingerprint())
+
+
+def test_compiled_round_trip(tmp_path):
+  path = tmp_path.joinpath("words.twl")
+  word_list.compile_word_list(["b", "a", "cc", "ddd", "aaa"], path)
+  words = word_list.WordList.from_compiled(path)
+  assert len(words) == 5
+  assert words.lengths() == [1, 2, 3]
+  assert list(words.get_words(3)) == ["AAA", "DDD"]
+  assert words.get_words(3)[-1] == "DDD"
+  assert words.get_words(3)[0:1] == ["AAA"]
+  assert "cc" in words
+  assert "ccc" not in words
+  assert words.get_random_word(2) == "CC"
+  assert words.get_random_word(4) is None
+  assert words.get_encoded(1).tolist() == [[ord("A")], [ord("B")]]
+
+
+def test_compiled_matches_text():
+  path = word_list._DEFAULT_COMPILED_WORD_LIST
+  expected = word_list.WordList(word_list._load_default_word_list())
+  actual = word_list.WordList.from_compiled(path)
+  assert len(actual) == len(expected)
+  assert actual.fingerprint() == expected.fingerprint()
+
+
+def test_compiled_bad_file(tmp_path):
+  path = tmp_path.joinpath("words.twl")
+  path.write_bytes(b"not a word list")
+  with pytest.raises(ValueError):
+    word_list.WordList.from_compiled(path)
+
+
+def test_random_word_after_missing_lookup():
+  words = word_list.WordList(["A"])
+  assert "BB" not in words
+  assert words.get_random_word(2) is None
+
+
+def test_daily_word():
+  words = word_list.WordList(["ABC", "ABD", "A'B", "XYZ", "QQ"])
+  start = datetime.date(2024, 3, 1)
+  days = [
+      words.get_daily_word(3, start + datetime.timedelta(days=d))
+      for d in range(6)
+  ]
+  # Every word comes up once before any repeats, and words with punctuation
+  # never do.
+  assert sorted(days[:3]) == ["ABC", "ABD", "XYZ"]
+  assert days[3:] == days[:3]
+  assert words.get_daily_word(4) is None
+
+
+def test_daily_order_is_stable():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  more_words = word_list.WordList(["ABC", "ABD", "XYZ", "ABE", "QRS"])
+  order = [words.get_words(3)[i] for i in words.get_daily_order(3)]
+  more_order = [
+      more_words.get_words(3)[i]
+      for i in more_words.get_daily_order(3)
+      if more_words.get_words(3)[i] in order
+  ]
+  assert order == more_order
+
+
+def test_seeded_word():
+  words = word_list.WordList(["ABC", "ABD", "XYZ"])
+  assert words.get_seeded_word(3, "x") == words.get_seeded_word(3, "x")
+  assert {words.get_seeded_word(3, str(i)) for i in range(50)
+         } == {"ABC", "ABD", "XYZ"}
+
+
+def test_compiled_daily_order(tmp_path):
+  path = tmp_path.joinpath("words.twl")
+  text = word_list.WordList(["abcd", "efgh", "ij'k", "lmno", "x", "yz"])
+  word_list.compile_word_list(["abcd", "efgh", "ij'k", "lmno", "x", "yz"], path)
+  compiled = word_list.WordList.from_compiled(path)
+  for length in (1, 2, 4):
+    assert (compiled.get_daily_order(length).tolist() == text.get_daily_order(
+        length).tolist())
+  assert (compiled.get_daily_word(4, datetime.date(
+      2030, 1, 1)) == text.get_daily_word(4, datetime.date(2030, 1, 1)))
+
+
+def test_compiled_v1(tmp_path):
+  path = tmp_path.joinpath("words.twl")
+  records = b"ABDABE"
+  index = word_list._COMPILED_INDEX_ENTRY_V1.pack(
+      3, 2,
+      word_list._COMPILED_HEADER.size + word_list._COMPILED_INDEX_ENTRY_V1.size)
+  path.write_bytes(
+      word_list._COMPILED_HEADER.pack(b"TWL1", 1, 2) + index + records)
+  words = word_list.WordList.from_compiled(path)
+  assert list(words.get_words(3)) == ["ABD", "ABE"]
+  assert sorted(words.get_daily_order(3).tolist()) == [0, 1]
+
+
+def test_answers():
+  words = word_list.WordList(["ABC", "ABD", "XYZ", "QQ"], answers=["abd", ""])
+  assert "ABC" in words
+  assert not words.is_answer("ABC")
+  assert words.is_answer("abd")
+  assert not words.is_answer("NOPE")
+  assert words.get_answer_indices(3).tolist() == [1]
+  assert words.get_answer_indices(2).tolist() == []
+  assert words.get_random_word(3) == "ABD"
+  assert words.get_random_word(2) is None
+  assert words.get_daily_word(3) == "ABD"
+
+
+def test_default_answers():
+  words = word_list.WordList(["ABC", "A'B"])
+  assert words.is_answer("ABC")
+  assert not words.is_answer("A'B")
+  assert words.get_answer_indices(3).tolist() == [1]
+
+
+def test_unknown_answer():
+  with pytest.raises(ValueError):
+    word_list.WordList(["ABC"], answers=["XYZ"])
+
+
+def test_compiled_answers(tmp_path):
+  path = tmp_path.joinpath("words.twl")
+  word_list.compile_word_list(["abc", "abd", "xyz", "qq"],
+                              path,
+                              answers=["xyz", "abd"])
+  words = word_list.WordList.from_compiled(path)
+  assert words.get_answer_indices(3).tolist() == [1, 2]
+  assert words.get_answer_indices(2).tolist() == []
+  assert "ABC" in words
+  assert not words.is_answer("ABC")
+
+
+def test_word_ids(tmp_path):
+  path = tmp_path.joinpath("words.twl")
+  word_list.compile_word_list(["b", "a", "cc", "ddd", "aaa"], path)
+  for words in [
+      word_list.WordList(["b", "a", "cc", "ddd", "aaa"]),
+      word_list.WordList.from_compiled(path)
+  ]:
+    assert [words.word_id(w) for w in ["a", "b", "cc", "aaa", "DDD"]
+           ] == [0, 1, 2, 3, 4]
+    assert words.word_id("zz") is None
+    assert words.word_from_id(3) == "AAA"
+    assert words.split_id(4) == (3, 1)
+    assert words.get_id_offset(3) == 3
+    assert words.get_encoded_word(2).tolist() == [ord("C"), ord("C")]
+    with pytest.raises(ValueError):
+      words.word_from_id(5)
+    with pytest.raises(ValueError):
+      words.get_id_offset(4)
+
+
+def test_multiple_targets():
+  words = word_list.WordList(["ABC", "ABD", "XYZ", "A'B"])
+  for targets in [
+      words.get_random_words(3, 3),
+      words.get_daily_words(3, 3, datetime.date(2022, 3, 1)),
+      words.get_seeded_words(3, 3, "seed"),
+  ]:
+    assert sorted(targets) == ["ABC", "ABD", "XYZ"]
+  assert (words.get_daily_words(3, 2, datetime.date(2022, 3, 1)) !=
+          words.get_daily_words(3, 2, datetime.date(2022, 3, 2)))
+  with pytest.raises(ValueError):
+    words.get_random_words(3, 4)
@@ -0,0 +1,75 @@
+"""A bounded, thread-safe LRU cache with hit, miss and eviction counters.
+
+One cache can be shared by every game of a threaded or asyncio server. Values
+are handed out as they were stored, so they should be immutable (tuples,
+ints, strings).
+"""
+import collections
+import threading
+from typing import Any, Hashable, NamedTuple
+
+
+class CacheStats(NamedTuple):
+  hits: int
+  misses: int
+  evictions: int
+  size: int
+  maxsize: int
+
+  @property
+  def hit_rate(self) -> float:
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache():
+  """Keeps the `maxsize` most recently used entries."""
+
+  def __init__(self, maxsize: int):
+    if maxsize <= 0:
+      raise ValueError(f"Expected a positive maxsize. Got: {maxsize}")
+    self._maxsize = maxsize
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
+
+  def __len__(self):
+    return len(self._entries)
+
+  @property
+  def maxsize(self) -> int:
+    return self._maxsize
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    """Returns the value of `key` and marks it as recently used, or returns
+    `default` if it is not cached."""
+    with self._lock:
+      try:
+        value = self._entries[key]
+      except KeyError:
+        self._misses += 1
+        return default
+      self._entries.move_to_end(key)
+      self._hits += 1
+      return value
+
+  def put(self, key: Hashable, value: Any):
+    """Caches `value`, evicting the least recently used entry if full."""
+    with self._lock:
+      self._entries[key] = value
+      self._entries.move_to_end(key)
+      if len(self._entries) > self._maxsize:
+        self._entries.popitem(last=False)
+        self._evictions += 1
+
+  def clear(self):
+    """Drops every entry. The counters are kept."""
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self) -> CacheStats:
+    with self._lock:
+      return CacheStats(self._hits, self._misses, self._evictions,
+                        len(self._entries), self._maxsize)
@@ -1,8 +1,10 @@
 import enum
 import string
-from typing import List
+from typing import Iterable, Optional, Tuple, Union
 
-from . import util, word_list
+import numpy as np
+
+from . import profiling, util, word_list
 
 
 class HintCategory(enum.Enum):
@@ -11,12 +13,60 @@ class HintCategory(enum.Enum):
   HIT = 3
 
 
-def get_hints(guess: str, target: str,
-              words: word_list.WordList) -> List[HintCategory]:
-  """Returns hint results for a guess."""
+# The hint for each letter of a guess. Immutable, so it can be cached.
+Hints = Tuple[HintCategory, ...]
+
+
+@profiling.timed
+def get_hints(guess: str, target: str, words: word_list.WordList) -> Hints:
+  """Returns hint results for a guess.
+
+  With `words.hint_cache` on, a cached result skips validation too, since
+  only valid guesses are cached."""
   guess = util.clean_text(guess)
   target = util.clean_text(target)
+  hint_cache = words.hint_cache
+  if hint_cache is not None:
+    hints = hint_cache.get((guess, target))
+    if hints is not None:
+      return hints
   validate_guess(guess, len(target), words)
+  hints = score(guess, target)
+  if hint_cache is not None:
+    hint_cache.put((guess, target), hints)
+  return hints
+
+
+@profiling.timed
+def get_hints_by_id(guess_id: int, target_id: int,
+                    words: word_list.WordList) -> Hints:
+  """Returns hint results for words given by `WordList.word_id`.
+
+  IDs come from words that were already cleaned and looked up, so only the
+  length and letters of the guess are checked."""
+  target = words.word_from_id(target_id)
+  guess = get_guess_from_id(guess_id, len(target), words)
+  return get_valid_hints(guess, target, words)
+
+
+@profiling.timed
+def get_valid_hints(guess: str, target: str,
+                    words: word_list.WordList) -> Hints:
+  """Returns hint results for a guess that was already cleaned and validated,
+  through `words.hint_cache` if it is on."""
+  hint_cache = words.hint_cache
+  if hint_cache is None:
+    return score(guess, target)
+  hints = hint_cache.get((guess, target))
+  if hints is None:
+    hints = score(guess, target)
+    hint_cache.put((guess, target), hints)
+  return hints
+
+
+def score(guess: str, target: str) -> Hints:
+  """Returns hint results for a clean guess and target of the same length,
+  without validating either."""
   hints = [None for _ in guess]
   # Do hits first.
   for i, (guess_c, target_c) in enumerate(zip(guess, target)):
@@ -34,7 +84,178 @@ def get_hints(guess: str, target: str,
   for i, h in enumerate(hints):
     if h is None:
       hints[i] = HintCategory.MISS
-  return hints
+  return tuple(hints)
+
+
+# Each hint is stored as one base-3 digit of a pattern code. The digit for
+# position `i` has weight 3**i.
+_PATTERN_BASE = 3
+
+# Upper bound on the number of (guess, target, position) cells processed at once
+# by `get_pattern_codes`. Keeps the temporaries to a few tens of megabytes.
+_PATTERN_BLOCK_CELLS = 1 << 22
+
+# Up to this many targets, one guess is scored by `_fill_one_guess`, which has
+# a lower fixed cost but scales worse than `_fill_pattern_block`.
+_ONE_GUESS_MAX_TARGETS = 512
+
+
+def hint_to_digit(hint: HintCategory) -> int:
+  return hint.value - 1
+
+
+def digit_to_hint(digit: int) -> HintCategory:
+  return HintCategory(digit + 1)
+
+
+def hints_to_pattern(hints: Iterable[HintCategory]) -> int:
+  """Packs a list of hints into a single base-3 pattern code."""
+  code = 0
+  for hint in reversed(list(hints)):
+    code = code * _PATTERN_BASE + hint_to_digit(hint)
+  return code
+
+
+def pattern_to_hints(code: int, length: int) -> Hints:
+  """Unpacks a base-3 pattern code into `length` hints."""
+  hints = []
+  for _ in range(length):
+    code, digit = divmod(int(code), _PATTERN_BASE)
+    hints.append(digit_to_hint(digit))
+  return tuple(hints)
+
+
+def all_hit_pattern(length: int) -> int:
+  """Returns the pattern code of a correct guess."""
+  return hints_to_pattern([HintCategory.HIT] * length)
+
+
+def pattern_dtype(length: int) -> np.dtype:
+  """Returns the smallest unsigned dtype that fits every pattern code."""
+  max_code = _PATTERN_BASE**length - 1
+  for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+    if max_code <= np.iinfo(dtype).max:
+      return np.dtype(dtype)
+  raise ValueError(f"Words of length {length} are too long to pack.")
+
+
+def encode_words(words: Iterable[str]) -> np.ndarray:
+  """Encodes equal-length words as a (num_words, length) uint8 array.
+
+  Each entry holds the ASCII code of the cleaned, upper case letter. Raises a
+  ValueError if the words differ in length or contain non-letters."""
+  words = [util.clean_text(w) for w in words]
+  if not words:
+    return np.zeros((0, 0), dtype=np.uint8)
+  length = len(words[0])
+  for word in words:
+    if len(word) != length:
+      raise ValueError(f"The word '{word}' should be {length} "
+                       "characters long.")
+    if any(c not in VALID_CHARS for c in word):
+      raise ValueError(f"The word'{word}' should only contain letters.")
+  encoded = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+  return encoded.reshape(len(words), length)
+
+
+def valid_word_mask(encoded: np.ndarray) -> np.ndarray:
+  """Returns which rows of an encoded word array contain only letters."""
+  is_letter = (encoded >= ord("A")) & (encoded <= ord("Z"))
+  return np.all(is_letter, axis=1)
+
+
+def get_pattern_codes(guesses: Union[np.ndarray, Iterable[str]],
+                      targets: Union[np.ndarray, Iterable[str]]) -> np.ndarray:
+  """Returns the (num_guesses, num_targets) matrix of hint pattern codes.
+
+  Entry `[i, j]` equals `hints_to_pattern(get_hints(guesses[i], targets[j]))`,
+  including the handling of duplicate letters. Inputs are either sequences of
+  words or arrays produced by `encode_words`. Dictionary membership is not
+  checked; validate words before encoding them."""
+  if not isinstance(guesses, np.ndarray):
+    guesses = encode_words(guesses)
+  if not isinstance(targets, np.ndarray):
+    targets = encode_words(targets)
+  if guesses.ndim != 2 or targets.ndim != 2:
+    raise ValueError("Expected 2D arrays of encoded words.")
+  num_guesses, length = guesses.shape
+  num_targets, target_length = targets.shape
+  if num_guesses and num_targets and length != target_length:
+    raise ValueError(f"Guesses of length {length} cannot be scored against "
+                     f"targets of length {target_length}.")
+  codes = np.zeros((num_guesses, num_targets), dtype=pattern_dtype(length))
+  if num_guesses == 0 or num_targets == 0:
+    return codes
+  if num_guesses == 1 and num_targets <= _ONE_GUESS_MAX_TARGETS:
+    _fill_one_guess(guesses[0], targets, codes[0])
+    return codes
+  block_size = max(1, _PATTERN_BLOCK_CELLS // (num_targets * length))
+  for start in range(0, num_guesses, block_size):
+    end = start + block_size
+    _fill_pattern_block(guesses[start:end], targets, codes[start:end])
+  return codes
+
+
+def _fill_pattern_block(guesses: np.ndarray, targets: np.ndarray,
+                        codes: np.ndarray):
+  """Writes the pattern codes of `guesses` x `targets` into `codes`."""
+  num_targets, length = targets.shape
+  # target_counts[letter_rows[c], j] is how often the letter `c` appears in
+  # target j. Only the letters that appear in a guess are counted.
+  letters = np.unique(guesses)
+  letter_rows = np.zeros(256, dtype=np.intp)
+  letter_rows[letters] = np.arange(len(letters))
+  target_counts = np.zeros((len(letters), num_targets), dtype=np.int16)
+  for j in range(length):
+    target_counts += targets[None, :, j] == letters[:, None]
+  hits = guesses.T[:, :, None] == targets.T[:, None, :]
+  hit_digit = codes.dtype.type(hint_to_digit(HintCategory.HIT))
+  close_digit = codes.dtype.type(hint_to_digit(HintCategory.CLOSE))
+  weight = codes.dtype.type(1)
+  for i in range(length):
+    # Letter i is a close if the target has more copies of it than are claimed
+    # by hits anywhere in the guess plus earlier occurrences in the guess.
+    claimed = hits[i].astype(np.int16)
+    for j in range(length):
+      if j == i:
+        continue
+      rows = np.flatnonzero(guesses[:, j] == guesses[:, i])
+      if rows.size == 0:
+        continue
+      if j < i:
+        claimed[rows] += 1
+      else:
+        claimed[rows] += hits[j, rows]
+    closes = ~hits[i] & (claimed < target_counts[letter_rows[guesses[:, i]]])
+    # Misses contribute a zero digit.
+    codes += hits[i] * (hit_digit * weight)
+    codes += closes * (close_digit * weight)
+    weight *= _PATTERN_BASE
+
+
+def _fill_one_guess(guess: np.ndarray, targets: np.ndarray, codes: np.ndarray):
+  """Like `_fill_pattern_block` for a single guess.
+
+  Which letters of the guess repeat only depends on the guess, so the
+  per-position loops of `_fill_pattern_block` collapse into a few array
+  operations. This is the path taken by multi-board games, and by narrowing
+  a short list of candidates."""
+  length = len(guess)
+  same = guess[:, None] == guess[None, :]
+  hits = targets == guess
+  # How often each letter of the guess appears in each target.
+  target_counts = (targets[:, None, :] == guess[None, :, None]).sum(axis=2)
+  # Letter i is a close if the target has more copies of it than are claimed
+  # by hits anywhere in the guess plus earlier occurrences in the guess.
+  claimed = (
+      hits + np.tril(same, -1).sum(axis=1) +
+      hits @ np.triu(same, 1).T.astype(np.int16))
+  closes = ~hits & (claimed < target_counts)
+  digits = (
+      hits * hint_to_digit(HintCategory.HIT) +
+      closes * hint_to_digit(HintCategory.CLOSE))
+  weights = _PATTERN_BASE**np.arange(length, dtype=np.int64)
+  codes[:] = digits @ weights
 
 
 def is_correct(guess: str, target: str) -> bool:
@@ -44,29 +265,179 @@ def is_correct(guess: str, target: str) -> bool:
 VALID_CHARS = {c for c in string.ascii_uppercase}
 
 
+@profiling.timed
 def validate_guess(guess: str, target_len: int, words: word_list.WordList):
   """Returns true if the guess is only `target_len` alpha chars."""
+  resolve_guess(guess, target_len, words)
+
+
+@profiling.timed
+def validate_word(word: str, words: word_list.WordList):
+  resolve_word(word, words)
+
+
+@profiling.timed
+def resolve_guess(guess: str, target_len: int,
+                  words: word_list.WordList) -> int:
+  """Validates a guess like `validate_guess`, and returns its word ID."""
   guess = util.clean_text(guess)
   if len(guess) != target_len:
     raise ValueError(f"The guess '{guess}' should be {target_len} "
                      "characters long.")
-  validate_word(guess, words)
+  return resolve_word(guess, words)
 
 
-def validate_word(word: str, words: word_list.WordList):
+def get_guess_from_id(guess_id: int, target_len: int,
+                      words: word_list.WordList) -> str:
+  """Returns the word with ID `guess_id`, after checking that it can be
+  guessed against a target of `target_len`.
+
+  Every dictionary word has an ID, including ones with punctuation, which
+  `resolve_guess` would reject."""
+  guess = words.word_from_id(guess_id)
+  if len(guess) != target_len:
+    raise ValueError(f"The guess '{guess}' should be {target_len} "
+                     "characters long.")
+  _validate_letters(guess)
+  return guess
+
+
+@profiling.timed
+def resolve_word(word: str, words: word_list.WordList) -> int:
+  """Validates a word like `validate_word`, and returns its word ID."""
   assert word is not None
   word = util.clean_text(word)
   if not word:
     raise ValueError("The empty string is not a valid word.")
-  if word not in words:
+  word_id = words.word_id(word)
+  if word_id is None:
     raise ValueError(f"'{word}' does not appear in the dictionary.")
+  _validate_letters(word)
+  return word_id
+
+
+def _validate_letters(word: str):
   if any(c not in VALID_CHARS for c in word):
     raise ValueError(f"The word'{word}' should only contain letters.")
 
 
+@profiling.timed
 def validate_char(char: str):
   char = util.clean_text(char)
   if len(char) != 1:
     raise ValueError(f"'{char}' is not a single char.")
   if char not in VALID_CHARS:
     raise ValueError(f"'{char}' is not a valid letter.")
+
+
+def _letter_index(char: str) -> int:
+  return ord(char) - ord("A")
+
+
+class HintConstraints():
+  """Everything the hints so far reveal about the target.
+
+  This is kept up to date one guess at a time, so checking a new guess against
+  it costs the same no matter how long the game has been going."""
+  __slots__ = ("_length", "_state")
+
+  # `_state` holds, in order: the minimum and the maximum number of times each
+  # letter appears in the target (one byte per letter each), the known letter
+  # at each position (one byte per position, 0 if unknown), and a bitmask per
+  # position of the letters that cannot appear there (4 bytes per position).
+  _MIN_OFFSET = 0
+  _MAX_OFFSET = _MIN_OFFSET + len(string.ascii_uppercase)
+  _FIXED_OFFSET = _MAX_OFFSET + len(string.ascii_uppercase)
+  _BANNED_WIDTH = 4
+
+  def __init__(self, length: int):
+    self._length = length
+    num_letters = len(string.ascii_uppercase)
+    self._state = bytearray(num_letters) + bytearray(
+        [length] * num_letters) + bytearray(length * (1 + self._BANNED_WIDTH))
+
+  @property
+  def length(self) -> int:
+    return self._length
+
+  def get_fixed(self, position: int) -> Optional[str]:
+    fixed = self._state[self._FIXED_OFFSET + position]
+    return chr(fixed) if fixed else None
+
+  def _get_banned(self, position: int) -> int:
+    start = self._FIXED_OFFSET + self._length + position * self._BANNED_WIDTH
+    return int.from_bytes(self._state[start:start + self._BANNED_WIDTH],
+                          "little")
+
+  def _set_banned(self, position: int, banned: int):
+    start = self._FIXED_OFFSET + self._length + position * self._BANNED_WIDTH
+    self._state[start:start + self._BANNED_WIDTH] = banned.to_bytes(
+        self._BANNED_WIDTH, "little")
+
+  def is_banned(self, char: str, position: int) -> bool:
+    return bool(self._get_banned(position) >> _letter_index(char) & 1)
+
+  def get_banned_letters(self, position: int) -> str:
+    """Returns the letters that cannot be at `position`."""
+    banned = self._get_banned(position)
+    return "".join(
+        c for i, c in enumerate(string.ascii_uppercase) if banned >> i & 1)
+
+  def get_min_count(self, char: str) -> int:
+    return self._state[self._MIN_OFFSET + _letter_index(char)]
+
+  def get_max_count(self, char: str) -> int:
+    return self._state[self._MAX_OFFSET + _letter_index(char)]
+
+  def get_exact_count(self, char: str) -> Optional[int]:
+    """Returns the number of times `char` is in the target, if it is known."""
+    min_count = self.get_min_count(char)
+    if min_count == self.get_max_count(char):
+      return min_count
+    return None
+
+  def update(self, guess: str, hints: Iterable[HintCategory]):
+    """Records the hints of one guess."""
+    found = {}
+    missed = set()
+    for i, (c, h) in enumerate(zip(guess, hints)):
+      if h == HintCategory.HIT:
+        self._state[self._FIXED_OFFSET + i] = ord(c)
+      else:
+        self._set_banned(i, self._get_banned(i) | 1 << _letter_index(c))
+      if h == HintCategory.MISS:
+        missed.add(c)
+      else:
+        found[c] = found.get(c, 0) + 1
+    for c, count in found.items():
+      idx = self._MIN_OFFSET + _letter_index(c)
+      self._state[idx] = max(self._state[idx], count)
+    # A miss means the target has no copies beyond the ones already found.
+    for c in missed:
+      idx = self._MAX_OFFSET + _letter_index(c)
+      self._state[idx] = min(self._state[idx], found.get(c, 0))
+
+
+@profiling.timed
+def validate_hard_mode(guess: str, constraints: HintConstraints):
+  """Raises a ValueError if the guess ignores a revealed hint.
+
+  Expects a cleaned guess that already passed `validate_guess`."""
+  counts = bytearray(len(VALID_CHARS))
+  for i, c in enumerate(guess):
+    fixed = constraints.get_fixed(i)
+    if fixed is not None and c != fixed:
+      raise ValueError(f"Letter {i + 1} must be '{fixed}'.")
+    if constraints.is_banned(c, i):
+      if constraints.get_max_count(c) == 0:
+        raise ValueError(f"'{c}' is not in the word.")
+      raise ValueError(f"Letter {i + 1} cannot be '{c}'.")
+    counts[_letter_index(c)] += 1
+  for c in string.ascii_uppercase:
+    count = counts[_letter_index(c)]
+    if count < constraints.get_min_count(c):
+      raise ValueError(f"The guess must contain '{c}' at least "
+                       f"{constraints.get_min_count(c)} time(s).")
+    if count > constraints.get_max_count(c):
+      raise ValueError(f"The guess can contain '{c}' at most "
+                       f"{constraints.get_max_count(c)} time(s).")
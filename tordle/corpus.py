@@ -0,0 +1,113 @@
+"""Builds word lists from text corpora of any size.
+
+Words are counted in chunks, and each chunk is merged into a Misra-Gries
+summary per word length that keeps at most `capacity` words. Memory stays
+bounded no matter how large the corpus is. Every count is an underestimate by
+at most (words of that length seen) / (capacity + 1), and counts are exact as
+long as no length ever had more than `capacity` distinct words.
+"""
+import collections
+import heapq
+import string
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from . import util
+
+# Words are counted exactly until a chunk has this many distinct words, and
+# then merged into the summaries.
+_CHUNK_WORDS = 1 << 16
+
+_PUNCTUATION = string.punctuation + "“”‘’"
+
+
+def iter_words(lines: Iterable[str],
+               min_length: int = 1,
+               max_length: Optional[int] = None) -> Iterator[str]:
+  """Yields the cleaned words of whitespace-separated text.
+
+  Punctuation around a word is stripped. Like `check.validate_word`, words
+  that still contain anything but the letters A-Z are dropped."""
+  for line in lines:
+    for token in line.split():
+      word = util.clean_text(token.strip(_PUNCTUATION))
+      if not word.isascii() or not word.isalpha():
+        continue
+      if len(word) < min_length:
+        continue
+      if max_length is not None and len(word) > max_length:
+        continue
+      yield word
+
+
+class FrequencyCounter():
+  """Approximate word counts per length, in bounded memory."""
+
+  def __init__(self, capacity: int = 100000):
+    if capacity <= 0:
+      raise ValueError(f"Expected a positive capacity. Got: {capacity}")
+    self._capacity = capacity
+    self._counts: Dict[int, Dict[str, int]] = collections.defaultdict(dict)
+    self._exact = True
+    self.total = 0
+
+  @property
+  def exact(self) -> bool:
+    """Whether no word has been dropped or undercounted so far."""
+    return self._exact
+
+  def update(self, words: Iterable[str]):
+    chunk = collections.Counter()
+    for word in words:
+      chunk[word] += 1
+      if len(chunk) >= _CHUNK_WORDS:
+        self._merge(chunk)
+        chunk = collections.Counter()
+    self._merge(chunk)
+
+  def _merge(self, chunk: collections.Counter):
+    by_length = collections.defaultdict(dict)
+    for word, count in chunk.items():
+      by_length[len(word)][word] = count
+      self.total += count
+    for length, chunk_counts in by_length.items():
+      counts = self._counts[length]
+      for word, count in chunk_counts.items():
+        counts[word] = counts.get(word, 0) + count
+      if len(counts) > self._capacity:
+        # Subtracting the (capacity + 1)th largest count keeps at most
+        # `capacity` words, and is how Misra-Gries summaries merge.
+        cutoff = heapq.nlargest(self._capacity + 1, counts.values())[-1]
+        self._counts[length] = {
+            w: c - cutoff for w, c in counts.items() if c > cutoff
+        }
+        self._exact = False
+
+  def lengths(self) -> List[int]:
+    return sorted(length for length, counts in self._counts.items() if counts)
+
+  def ranked(self, length: int) -> List[Tuple[str, int]]:
+    """Returns the (word, count) pairs of `length`, most frequent first."""
+    counts = self._counts.get(length, {})
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def get_ranked_words(counter: FrequencyCounter,
+                     min_count: int = 1,
+                     top: Optional[int] = None) -> Dict[int, List[str]]:
+  """Returns the words of each length, most frequent first.
+
+  Words seen fewer than `min_count` times are dropped, and each length keeps
+  at most `top` words."""
+  ranked = {}
+  for length in counter.lengths():
+    words = [w for w, c in counter.ranked(length) if c >= min_count]
+    ranked[length] = words[:top] if top is not None else words
+  return ranked
+
+
+def write_ranked_words(ranked: Dict[int, List[str]], out: TextIO):
+  """Writes one word per line, by length and then by rank."""
+  for length in sorted(ranked):
+    for word in ranked[length]:
+      out.write(word)
+      out.write("\n")
@@ -0,0 +1,186 @@
+"""A directed acyclic word graph (DAWG) over a word list.
+
+A DAWG is a trie whose identical subtrees are merged, so words that share a
+suffix share its nodes too. It answers membership and prefix checks in
+O(length), and pattern queries only visit the branches that can still match.
+
+The graph is built with the incremental algorithm for sorted input of Daciuk
+et al., then frozen into flat arrays: each node's edges are a contiguous run,
+sorted by letter, of `_labels` and `_targets`.
+"""
+import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Matches any one letter in a pattern.
+WILDCARD = "?"
+
+
+class _BuildNode():
+  __slots__ = ("final", "edges")
+
+  def __init__(self):
+    self.final = False
+    self.edges: Dict[str, "_BuildNode"] = {}
+
+
+class Dawg():
+
+  def __init__(self, words: Iterable[str]):
+    root = self._build(sorted(set(words)))
+    self._freeze(root)
+
+  def _build(self, words: List[str]) -> _BuildNode:
+    root = _BuildNode()
+    register: Dict[tuple, _BuildNode] = {}
+    # The (parent, letter, child) edges along the last word's path that have
+    # not been merged into the register yet.
+    unchecked: List[Tuple[_BuildNode, str, _BuildNode]] = []
+
+    def minimize(down_to: int):
+      while len(unchecked) > down_to:
+        parent, letter, child = unchecked.pop()
+        # Words arrive sorted, so edges are already in letter order.
+        key = (child.final, *child.edges.items())
+        if key in register:
+          parent.edges[letter] = register[key]
+        else:
+          register[key] = child
+
+    previous = ""
+    self._count = 0
+    for word in words:
+      common = 0
+      for a, b in zip(word, previous):
+        if a != b:
+          break
+        common += 1
+      minimize(common)
+      node = unchecked[-1][2] if unchecked else root
+      for letter in word[common:]:
+        child = _BuildNode()
+        node.edges[letter] = child
+        unchecked.append((node, letter, child))
+        node = child
+      node.final = True
+      previous = word
+      self._count += 1
+    minimize(0)
+    return root
+
+  def _freeze(self, root: _BuildNode):
+    # Number the nodes in reverse post-order, so the root is node 0 and every
+    # node comes before the nodes it points to.
+    order = []
+    visited = {id(root)}
+    stack = [(root, iter(root.edges.values()))]
+    while stack:
+      node, children = stack[-1]
+      for child in children:
+        if id(child) not in visited:
+          visited.add(id(child))
+          stack.append((child, iter(child.edges.values())))
+          break
+      else:
+        stack.pop()
+        order.append(node)
+    order.reverse()
+    ids = {id(node): i for i, node in enumerate(order)}
+    self._final = bytearray(len(order))
+    self._first_edge = array.array("I", [0] * (len(order) + 1))
+    labels = []
+    self._targets = array.array("I")
+    for i, node in enumerate(order):
+      self._final[i] = node.final
+      self._first_edge[i] = len(labels)
+      for letter, child in node.edges.items():
+        labels.append(letter)
+        self._targets.append(ids[id(child)])
+    self._first_edge[len(order)] = len(labels)
+    self._labels = "".join(labels)
+    # Bit `n` of a node's mask is set if a word ends `n` letters below it.
+    # Children come after their parents, so walk backwards.
+    self._lengths = array.array("Q", [0] * len(order))
+    for i in reversed(range(len(order))):
+      mask = 1 if self._final[i] else 0
+      for e in range(self._first_edge[i], self._first_edge[i + 1]):
+        mask |= self._lengths[self._targets[e]] << 1
+      self._lengths[i] = mask
+
+  def __len__(self):
+    return self._count
+
+  @property
+  def node_count(self) -> int:
+    return len(self._final)
+
+  @property
+  def edge_count(self) -> int:
+    return len(self._labels)
+
+  def _step(self, node: int, letter: str) -> Optional[int]:
+    e = self._labels.find(letter, self._first_edge[node],
+                          self._first_edge[node + 1])
+    return None if e < 0 else self._targets[e]
+
+  def _walk(self, prefix: str) -> Optional[int]:
+    node = 0
+    for letter in prefix:
+      node = self._step(node, letter)
+      if node is None:
+        return None
+    return node
+
+  def __contains__(self, word: str) -> bool:
+    node = self._walk(word)
+    return node is not None and bool(self._final[node])
+
+  def has_prefix(self, prefix: str, length: Optional[int] = None) -> bool:
+    """Whether some word starts with `prefix`, and has `length` letters if
+    given."""
+    node = self._walk(prefix)
+    if node is None:
+      return False
+    if length is None:
+      return True
+    remaining = length - len(prefix)
+    return remaining >= 0 and bool(self._lengths[node] >> remaining & 1)
+
+  def match(
+      self,
+      pattern: str,
+      include: Iterable[str] = (),
+      exclude: Iterable[str] = ()
+  ) -> Iterator[str]:
+    """Yields, in sorted order, the words that match `pattern`.
+
+    Each `WILDCARD` in the pattern matches any letter. Matches contain every
+    letter of `include` and none of `exclude`."""
+    include = frozenset(include)
+    exclude = frozenset(exclude)
+    length = len(pattern)
+    if not self._lengths[0] >> length & 1:
+      return
+    # The stack holds (node, depth, letters so far, included letters seen).
+    stack = [(0, 0, "", frozenset())]
+    while stack:
+      node, depth, word, seen = stack.pop()
+      if depth == length:
+        if self._final[node] and seen == include:
+          yield word
+        continue
+      remaining = length - depth
+      # Push in reverse so the smallest letter is popped first.
+      for e in reversed(
+          range(self._first_edge[node], self._first_edge[node + 1])):
+        letter = self._labels[e]
+        if pattern[depth] != WILDCARD and pattern[depth] != letter:
+          continue
+        if letter in exclude:
+          continue
+        child = self._targets[e]
+        if not self._lengths[child] >> (remaining - 1) & 1:
+          continue
+        child_seen = seen | {letter} if letter in include else seen
+        if len(include) - len(child_seen) > remaining - 1:
+          continue
+        stack.append((child, depth + 1, word + letter, child_seen))
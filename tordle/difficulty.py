@@ -0,0 +1,253 @@
+"""Per-target difficulty scores, computed offline and stored next to the word
+list.
+
+For every answer, the index records:
+- `guesses`: how many guesses the hard-mode solver needs to find it, starting
+  from the best opener of its length.
+- `bucket`: how many answers give the same hints as it does for that opener,
+  which is how much work the opener leaves.
+
+Each length's answers are stored from easiest to hardest, by guesses and then
+by bucket. A difficulty band is a contiguous slice of them, so picking a
+target from a band is O(1) and needs no scoring when a game starts.
+
+The file starts with a `<4sI` header (magic, number of lengths) and one
+`<IIQ` entry per length (length, count, offset), followed by packed records
+of `_RECORD`.
+"""
+import concurrent.futures
+import mmap
+import pathlib
+import random
+import struct
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from . import check, session, solver, word_list
+
+_MAGIC = b"TWD1"
+_HEADER = struct.Struct("<4sI")
+_INDEX_ENTRY = struct.Struct("<IIQ")
+_RECORD = np.dtype([("index", "<u4"), ("guesses", "u1"), ("bucket", "<u4")])
+
+# Difficulty bands, from easiest to hardest. Each holds an equal share of the
+# answers of a length.
+BANDS = ("easy", "medium", "hard")
+
+# Games are cut off after this many guesses. Hard mode guesses any word that is
+# consistent with the hints so far, not only the remaining candidates, but in
+# practice no game comes close.
+_MAX_GUESSES = 255
+
+# The number of targets in each task handed to a worker process.
+_TASK_TARGETS = 256
+
+# The word list of a worker process. See `_init_worker`.
+_worker_words = None
+
+
+def get_index_path(
+    word_list_path: Optional[Union[str, pathlib.Path]] = None) -> pathlib.Path:
+  """Returns where the index of a compiled word list is stored, by default
+  the bundled one."""
+  if word_list_path is None:
+    word_list_path = word_list.get_default_compiled_path()
+  return pathlib.Path(word_list_path).with_suffix(".twd")
+
+
+class DifficultyIndex():
+  """A memory-mapped difficulty index, read by `load_index`."""
+
+  def __init__(self, buffer: mmap.mmap, words: word_list.WordList):
+    self._words = words
+    self._scores: Dict[int, np.ndarray] = {}
+    magic, num_lengths = _HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC:
+      raise ValueError("Not a difficulty index.")
+    for i in range(num_lengths):
+      length, count, offset = _INDEX_ENTRY.unpack_from(
+          buffer, _HEADER.size + i * _INDEX_ENTRY.size)
+      scores = np.frombuffer(buffer, dtype=_RECORD, count=count, offset=offset)
+      # Checking the records against the word list is cheap, unlike
+      # rescoring, and catches an index built for another list.
+      num_words = len(
+          words.get_words(length)) if length in words.lengths() else 0
+      if count > num_words or (count and scores["index"].max() >= num_words):
+        raise ValueError(f"The difficulty index does not match the word list "
+                         f"at length {length}. Rebuild it with "
+                         "'tordle build-difficulty'.")
+      self._scores[length] = scores
+
+  def lengths(self) -> List[int]:
+    return sorted(self._scores)
+
+  def get_scores(self, length: int) -> np.ndarray:
+    """Returns the records of `length`, from easiest to hardest."""
+    if length not in self._scores:
+      raise ValueError(f"The difficulty index has no words of length "
+                       f"{length}. Rebuild it with 'tordle build-difficulty'.")
+    return self._scores[length]
+
+  def get_band(self, length: int, band: str) -> np.ndarray:
+    """Returns the indices into `words.get_words(length)` of the answers in
+    `band`, from easiest to hardest."""
+    if band not in BANDS:
+      raise ValueError(f"Expected one of {BANDS}. Got: {band}")
+    indices = self.get_scores(length)["index"]
+    position = BANDS.index(band)
+    start = len(indices) * position // len(BANDS)
+    end = len(indices) * (position + 1) // len(BANDS)
+    indices = indices[start:end]
+    if self._words.has_custom_answers:
+      # Only answers can be targets. This is the one case that costs more
+      # than O(1), and only if the answers were not the ones scored.
+      indices = indices[np.isin(indices,
+                                self._words.get_answer_indices(length))]
+    return indices
+
+  def get_random_words(self, length: int, band: str, count: int) -> List[str]:
+    """Returns `count` distinct random answers from `band`."""
+    indices = self.get_band(length, band)
+    if count > len(indices):
+      raise ValueError(f"Expected at most {len(indices)} {band} words of "
+                       f"length {length}. Got: {count}")
+    words = self._words.get_words(length)
+    return [
+        words[indices[i]] for i in random.sample(range(len(indices)), count)
+    ]
+
+  def get_random_word(self, length: int, band: str) -> str:
+    return self.get_random_words(length, band, 1)[0]
+
+
+def load_index(
+    words: word_list.WordList,
+    path: Optional[Union[str, pathlib.Path]] = None) -> DifficultyIndex:
+  """Opens the index at `path`, by default the one of the bundled list.
+
+  Raises a FileNotFoundError if it has not been built."""
+  path = get_index_path() if path is None else pathlib.Path(path)
+  if not path.is_file():
+    raise FileNotFoundError(f"No difficulty index at '{path}'. Build it with "
+                            "'tordle build-difficulty'.")
+  with open(path, "rb") as index_file:
+    buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+  return DifficultyIndex(buffer, words)
+
+
+def get_best_opener(words: word_list.WordList,
+                    length: int,
+                    processes: Optional[int] = None) -> str:
+  """Returns the hard-mode solver's first guess for `length`.
+
+  Like `solver.best_guess`, it may be any word of letters, and prefers an
+  answer between equal scores."""
+  answers = words.get_answer_indices(length)
+  pool = np.flatnonzero(check.valid_word_mask(words.get_encoded(length)))
+  scores = solver.score_words(words, length, pool, answers, processes=processes)
+  best = np.lexsort((np.isin(pool, answers), scores))[-1]
+  return words.get_words(length)[pool[best]]
+
+
+def count_guesses(words: word_list.WordList, target: str, opener: str) -> int:
+  """Returns how many guesses the hard-mode solver needs to find `target`."""
+  sess = session.Session(
+      target=target, total_guesses=_MAX_GUESSES, words=words, hard_mode=True)
+  guess = opener
+  while sess.status == session.SessionStatus.ACTIVE:
+    sess.guess(guess)
+    if sess.status == session.SessionStatus.ACTIVE:
+      guess = solver.best_guess(sess)
+  return sess.guess_count
+
+
+def compute_scores(
+    words: word_list.WordList,
+    length: int,
+    processes: Optional[int] = None,
+    word_list_path: Optional[Union[str, pathlib.Path]] = None) -> np.ndarray:
+  """Scores every answer of `length` and returns them easiest first.
+
+  With `processes` > 1, the targets are split across a process pool whose
+  workers load the word list at `word_list_path`, by default the bundled
+  one, so `words` must be that same list."""
+  answers = words.get_answer_indices(length)
+  records = np.zeros(len(answers), dtype=_RECORD)
+  if len(answers) == 0:
+    return records
+  opener = get_best_opener(words, length, processes)
+  encoded = words.get_encoded(length)
+  codes = check.get_pattern_codes(
+      check.encode_words([opener]), encoded[answers])[0]
+  _, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+  targets = [words.get_words(length)[i] for i in answers]
+  if processes is None or processes <= 1:
+    guesses = _count_range(words, targets, opener)
+  else:
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(word_list_path,)) as executor:
+      futures = [
+          executor.submit(_count_worker_range,
+                          targets[start:start + _TASK_TARGETS], opener)
+          for start in range(0, len(targets), _TASK_TARGETS)
+      ]
+      guesses = [g for future in futures for g in future.result()]
+  records["index"] = answers
+  records["guesses"] = guesses
+  records["bucket"] = counts[inverse]
+  order = np.lexsort((records["index"], records["bucket"], records["guesses"]))
+  return records[order]
+
+
+def _count_range(words: word_list.WordList, targets: List[str],
+                 opener: str) -> List[int]:
+  return [count_guesses(words, target, opener) for target in targets]
+
+
+def _init_worker(word_list_path: Optional[Union[str, pathlib.Path]]):
+  global _worker_words
+  if word_list_path is None:
+    _worker_words = word_list.WordList()
+  else:
+    _worker_words = word_list.WordList.from_compiled(word_list_path)
+
+
+def _count_worker_range(targets: List[str], opener: str) -> List[int]:
+  return _count_range(_worker_words, targets, opener)
+
+
+def write_index(scores: Dict[int, np.ndarray], path: Union[str, pathlib.Path]):
+  """Writes the records of each length, as returned by `compute_scores`."""
+  lengths = sorted(scores)
+  offset = _HEADER.size + len(lengths) * _INDEX_ENTRY.size
+  with open(path, "wb") as index_file:
+    index_file.write(_HEADER.pack(_MAGIC, len(lengths)))
+    for length in lengths:
+      index_file.write(_INDEX_ENTRY.pack(length, len(scores[length]), offset))
+      offset += scores[length].nbytes
+    for length in lengths:
+      index_file.write(scores[length].astype(_RECORD).tobytes())
+
+
+def build_index(path: Union[str, pathlib.Path],
+                words: Optional[word_list.WordList] = None,
+                lengths: Optional[Iterable[int]] = None,
+                processes: Optional[int] = None,
+                word_list_path: Optional[Union[str, pathlib.Path]] = None):
+  """Scores the answers of `lengths`, by default all, and writes the index.
+
+  `words` defaults to the list at `word_list_path`, or the bundled one."""
+  if words is None:
+    words = (
+        word_list.WordList() if word_list_path is None else
+        word_list.WordList.from_compiled(word_list_path))
+  if lengths is None:
+    lengths = words.lengths()
+  scores = {
+      length: compute_scores(words, length, processes, word_list_path)
+      for length in lengths
+  }
+  write_index(scores, path)
@@ -0,0 +1,329 @@
+"""An append-only binary log of games, and streaming readers over it.
+
+A log starts with the magic bytes b"TGL3", followed by records. Each record
+starts with `_SYNC`, a `<H` length and a `<I` CRC-32 of the rest of the
+record, then a `<BQ` kind and game id, then:
+
+- START: `<dHIB` timestamp, word length, total guesses and flags (see
+  `_HARD_MODE` and `_EVIL`), then the target as ASCII.
+- GUESS: the guess as ASCII, then its base-3 pattern code (see
+  `check.hints_to_pattern`) as a little-endian int of
+  `check.pattern_dtype(length).itemsize` bytes.
+- END: `<BB` whether the game was won and whether the player gave up, then the
+  final target as ASCII. Evil games only settle on a target at the end.
+
+Records of concurrent games may interleave, so every record carries its game's
+id. Readers only hold the games that are still in progress, so they can stream
+through logs of any size.
+
+A crash can leave a partial record, which later records are appended after.
+Readers skip any record whose checksum fails, and pick up again at the next
+`_SYNC` that starts a valid record, so writers never need to scan a log when
+they open it.
+"""
+import collections
+import enum
+import random
+import struct
+import time
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from . import check, session, word_list
+
+_MAGIC = b"TGL3"
+_SYNC = b"\xa5\x5a"
+# The sync marker, length and checksum in front of each record.
+_PREFIX = struct.Struct("<2sHI")
+_HEADER = struct.Struct("<BQ")
+_START = struct.Struct("<dHIB")
+_END = struct.Struct("<BB")
+# The word length, and where it sits in a START payload.
+_TARGET_LENGTH = struct.Struct("<H")
+_TARGET_LENGTH_OFFSET = struct.calcsize("<d")
+# The most guesses a START record holds.
+_MAX_TOTAL_GUESSES = (1 << 32) - 1
+
+_HARD_MODE = 1
+_EVIL = 2
+
+# Bytes read from the log at once.
+_READ_SIZE = 1 << 20
+
+
+class RecordKind(enum.Enum):
+  START = 1
+  GUESS = 2
+  END = 3
+
+
+class GameRecord(NamedTuple):
+  game_id: int
+  timestamp: float
+  target_length: int
+  total_guesses: int
+  hard_mode: bool
+  evil: bool
+  # The final target, or the starting one if the game never finished.
+  target: str
+  guesses: List[str]
+  patterns: List[int]
+  finished: bool
+  won: bool
+  gave_up: bool
+
+
+class GameRecorder():
+  """Appends the events of one game to a log. See `Session`."""
+  __slots__ = ("_log", "_game_id", "_code_width")
+
+  def __init__(self, log: "GameLogWriter", game_id: int, target_length: int):
+    self._log = log
+    self._game_id = game_id
+    self._code_width = check.pattern_dtype(target_length).itemsize
+
+  def guess(self, guess: str, pattern: int):
+    self._log._write(
+        RecordKind.GUESS, self._game_id,
+        guess.encode("ascii") + pattern.to_bytes(self._code_width, "little"))
+
+  def end(self, won: bool, gave_up: bool, target: str):
+    self._log._write(RecordKind.END, self._game_id,
+                     _END.pack(won, gave_up) + target.encode("ascii"))
+    # Finished games survive a crash.
+    self._log.flush()
+
+
+class GameLogWriter():
+  """Appends games to the log at `path`, creating it if needed."""
+
+  def __init__(self, path: str):
+    self._file = open(path, "ab")
+    if self._file.tell() < len(_MAGIC):
+      # Empty, or a crash cut off the magic bytes.
+      self._file.truncate(0)
+      self._file.write(_MAGIC)
+    else:
+      with open(path, "rb") as log_file:
+        if log_file.read(len(_MAGIC)) != _MAGIC:
+          self._file.close()
+          raise ValueError("Not a tordle game log.")
+    self._rng = random.Random()
+
+  def start_game(self,
+                 target: str,
+                 total_guesses: int,
+                 hard_mode: bool = False,
+                 evil: bool = False) -> GameRecorder:
+    # Ids only need to tell apart the games in flight, and stay unique across
+    # writers that share a log.
+    if not 0 < total_guesses <= _MAX_TOTAL_GUESSES:
+      raise ValueError(f"Expected at most {_MAX_TOTAL_GUESSES} guesses to log. "
+                       f"Got: {total_guesses}")
+    game_id = self._rng.getrandbits(64)
+    flags = (_HARD_MODE if hard_mode else 0) | (_EVIL if evil else 0)
+    self._write(
+        RecordKind.START, game_id,
+        _START.pack(time.time(), len(target), total_guesses, flags) +
+        target.encode("ascii"))
+    return GameRecorder(self, game_id, len(target))
+
+  def _write(self, kind: RecordKind, game_id: int, payload: bytes):
+    body = _HEADER.pack(kind.value, game_id) + payload
+    self._file.write(_PREFIX.pack(_SYNC, len(body), zlib.crc32(body)) + body)
+
+  def flush(self):
+    self._file.flush()
+
+  def close(self):
+    self._file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+
+def read_records(path: str) -> Iterator[tuple]:
+  """Yields the (kind, game_id, payload) of each record in the log."""
+  for kind, game_id, payload in _read_raw_records(path):
+    yield RecordKind(kind), game_id, payload
+
+
+def _read_raw_records(path: str) -> Iterator[tuple]:
+  with open(path, "rb") as f:
+    if f.read(len(_MAGIC)) != _MAGIC:
+      raise ValueError("Not a tordle game log.")
+    buffer = b""
+    at_end = False
+    while not at_end:
+      chunk = f.read(_READ_SIZE)
+      at_end = not chunk
+      buffer += chunk
+      view = memoryview(buffer)
+      offset = 0
+      while offset + _PREFIX.size <= len(buffer):
+        sync, size, crc = _PREFIX.unpack_from(buffer, offset)
+        start = offset + _PREFIX.size
+        end = start + size
+        if sync == _SYNC and end > len(buffer) and not at_end:
+          # The record continues in the next chunk.
+          break
+        if (sync != _SYNC or end > len(buffer) or size < _HEADER.size or
+            zlib.crc32(view[start:end]) != crc):
+          # A torn record. Skip to the next sync marker, keeping any part of
+          # one at the end of the buffer.
+          next_sync = buffer.find(_SYNC, offset + 1)
+          if next_sync < 0:
+            offset = max(offset + 1, len(buffer) - len(_SYNC) + 1)
+            break
+          offset = next_sync
+          continue
+        kind, game_id = _HEADER.unpack_from(buffer, start)
+        yield kind, game_id, buffer[start + _HEADER.size:end]
+        offset = end
+      view.release()
+      buffer = buffer[offset:]
+
+
+def iter_games(path: str) -> Iterator[GameRecord]:
+  """Yields each game in the log once it ends.
+
+  Games still in progress at the end of the log come last, unfinished."""
+  # Maps the ids of games in progress to their START payload, guesses and
+  # patterns.
+  open_games: Dict[int, tuple] = {}
+  start_kind = RecordKind.START.value
+  guess_kind = RecordKind.GUESS.value
+  end_kind = RecordKind.END.value
+  for kind, game_id, payload in _read_raw_records(path):
+    if kind == start_kind:
+      open_games[game_id] = (payload, [], [])
+      continue
+    game = open_games.get(game_id)
+    if game is None:
+      continue
+    if kind == guess_kind:
+      start, guesses, patterns = game
+      (length,) = _TARGET_LENGTH.unpack_from(start, _TARGET_LENGTH_OFFSET)
+      guesses.append(payload[:length].decode("ascii"))
+      patterns.append(int.from_bytes(payload[length:], "little"))
+    elif kind == end_kind:
+      del open_games[game_id]
+      yield _make_record(game_id, *game, end=payload)
+  for game_id, game in open_games.items():
+    yield _make_record(game_id, *game, end=None)
+
+
+def _make_record(game_id: int, start: bytes, guesses: List[str],
+                 patterns: List[int], end: Optional[bytes]) -> GameRecord:
+  timestamp, length, total_guesses, flags = _START.unpack_from(start)
+  if end is None:
+    won = gave_up = False
+    target = start[_START.size:]
+  else:
+    won, gave_up = _END.unpack_from(end)
+    target = end[_END.size:]
+  return GameRecord(
+      game_id=game_id,
+      timestamp=timestamp,
+      target_length=length,
+      total_guesses=total_guesses,
+      hard_mode=bool(flags & _HARD_MODE),
+      evil=bool(flags & _EVIL),
+      target=target.decode("ascii"),
+      guesses=guesses,
+      patterns=patterns,
+      finished=end is not None,
+      won=bool(won),
+      gave_up=bool(gave_up))
+
+
+class GameStats():
+  """Aggregates finished games into streaks, guess counts and hard words."""
+
+  def __init__(self):
+    self.games = 0
+    self.wins = 0
+    self.current_streak = 0
+    self.max_streak = 0
+    # Maps guess counts to the number of games won in that many guesses.
+    self.distribution = collections.Counter()
+    # Maps targets to [games, wins, guesses], counting a loss as one guess
+    # more than the game allowed.
+    self._targets = collections.defaultdict(lambda: [0, 0, 0])
+
+  def add(self, game: GameRecord):
+    if not game.finished:
+      return
+    self.games += 1
+    target = self._targets[game.target]
+    target[0] += 1
+    if game.won:
+      self.wins += 1
+      self.current_streak += 1
+      self.max_streak = max(self.max_streak, self.current_streak)
+      self.distribution[len(game.guesses)] += 1
+      target[1] += 1
+      target[2] += len(game.guesses)
+    else:
+      self.current_streak = 0
+      target[2] += game.total_guesses + 1
+
+  @property
+  def win_rate(self) -> float:
+    return self.wins / self.games if self.games else 0.0
+
+  def hardest_words(self, count: int = 10, min_games: int = 1) -> List[tuple]:
+    """Returns the (target, win rate, mean guesses) of the hardest targets.
+
+    Targets are ordered by win rate, then by mean guesses."""
+    rows = [(target, wins / games, guesses / games)
+            for target, (games, wins, guesses) in self._targets.items()
+            if games >= min_games]
+    rows.sort(key=lambda row: (row[1], -row[2], row[0]))
+    return rows[:count]
+
+  def report(self, hardest: int = 10, min_games: int = 1) -> str:
+    lines = [
+        f"{self.games} games, win rate {self.win_rate:.1%}, "
+        f"current streak {self.current_streak}, "
+        f"max streak {self.max_streak}"
+    ]
+    widest = max(self.distribution.values(), default=0)
+    for count in sorted(self.distribution):
+      wins = self.distribution[count]
+      bar = "#" * (round(40 * wins / widest) if widest else 0)
+      lines.append(f"  {count:>3}: {wins:>8} {bar}")
+    hardest_words = self.hardest_words(hardest, min_games)
+    if hardest_words:
+      lines.append("Hardest words:")
+      for target, win_rate, guesses in hardest_words:
+        lines.append(f"  {target}: win rate {win_rate:.1%}, "
+                     f"{guesses:.2f} guesses")
+    return "\n".join(lines)
+
+
+def get_stats(path: str) -> GameStats:
+  stats = GameStats()
+  for game in iter_games(path):
+    stats.add(game)
+  return stats
+
+
+def replay(game: GameRecord, words: word_list.WordList) -> session.Session:
+  """Plays the logged guesses back through a new Session.
+
+  The hints are recomputed, so the replay also checks the log against the
+  current rules."""
+  sess = session.Session(
+      target=game.target,
+      total_guesses=game.total_guesses,
+      words=words,
+      hard_mode=game.hard_mode)
+  for guess in game.guesses:
+    sess.guess(guess)
+  if game.gave_up:
+    sess.give_up()
+  return sess
@@ -0,0 +1,120 @@
+"""Bitset indexes over the words of one length, for filtering by constraints.
+
+For each (position, letter) the index holds a bitset of the words with that
+letter there, and for each (letter, count) a bitset of the words with at least
+that many copies of the letter. Filters match answers, as given by
+`WordList.get_answer_indices`, or every word made of letters. Bit `i` of a
+bitset stands for word `i` of `WordList.get_words(length)`, packed little endian
+into uint64 blocks.
+
+`HintConstraints` characterize exactly the words that are consistent with the
+hints of a game, so filtering by them is a handful of AND and AND NOT
+operations over these bitsets.
+"""
+import string
+import weakref
+
+import numpy as np
+
+from . import check, word_list
+
+_LETTERS = np.frombuffer(string.ascii_uppercase.encode("ascii"), dtype=np.uint8)
+
+# Maps each word list to its indexes by length.
+_indexes = weakref.WeakKeyDictionary()
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+  """Packs a boolean array over its last axis into uint64 bitsets."""
+  num_words = mask.shape[-1]
+  padded = np.zeros(mask.shape[:-1] + (-(-num_words // 64) * 64,), dtype=bool)
+  padded[..., :num_words] = mask
+  return np.packbits(padded, axis=-1, bitorder="little").view("<u8")
+
+
+def popcount(bits: np.ndarray) -> int:
+  """Returns the number of set bits in a bitset."""
+  if hasattr(np, "bitwise_count"):
+    return int(np.bitwise_count(bits).sum())
+  return int(np.unpackbits(bits.view(np.uint8)).sum())
+
+
+class LetterIndex():
+
+  def __init__(self, encoded: np.ndarray, answers: np.ndarray):
+    self._num_words, self._length = encoded.shape
+    # (num_words, 26): whether each word has each letter at each position, and
+    # how many times it has each letter.
+    is_letter = encoded[:, :, np.newaxis] == _LETTERS
+    counts = is_letter.sum(axis=1)
+    # [position, letter] -> the words with `letter` at `position`.
+    self._positions = _pack(is_letter.transpose(1, 2, 0))
+    # [letter, count] -> the words with at least `count` copies of `letter`.
+    at_least = np.arange(self._length + 2)[:, np.newaxis, np.newaxis]
+    self._counts = _pack((counts.T[np.newaxis] >= at_least).transpose(1, 0, 2))
+    is_answer = np.zeros(self._num_words, dtype=bool)
+    is_answer[answers] = True
+    self._answers = _pack(is_answer)
+    self._valid = _pack(check.valid_word_mask(encoded))
+
+  def __len__(self):
+    return self._num_words
+
+  @property
+  def length(self) -> int:
+    return self._length
+
+  @property
+  def nbytes(self) -> int:
+    return (self._positions.nbytes + self._counts.nbytes +
+            self._answers.nbytes + self._valid.nbytes)
+
+  def filter(self,
+             constraints: check.HintConstraints,
+             answers_only: bool = True) -> np.ndarray:
+    """Returns the bitset of the answers that satisfy `constraints`, or of
+    every word of letters without `answers_only`."""
+    if constraints.length != self._length:
+      raise ValueError(f"Expected constraints for {self._length} letters. "
+                       f"Got: {constraints.length}")
+    bits = (self._answers if answers_only else self._valid).copy()
+    for position in range(self._length):
+      fixed = constraints.get_fixed(position)
+      if fixed is not None:
+        bits &= self._positions[position, ord(fixed) - ord("A")]
+      for letter in constraints.get_banned_letters(position):
+        bits &= ~self._positions[position, ord(letter) - ord("A")]
+    for idx, letter in enumerate(string.ascii_uppercase):
+      min_count = constraints.get_min_count(letter)
+      if min_count > 0:
+        bits &= self._counts[idx, min_count]
+      max_count = constraints.get_max_count(letter)
+      if max_count < self._length:
+        bits &= ~self._counts[idx, max_count + 1]
+    return bits
+
+  def count(self, constraints: check.HintConstraints) -> int:
+    """Returns the number of answers that satisfy `constraints`."""
+    return popcount(self.filter(constraints))
+
+  def indices(self,
+              constraints: check.HintConstraints,
+              answers_only: bool = True) -> np.ndarray:
+    """Returns the sorted indices of the answers that satisfy `constraints`,
+    or of every word of letters without `answers_only`."""
+    return to_indices(self.filter(constraints, answers_only), self._num_words)
+
+
+def get_letter_index(words: word_list.WordList, length: int) -> LetterIndex:
+  """Returns the index of the words of `length`, built on first use."""
+  indexes = _indexes.setdefault(words, {})
+  if length not in indexes:
+    indexes[length] = LetterIndex(
+        words.get_encoded(length), words.get_answer_indices(length))
+  return indexes[length]
+
+
+def to_indices(bits: np.ndarray, num_words: int) -> np.ndarray:
+  """Returns the sorted indices of the set bits of a bitset."""
+  mask = np.unpackbits(bits.view(np.uint8), bitorder="little")[:num_words]
+  return np.flatnonzero(mask)
@@ -0,0 +1,139 @@
+"""A load generator for `tordle.server`.
+
+Opens many concurrent connections, plays random games on each and reports the
+latency of guess requests, as seen by the client.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import List, NamedTuple, Optional
+
+from . import check, word_list
+
+
+class Client():
+  """One connection to a game server."""
+
+  def __init__(self, reader: asyncio.StreamReader,
+               writer: asyncio.StreamWriter):
+    self._reader = reader
+    self._writer = writer
+
+  @classmethod
+  async def connect(cls,
+                    host: Optional[str] = None,
+                    port: Optional[int] = None,
+                    unix_path: Optional[str] = None) -> "Client":
+    if unix_path is not None:
+      reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+      reader, writer = await asyncio.open_connection(host, port)
+    return cls(reader, writer)
+
+  async def request(self, **request) -> dict:
+    self._writer.write(json.dumps(request).encode("utf-8") + b"\n")
+    await self._writer.drain()
+    line = await self._reader.readline()
+    if not line:
+      raise ConnectionError("The server closed the connection.")
+    return json.loads(line)
+
+  async def close(self):
+    self._writer.close()
+    try:
+      await self._writer.wait_closed()
+    except OSError:
+      pass
+
+
+class LoadReport(NamedTuple):
+  connections: int
+  games: int
+  errors: int
+  elapsed: float
+  # Seconds per guess request, sorted.
+  latencies: List[float]
+
+  def percentile(self, q: float) -> float:
+    """Returns the `q`th percentile guess latency, in seconds."""
+    if not self.latencies:
+      return 0.0
+    idx = min(len(self.latencies) - 1, int(q / 100 * len(self.latencies)))
+    return self.latencies[idx]
+
+  def report(self) -> str:
+    guesses = len(self.latencies)
+    return "\n".join([
+        f"{self.connections} connections, {self.games} games, "
+        f"{guesses} guesses, {self.errors} errors in {self.elapsed:.2f}s "
+        f"({guesses / max(self.elapsed, 1e-9):.1f} guesses/sec)",
+        f"guess latency: p50={self.percentile(50) * 1000:.2f}ms "
+        f"p99={self.percentile(99) * 1000:.2f}ms "
+        f"max={self.percentile(100) * 1000:.2f}ms",
+    ])
+
+
+async def run_load(connections: int,
+                   games_per_connection: int,
+                   target_length: int = 5,
+                   total_guesses: int = 6,
+                   host: Optional[str] = None,
+                   port: Optional[int] = None,
+                   unix_path: Optional[str] = None,
+                   seed: int = 0,
+                   words: Optional[word_list.WordList] = None) -> LoadReport:
+  """Plays games over `connections` concurrent connections.
+
+  Each connection guesses random valid words until its game ends."""
+  if words is None:
+    words = word_list.WordList()
+  bucket = words.get_words(target_length)
+  encoded = words.get_encoded(target_length)
+  guesses = [
+      bucket[i]
+      for i, valid in enumerate(check.valid_word_mask(encoded))
+      if valid
+  ]
+  if not guesses:
+    raise ValueError(f"There are no words of length {target_length}.")
+  latencies = []
+  errors = 0
+
+  async def play(connection: int):
+    nonlocal errors
+    rng = random.Random(f"{seed}:{connection}")
+    try:
+      client = await Client.connect(host, port, unix_path)
+    except OSError:
+      errors += games_per_connection
+      return
+    try:
+      for _ in range(games_per_connection):
+        reply = await client.request(
+            op="new", length=target_length, guesses=total_guesses)
+        if not reply["ok"]:
+          errors += 1
+          continue
+        game = reply["game"]
+        while reply["ok"] and reply["status"] == "ACTIVE":
+          start = time.perf_counter()
+          reply = await client.request(
+              op="guess", game=game, word=rng.choice(guesses))
+          latencies.append(time.perf_counter() - start)
+        if not reply["ok"]:
+          errors += 1
+    except OSError:
+      errors += 1
+    finally:
+      await client.close()
+
+  start = time.perf_counter()
+  await asyncio.gather(*(play(i) for i in range(connections)))
+  elapsed = time.perf_counter() - start
+  return LoadReport(
+      connections=connections,
+      games=connections * games_per_connection,
+      errors=errors,
+      elapsed=elapsed,
+      latencies=sorted(latencies))
@@ -0,0 +1,121 @@
+"""Precomputed guess x target pattern tables, cached on disk.
+
+For every word length, the table holds `check.get_pattern_codes` for every word
+of that length against every other word, in the order of
+`WordList.get_words`. Tables are stored as `.npy` files keyed by the word
+list's fingerprint and are memory-mapped on load, so many processes share one
+page-cache copy. Once `tordle build-patterns` has cached a table, the solver
+reads its patterns from there instead of computing them.
+"""
+import os
+import pathlib
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from . import check, word_list
+
+_CACHE_DIR_ENV = "TORDLE_CACHE_DIR"
+
+# Number of guess rows scored before they are written to the memory map.
+_BUILD_BLOCK_ROWS = 512
+
+# The tables opened by `find_pattern_table`, by path.
+_open_tables: Dict[pathlib.Path, np.ndarray] = {}
+
+
+def default_cache_dir() -> pathlib.Path:
+  """Returns $TORDLE_CACHE_DIR, or a `tordle` dir in the user's cache."""
+  if os.environ.get(_CACHE_DIR_ENV):
+    return pathlib.Path(os.environ[_CACHE_DIR_ENV])
+  cache_home = os.environ.get("XDG_CACHE_HOME")
+  if cache_home:
+    return pathlib.Path(cache_home).joinpath("tordle")
+  return pathlib.Path.home().joinpath(".cache", "tordle")
+
+
+def get_table_path(words: word_list.WordList,
+                   length: int,
+                   cache_dir: Optional[pathlib.Path] = None) -> pathlib.Path:
+  if cache_dir is None:
+    cache_dir = default_cache_dir()
+  name = f"patterns-{words.fingerprint()[:16]}-{length}.npy"
+  return pathlib.Path(cache_dir).joinpath(name)
+
+
+def build_pattern_table(
+    words: word_list.WordList,
+    length: int,
+    cache_dir: Optional[pathlib.Path] = None) -> pathlib.Path:
+  """Computes the pattern table for `length` and writes it to the cache.
+
+  The table is written to a temporary file first and then renamed, so readers
+  never observe a partial table."""
+  path = get_table_path(words, length, cache_dir)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  encoded = words.get_encoded(length)
+  num_words = encoded.shape[0]
+  tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+  table = np.lib.format.open_memmap(
+      tmp_path,
+      mode="w+",
+      dtype=check.pattern_dtype(length),
+      shape=(num_words, num_words))
+  try:
+    for start in range(0, num_words, _BUILD_BLOCK_ROWS):
+      end = start + _BUILD_BLOCK_ROWS
+      table[start:end] = check.get_pattern_codes(encoded[start:end], encoded)
+    table.flush()
+    del table
+    os.replace(tmp_path, path)
+  finally:
+    if tmp_path.exists():
+      tmp_path.unlink()
+  return path
+
+
+def build_pattern_tables(
+    words: word_list.WordList,
+    cache_dir: Optional[pathlib.Path] = None,
+    lengths: Optional[Iterable[int]] = None) -> Dict[int, pathlib.Path]:
+  """Builds the missing pattern tables of `lengths`, defaulting to all."""
+  if lengths is None:
+    lengths = words.lengths()
+  paths = {}
+  for length in lengths:
+    path = get_table_path(words, length, cache_dir)
+    if not path.is_file():
+      path = build_pattern_table(words, length, cache_dir)
+    paths[length] = path
+  return paths
+
+
+def load_pattern_table(words: word_list.WordList,
+                       length: int,
+                       cache_dir: Optional[pathlib.Path] = None,
+                       build: bool = True) -> np.ndarray:
+  """Returns the read-only, memory-mapped pattern table for `length`.
+
+  Builds the table first if it is not cached and `build` is set. Otherwise a
+  missing table raises a FileNotFoundError."""
+  path = get_table_path(words, length, cache_dir)
+  if not path.is_file():
+    if not build:
+      raise FileNotFoundError(f"No pattern table for length {length} at "
+                              f"'{path}'.")
+    build_pattern_table(words, length, cache_dir)
+  return np.load(path, mmap_mode="r")
+
+
+def find_pattern_table(
+    words: word_list.WordList,
+    length: int,
+    cache_dir: Optional[pathlib.Path] = None) -> Optional[np.ndarray]:
+  """Returns the memory-mapped pattern table for `length` if it is cached, or
+  None. Each table is only opened once per process."""
+  path = get_table_path(words, length, cache_dir)
+  table = _open_tables.get(path)
+  if table is None and path.is_file():
+    table = np.load(path, mmap_mode="r")
+    _open_tables[path] = table
+  return table
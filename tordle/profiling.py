@@ -0,0 +1,212 @@
+"""Opt-in timing of the hot paths.
+
+Functions and methods marked with `timed` are only registered, and run
+unchanged, so instrumentation costs nothing until `enable` is called. Enabling
+swaps each registered attribute of its module or class for a wrapper that
+counts calls and errors and records each latency in a log2 histogram.
+
+Callers reach these functions through their module or class (`check.get_hints`,
+`sess.guess`), so the swap is seen everywhere. Code that holds on to a
+function from before `enable` keeps calling the original.
+
+Set `TORDLE_PROFILE=1` or pass `tordle --profile` to print a summary on exit.
+"""
+import atexit
+import functools
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+
+# Latencies in [2**(i-1), 2**i) nanoseconds land in bucket i.
+_NUM_BUCKETS = 64
+
+# Setting this to 1 has the same effect as `tordle --profile`.
+ENV_VAR = "TORDLE_PROFILE"
+
+
+class _Target(NamedTuple):
+  name: str
+  module: str
+  qualname: str
+  function: Callable
+
+
+class Timer():
+  """The calls, errors and latency histogram of one function."""
+  __slots__ = ("name", "calls", "errors", "total_ns", "max_ns", "buckets")
+
+  def __init__(self, name: str):
+    self.name = name
+    self.calls = 0
+    self.errors = 0
+    self.total_ns = 0
+    self.max_ns = 0
+    self.buckets = [0] * _NUM_BUCKETS
+
+  def record(self, elapsed_ns: int):
+    self.calls += 1
+    self.total_ns += elapsed_ns
+    if elapsed_ns > self.max_ns:
+      self.max_ns = elapsed_ns
+    self.buckets[min(elapsed_ns.bit_length(), _NUM_BUCKETS - 1)] += 1
+
+  def percentile(self, q: float) -> int:
+    """An upper bound on the `q`th percentile latency, in nanoseconds."""
+    if not self.calls:
+      return 0
+    rank = q / 100 * self.calls
+    seen = 0
+    for bucket, count in enumerate(self.buckets):
+      seen += count
+      if count and seen >= rank:
+        return min(1 << bucket, self.max_ns)
+    return self.max_ns
+
+
+_targets: List[_Target] = []
+_timers: Dict[str, Timer] = {}
+# The (owner, attribute, original) of every swapped function, for `disable`.
+_patched: List[tuple] = []
+_enabled = False
+
+
+def _get_name(function: Callable) -> str:
+  module = function.__module__
+  if module.startswith("tordle."):
+    module = module[len("tordle."):]
+  return f"{module}.{function.__qualname__}"
+
+
+def _wrap(name: str, function: Callable) -> Callable:
+  timer = _timers.setdefault(name, Timer(name))
+  clock = time.perf_counter_ns
+
+  @functools.wraps(function)
+  def wrapper(*args, **kwargs):
+    start = clock()
+    try:
+      return function(*args, **kwargs)
+    except BaseException:
+      timer.errors += 1
+      raise
+    finally:
+      timer.record(clock() - start)
+
+  return wrapper
+
+
+def timed(function: Callable) -> Callable:
+  """Registers a module-level function or a method to be timed once
+  profiling is enabled."""
+  name = _get_name(function)
+  if _enabled:
+    return _wrap(name, function)
+  _targets.append(
+      _Target(name, function.__module__, function.__qualname__, function))
+  return function
+
+
+def _find_owner(target: _Target) -> Optional[object]:
+  owner = sys.modules.get(target.module)
+  *path, attribute = target.qualname.split(".")
+  for part in path:
+    owner = getattr(owner, part, None)
+  if owner is None or vars(owner).get(attribute) is not target.function:
+    return None
+  return owner
+
+
+def is_enabled() -> bool:
+  return _enabled
+
+
+def enable():
+  """Starts timing every registered function."""
+  global _enabled
+  if _enabled:
+    return
+  _enabled = True
+  for target in _targets:
+    owner = _find_owner(target)
+    if owner is None:
+      continue
+    attribute = target.qualname.rsplit(".", 1)[-1]
+    setattr(owner, attribute, _wrap(target.name, target.function))
+    _patched.append((owner, attribute, target.function))
+
+
+def disable():
+  """Restores the original functions. The recorded timings are kept."""
+  global _enabled
+  while _patched:
+    owner, attribute, function = _patched.pop()
+    setattr(owner, attribute, function)
+  _enabled = False
+
+
+def reset():
+  """Forgets every recorded timing."""
+  for timer in _timers.values():
+    timer.__init__(timer.name)
+
+
+def get_timers() -> List[Timer]:
+  """Returns the timers of every function called so far, slowest first."""
+  timers = [t for t in _timers.values() if t.calls]
+  return sorted(timers, key=lambda t: (-t.total_ns, t.name))
+
+
+def _format_ns(ns: float) -> str:
+  for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+    if ns >= scale:
+      return f"{ns / scale:.1f}{unit}"
+  return f"{ns:.0f}ns"
+
+
+def format_summary(histograms: bool = False) -> str:
+  """Returns a plain text table of the timings, slowest first.
+
+  With `histograms`, each row is followed by its non-empty buckets, written
+  as `<upper bound>:<count>`."""
+  header = ("function", "calls", "errors", "total", "mean", "p50", "p99", "max")
+  rows = [header]
+  buckets = []
+  for timer in get_timers():
+    rows.append(
+        (timer.name, str(timer.calls), str(timer.errors),
+         _format_ns(timer.total_ns), _format_ns(timer.total_ns / timer.calls),
+         _format_ns(timer.percentile(50)), _format_ns(timer.percentile(99)),
+         _format_ns(timer.max_ns)))
+    buckets.append(" ".join(f"<{_format_ns(1 << i)}:{count}"
+                            for i, count in enumerate(timer.buckets)
+                            if count))
+  widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+  lines = []
+  for i, row in enumerate(rows):
+    cells = [row[0].ljust(widths[0])]
+    cells += [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+    lines.append("  ".join(cells))
+    if histograms and i > 0:
+      lines.append("  " + buckets[i - 1])
+  return "\n".join(lines) + "\n"
+
+
+def dump(out: Optional[TextIO] = None, histograms: bool = False):
+  """Writes the summary to `out`, stderr by default."""
+  out = sys.stderr if out is None else out
+  out.write(format_summary(histograms))
+  out.flush()
+
+
+def dump_at_exit(path: Optional[str] = None):
+  """Writes the summary when the process exits, to `path` with histograms or
+  to stderr without."""
+
+  def _dump():
+    if path is None:
+      dump()
+    else:
+      with open(path, "w") as out:
+        dump(out, histograms=True)
+
+  atexit.register(_dump)
@@ -0,0 +1,215 @@
+"""An asyncio server that hosts many games over TCP or a Unix socket.
+
+Clients send one JSON object per line and get one JSON object back per line.
+Every request has an "op":
+
+- {"op": "new", "length": 5, "guesses": 6, "hard": false, "evil": false}
+  starts a game and returns its "game" id. All fields but "op" are optional.
+  Instead of a random target, "daily": true plays today's puzzle and
+  "seed": "..." the seed's target, the same on every server.
+- {"op": "guess", "game": ID, "word": "CRANE"} returns the "hints" (one of
+  "MISS", "CLOSE" or "HIT" per letter), the "pattern" code and the game state.
+- {"op": "give_up", "game": ID} ends the game.
+- {"op": "state", "game": ID} returns the game state.
+
+Replies have "ok": true, or "ok": false and an "error" message. The target is
+only revealed once a game is over. Games are not tied to a connection, and are
+evicted once they have been idle for too long. With a `game_log.GameLogWriter`,
+every game is appended to the log.
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, Optional
+
+from . import check, game_log, session, word_list
+
+_DEFAULT_LENGTH = 5
+_DEFAULT_GUESSES = 6
+
+# Bursts of new connections queue up here instead of being refused.
+_BACKLOG = 4096
+
+
+class _Game():
+  __slots__ = ("session", "lock", "last_used")
+
+  def __init__(self, sess: session.Session):
+    self.session = sess
+    self.lock = asyncio.Lock()
+    self.last_used = time.monotonic()
+
+
+class GameServer():
+
+  def __init__(self,
+               words: Optional[word_list.WordList] = None,
+               idle_timeout: float = 600.0,
+               log: Optional[game_log.GameLogWriter] = None):
+    self._words = word_list.WordList() if words is None else words
+    self._log = log
+    self._idle_timeout = idle_timeout
+    self._games: Dict[str, _Game] = {}
+    self._game_ids = itertools.count()
+    self._evict_task = None
+
+  @property
+  def game_count(self) -> int:
+    return len(self._games)
+
+  async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+    self._start_evicting()
+    return await asyncio.start_server(
+        self._handle_connection, host, port, backlog=_BACKLOG)
+
+  async def start_unix(self, path: str) -> asyncio.AbstractServer:
+    self._start_evicting()
+    return await asyncio.start_unix_server(
+        self._handle_connection, path, backlog=_BACKLOG)
+
+  def close(self):
+    if self._evict_task is not None:
+      self._evict_task.cancel()
+      self._evict_task = None
+
+  def _start_evicting(self):
+    if self._evict_task is None:
+      self._evict_task = asyncio.get_running_loop().create_task(
+          self._evict_loop())
+
+  async def _evict_loop(self):
+    while True:
+      await asyncio.sleep(self._idle_timeout / 2)
+      self.evict_idle()
+
+  def evict_idle(self, now: Optional[float] = None) -> int:
+    """Drops the games that have been idle too long. Returns how many.
+
+    Games still in play are given up, so the log records how they ended."""
+    if now is None:
+      now = time.monotonic()
+    idle = [
+        game_id for game_id, game in self._games.items()
+        if now - game.last_used > self._idle_timeout and not game.lock.locked()
+    ]
+    for game_id in idle:
+      self._games.pop(game_id).session.give_up()
+    return len(idle)
+
+  async def _handle_connection(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter):
+    try:
+      while True:
+        try:
+          line = await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+          reply = {"ok": False, "error": "Request line is too long."}
+          writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+          break
+        if not line:
+          break
+        if not line.strip():
+          continue
+        try:
+          reply = await self.handle_request(json.loads(line))
+        except (ValueError, RecursionError):
+          # Invalid JSON, a line that is not UTF-8, or nesting too deep to
+          # parse.
+          reply = {"ok": False, "error": "Requests must be JSON objects."}
+        writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+        await writer.drain()
+    except ConnectionError:
+      pass
+    finally:
+      writer.close()
+
+  async def handle_request(self, request: dict) -> dict:
+    """Applies one request and returns the reply."""
+    if not isinstance(request, dict):
+      return {"ok": False, "error": "Requests must be JSON objects."}
+    op = request.get("op")
+    try:
+      if op == "new":
+        return self._new_game(request)
+      game_id = request.get("game")
+      game = self._games.get(game_id)
+      if game is None:
+        return {"ok": False, "error": f"Unknown game: {game_id}"}
+      async with game.lock:
+        game.last_used = time.monotonic()
+        if op == "guess":
+          return self._guess(game_id, game, request)
+        if op == "give_up":
+          game.session.give_up()
+          return self._get_state(game_id, game)
+        if op == "state":
+          return self._get_state(game_id, game)
+      return {"ok": False, "error": f"Unknown op: {op}"}
+    except (TypeError, ValueError, OverflowError) as e:
+      return {"ok": False, "error": str(e)}
+
+  def _new_game(self, request: dict) -> dict:
+    length = int(request.get("length", _DEFAULT_LENGTH))
+    total_guesses = int(request.get("guesses", _DEFAULT_GUESSES))
+    hard_mode = bool(request.get("hard", False))
+    if request.get("evil", False):
+      sess = session.EvilSession(
+          target_length=length,
+          total_guesses=total_guesses,
+          words=self._words,
+          hard_mode=hard_mode,
+          log=self._log)
+    else:
+      if request.get("daily", False):
+        target = self._words.get_daily_word(length)
+      elif request.get("seed") is not None:
+        target = self._words.get_seeded_word(length, str(request["seed"]))
+      else:
+        target = self._get_random_target(length)
+      if target is None:
+        raise ValueError(f"There are no words of length {length}.")
+      sess = session.Session(
+          target=target,
+          total_guesses=total_guesses,
+          words=self._words,
+          hard_mode=hard_mode,
+          log=self._log)
+    game_id = str(next(self._game_ids))
+    game = _Game(sess)
+    self._games[game_id] = game
+    return self._get_state(game_id, game)
+
+  def _get_random_target(self, length: int) -> Optional[str]:
+    # The daily order skips words with punctuation, which cannot be guessed.
+    order = self._words.get_daily_order(length)
+    if len(order) == 0:
+      return None
+    return self._words.get_words(length)[random.choice(order)]
+
+  def _guess(self, game_id: str, game: _Game, request: dict) -> dict:
+    word = request.get("word")
+    if not isinstance(word, str):
+      raise ValueError("Expected a 'word' to guess.")
+    hints = game.session.guess(word)
+    reply = self._get_state(game_id, game)
+    reply["hints"] = [h.name for h in hints]
+    reply["pattern"] = check.hints_to_pattern(hints)
+    return reply
+
+  def _get_state(self, game_id: str, game: _Game) -> dict:
+    sess = game.session
+    state = {
+        "ok": True,
+        "game": game_id,
+        "status": sess.status.name,
+        "length": sess.target_length,
+        "total_guesses": sess.total_guesses,
+        "remaining_guesses": sess.remaining_guesses,
+        "guesses": sess.guess_history,
+        "patterns": sess.pattern_history,
+    }
+    if sess.status != session.SessionStatus.ACTIVE:
+      state["target"] = sess.target
+    return state
@@ -1,7 +1,63 @@
 import enum
-from typing import Dict, List, Optional
+import random
+import string
+from collections import abc
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence
 
-from . import check, util, word_list
+import numpy as np
+
+from . import check, letter_index, profiling, util, word_list
+
+
+def find_candidates(
+    words: word_list.WordList, length: int, guess_history: Iterable[str],
+    hint_history: Iterable[Sequence[check.HintCategory]]) -> np.ndarray:
+  """Returns the answers consistent with every hint in the history.
+
+  The result holds indices into `words.get_words(length)`."""
+  guess_history = list(guess_history)
+  hint_history = list(hint_history)
+  constraints = check.HintConstraints(length)
+  for guess, hint in zip(guess_history, hint_history):
+    constraints.update(util.clean_text(guess), hint)
+  candidates = letter_index.get_letter_index(words, length).indices(constraints)
+  # The constraints are exact for hints that some target could produce. Hints
+  # typed in by hand might not be, so check the few words that are left.
+  for guess, hint in zip(guess_history, hint_history):
+    candidates = narrow_candidates(words, candidates, guess, hint)
+  return candidates
+
+
+def narrow_candidates(words: word_list.WordList, candidates: np.ndarray,
+                      guess: str,
+                      hint: Sequence[check.HintCategory]) -> np.ndarray:
+  """Returns the candidates that would produce `hint` for `guess`."""
+  encoded = words.get_encoded(len(guess))
+  codes = check.get_pattern_codes(
+      check.encode_words([guess]), encoded[candidates])[0]
+  return candidates[codes == check.hints_to_pattern(hint)]
+
+
+class _HintAlphabetView(abc.Mapping):
+  """A read-only mapping from each letter to its best hint so far.
+
+  Backed by the first bytes of a session's state, one per letter, holding the
+  `HintCategory` value or 0 for letters that have not been guessed."""
+
+  def __init__(self, alphabet: bytearray):
+    self._alphabet = alphabet
+
+  def __getitem__(self, char: str) -> Optional[check.HintCategory]:
+    if len(char) != 1 or char not in check.VALID_CHARS:
+      raise KeyError(char)
+    value = self._alphabet[ord(char) - ord("A")]
+    return check.HintCategory(value) if value else None
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(string.ascii_uppercase)
+
+  def __len__(self) -> int:
+    return len(string.ascii_uppercase)
 
 
 class SessionStatus(enum.Enum):
@@ -12,20 +68,59 @@ class SessionStatus(enum.Enum):
 
 
 class Session():
+  """One game of tordle.
+
+  Sessions are compact so that a server can host many at once. Besides the
+  shared, read-only `WordList`, all of the state lives in one bytearray: the
+  best hint per letter, the target, and then each guess as ASCII bytes
+  followed by its base-3 pattern code. The candidate set and the hard-mode
+  constraints are only built for sessions that use them.
+
+  With a `log` (a `game_log.GameLogWriter`), the session appends its start,
+  each guess and its end to the log.
 
-  def __init__(self, target: str, total_guesses: int,
-               words: word_list.WordList):
+  A 5 letter session with one guess made takes about 230 bytes, so a million
+  of them fit in well under 512 MiB. See `benchmarks/test_session_memory.py`.
+  """
+  __slots__ = ("_status", "_total_guesses", "_words", "_hard_mode",
+               "_target_length", "_code_width", "_state", "_constraints",
+               "_candidates", "_log")
+
+  # The state starts with one byte per letter for the hint alphabet, followed
+  # by the target.
+  _TARGET_OFFSET = len(string.ascii_uppercase)
+
+  def __init__(self,
+               target: str,
+               total_guesses: int,
+               words: word_list.WordList,
+               hard_mode: bool = False,
+               log=None):
     try:
       check.validate_word(target, words)
       if total_guesses <= 0:
         raise ValueError("Expected total_guesses to be positive. "
                          f"Got: {total_guesses}")
-      self._target = util.clean_text(target)
+      target = util.clean_text(target)
       self._total_guesses = total_guesses
       self._status = SessionStatus.ACTIVE
-      self._guess_history = []
-      self._hint_history = []
       self._words = words
+      self._hard_mode = hard_mode
+      self._target_length = len(target)
+      self._code_width = check.pattern_dtype(len(target)).itemsize
+      self._state = bytearray(self._TARGET_OFFSET) + target.encode("ascii")
+      # Built on first use, then updated with each guess.
+      self._constraints = None
+      # Indices into `words.get_words(len(target))` of the answers that are
+      # consistent with every hint so far. Built on first use.
+      self._candidates = None
+      self._log = None
+      if log is not None:
+        self._log = log.start_game(
+            target,
+            total_guesses,
+            hard_mode=hard_mode,
+            evil=isinstance(self, EvilSession))
     except ValueError as e:
       self._status = SessionStatus.ERROR
       raise e
@@ -39,53 +134,363 @@ class Session():
     return self._words
 
   @property
-  def target(self):
-    return self._target
+  def target(self) -> str:
+    return self._state[self._TARGET_OFFSET:self._TARGET_OFFSET +
+                       self._target_length].decode("ascii")
+
+  def _set_target(self, target: str):
+    self._state[self._TARGET_OFFSET:self._TARGET_OFFSET +
+                self._target_length] = target.encode("ascii")
+
+  @property
+  def target_id(self) -> int:
+    """The `WordList.word_id` of the target."""
+    return self.words.word_id(self.target)
+
+  @property
+  def target_length(self) -> int:
+    return self._target_length
 
   @property
   def total_guesses(self):
     return self._total_guesses
 
+  @property
+  def hard_mode(self):
+    return self._hard_mode
+
+  @property
+  def constraints(self) -> check.HintConstraints:
+    """What the hints so far reveal about the target."""
+    if self._constraints is None:
+      constraints = check.HintConstraints(self._target_length)
+      for guess, hint in zip(self.guess_history, self.hint_history):
+        constraints.update(guess, hint)
+      self._constraints = constraints
+    return self._constraints
+
+  @property
+  def _history_offset(self) -> int:
+    return self._TARGET_OFFSET + self._target_length
+
+  @property
+  def _record_width(self) -> int:
+    return self._target_length + self._code_width
+
   @property
   def guess_count(self):
-    return len(self._guess_history)
+    return (len(self._state) - self._history_offset) // self._record_width
 
   @property
   def remaining_guesses(self):
     return self.total_guesses - self.guess_count
 
   @property
-  def guess_history(self):
-    return self._guess_history
+  def guess_history(self) -> List[str]:
+    start = self._history_offset
+    return [
+        self._state[i:i + self._target_length].decode("ascii")
+        for i in range(start, len(self._state), self._record_width)
+    ]
 
   @property
-  def hint_history(self):
-    return self._hint_history
+  def pattern_history(self) -> List[int]:
+    """The base-3 pattern code of each guess. See `check.hints_to_pattern`."""
+    start = self._history_offset + self._target_length
+    return [
+        int.from_bytes(self._state[i:i + self._code_width], "little")
+        for i in range(start, len(self._state), self._record_width)
+    ]
+
+  @property
+  def hint_history(self) -> List[check.Hints]:
+    return [
+        check.pattern_to_hints(code, self._target_length)
+        for code in self.pattern_history
+    ]
+
+  @profiling.timed
+  def guess(self, guess: str) -> check.Hints:
+    self._validate_active()
+    return self.guess_id(
+        check.resolve_guess(guess, self._target_length, self.words))
+
+  @profiling.timed
+  def guess_id(self, guess_id: int) -> check.Hints:
+    """Makes the guess with `WordList.word_id` `guess_id`.
+
+    The word was validated when it was resolved to an ID, so this skips
+    cleaning and validating it again."""
+    self._validate_active()
+    guess = self._get_guess_word(guess_id)
+    hint = check.get_valid_hints(guess, self.target, self.words)
+    if self.hard_mode:
+      check.validate_hard_mode(guess, self.constraints)
+    self._record(guess, hint)
+    return hint
 
-  def guess(self, guess: str) -> List[check.HintCategory]:
+  def _record(self, guess: str, hint: check.Hints):
+    """Appends a valid, scored guess to the history and updates the status."""
+    target = self.target
+    if self._constraints is not None:
+      self._constraints.update(guess, hint)
+    self._update_alphabet(guess, hint)
+    pattern = check.hints_to_pattern(hint)
+    self._state += guess.encode("ascii")
+    self._state += pattern.to_bytes(self._code_width, "little")
+    if self._candidates is not None:
+      self._candidates = narrow_candidates(self.words, self._candidates, guess,
+                                           hint)
+    if guess == target:
+      self._status = SessionStatus.VICTORY
+    elif self.remaining_guesses == 0:
+      self._status = SessionStatus.DEFEAT
+    if self._log is not None:
+      self._log.guess(guess, pattern)
+      if self.status != SessionStatus.ACTIVE:
+        self._log.end(self.status == SessionStatus.VICTORY, False, target)
+
+  def _validate_active(self):
     if self.status != SessionStatus.ACTIVE:
       raise ValueError("Cannot make guesses in an inactive session. "
                        f"State: {self.status}")
     if self.remaining_guesses <= 0:
       raise ValueError("No guesses remaining.")
-    guess = util.clean_text(guess)
-    hint = check.get_hints(guess, self.target, self.words)
-    self._guess_history.append(guess)
-    self._hint_history.append(hint)
-    if check.is_correct(guess, self.target):
-      self._status = SessionStatus.VICTORY
-    elif self.remaining_guesses == 0:
-      self._status = SessionStatus.DEFEAT
-    return hint
+
+  def _get_guess_word(self, guess_id: int) -> str:
+    return check.get_guess_from_id(guess_id, self._target_length, self.words)
+
+  @property
+  def remaining_candidate_count(self) -> int:
+    """The number of answers that are still consistent with every hint."""
+    if self._candidates is None:
+      # Counting the bitset is cheaper than listing the words.
+      return letter_index.get_letter_index(
+          self.words, self._target_length).count(self.constraints)
+    return len(self._candidates)
+
+  def iter_candidates(self) -> Iterator[str]:
+    """Yields the answers that are still consistent with every hint."""
+    words = self.words.get_words(self._target_length)
+    for idx in self._get_candidates():
+      yield words[idx]
+
+  @property
+  def candidate_indices(self) -> np.ndarray:
+    """Indices into `words.get_words(len(target))` of the remaining answers.
+    """
+    return self._get_candidates()
+
+  def _get_candidates(self) -> np.ndarray:
+    # The first call filters the index by the constraints. After that,
+    # `guess` narrows the candidates by one hint at a time.
+    if self._candidates is None:
+      self._candidates = letter_index.get_letter_index(
+          self.words, self._target_length).indices(self.constraints)
+    return self._candidates
 
   def give_up(self):
+    if self._log is not None and self.status == SessionStatus.ACTIVE:
+      self._log.end(False, True, self.target)
     self._status = SessionStatus.DEFEAT
 
-  def get_hint_alphabet(self) -> Dict[str, Optional[check.HintCategory]]:
-    alphabet = {c: None for c in check.VALID_CHARS}
-    for chars, hints in zip(self.guess_history, self.hint_history):
-      for c, h in zip(chars, hints):
-        base = alphabet[c]
-        if base is None or base == check.HintCategory.CLOSE:
-          alphabet[c] = h
-    return alphabet
+  def _update_alphabet(self, guess: str, hint: Sequence[check.HintCategory]):
+    for c, h in zip(guess, hint):
+      idx = ord(c) - ord("A")
+      base = self._state[idx]
+      # A hit is final, but a close may turn into a hit or a miss.
+      if not base or base == check.HintCategory.CLOSE.value:
+        self._state[idx] = h.value
+
+  def get_hint_alphabet(self) -> Mapping[str, Optional[check.HintCategory]]:
+    """Returns a read-only view of the best hint so far for each letter."""
+    return _HintAlphabetView(self._state)
+
+  def get_min_count(self, char: str) -> int:
+    """The fewest times `char` can appear in the target, given the hints."""
+    return self.constraints.get_min_count(util.clean_text(char))
+
+  def get_exact_count(self, char: str) -> Optional[int]:
+    """How many times `char` appears in the target, if the hints tell."""
+    return self.constraints.get_exact_count(util.clean_text(char))
+
+
+class EvilSession(Session):
+  """A session that never commits to a target.
+
+  Each guess splits the words that are still possible by the hints they would
+  produce, and the session keeps the largest group. `target` is always one of
+  the words that are still possible."""
+  __slots__ = ()
+
+  def __init__(self,
+               target_length: int,
+               total_guesses: int,
+               words: word_list.WordList,
+               hard_mode: bool = False,
+               log=None):
+    candidates = words.get_answer_indices(target_length)
+    if len(candidates) == 0:
+      self._status = SessionStatus.ERROR
+      raise ValueError(f"There are no words of length {target_length}.")
+    target = words.get_words(target_length)[random.choice(candidates)]
+    super().__init__(
+        target=target,
+        total_guesses=total_guesses,
+        words=words,
+        hard_mode=hard_mode,
+        log=log)
+
+  @profiling.timed
+  def guess_id(self, guess_id: int) -> check.Hints:
+    if self.status == SessionStatus.ACTIVE and self.remaining_guesses > 0:
+      guess = self._get_guess_word(guess_id)
+      if self.hard_mode:
+        check.validate_hard_mode(guess, self.constraints)
+      self._pick_largest_partition(guess)
+    return super().guess_id(guess_id)
+
+  def _pick_largest_partition(self, guess: str):
+    candidates = self._get_candidates()
+    encoded = self.words.get_encoded(self.target_length)
+    codes = check.get_pattern_codes(
+        check.encode_words([guess]), encoded[candidates])[0]
+    patterns, counts = np.unique(codes, return_counts=True)
+    # Ties go to the lowest code, so a correct guess (the highest code) only
+    # wins once it is the sole remaining word.
+    largest = patterns[np.argmax(counts)]
+    self._candidates = candidates[codes == largest]
+    self._set_target(
+        self.words.get_words(self.target_length)[self._candidates[0]])
+
+
+class MultiSession():
+  """One game played on several boards at once, Quordle style.
+
+  Each guess is made on every board that is not solved yet. A board is a
+  plain `Session`, so it keeps its own history and status. The guess is
+  validated once and scored against every target in one batched
+  `check.get_pattern_codes` call. The game is won once every board is."""
+  __slots__ = ("_boards", "_words", "_total_guesses", "_hard_mode",
+               "_target_length", "_encoded_targets", "_guess_count")
+
+  def __init__(self,
+               targets: Sequence[str],
+               total_guesses: int,
+               words: word_list.WordList,
+               hard_mode: bool = False):
+    if not targets:
+      raise ValueError("Expected at least one target.")
+    self._boards = [
+        Session(
+            target=target,
+            total_guesses=total_guesses,
+            words=words,
+            hard_mode=hard_mode) for target in targets
+    ]
+    lengths = {board.target_length for board in self._boards}
+    if len(lengths) != 1:
+      raise ValueError(f"Expected targets of one length. Got: {targets}")
+    self._words = words
+    self._total_guesses = total_guesses
+    self._hard_mode = hard_mode
+    self._target_length = lengths.pop()
+    self._encoded_targets = check.encode_words(self.targets)
+    self._guess_count = 0
+
+  @property
+  def boards(self) -> List[Session]:
+    return self._boards
+
+  @property
+  def targets(self) -> List[str]:
+    return [board.target for board in self._boards]
+
+  @property
+  def words(self) -> word_list.WordList:
+    return self._words
+
+  @property
+  def target_length(self) -> int:
+    return self._target_length
+
+  @property
+  def total_guesses(self) -> int:
+    return self._total_guesses
+
+  @property
+  def hard_mode(self) -> bool:
+    return self._hard_mode
+
+  @property
+  def guess_count(self) -> int:
+    return self._guess_count
+
+  @property
+  def remaining_guesses(self) -> int:
+    return self._total_guesses - self._guess_count
+
+  @property
+  def status(self) -> SessionStatus:
+    statuses = {board.status for board in self._boards}
+    if SessionStatus.ACTIVE in statuses:
+      return SessionStatus.ACTIVE
+    if statuses == {SessionStatus.VICTORY}:
+      return SessionStatus.VICTORY
+    return SessionStatus.DEFEAT
+
+  @profiling.timed
+  def guess(self, guess: str) -> List[Optional[check.Hints]]:
+    """Makes a guess on every unsolved board.
+
+    Returns the hints of each board, or None for boards that were already
+    solved."""
+    self._validate_active()
+    return self.guess_id(
+        check.resolve_guess(guess, self._target_length, self.words))
+
+  @profiling.timed
+  def guess_id(self, guess_id: int) -> List[Optional[check.Hints]]:
+    self._validate_active()
+    guess = check.get_guess_from_id(guess_id, self._target_length, self.words)
+    active = [
+        i for i, board in enumerate(self._boards)
+        if board.status == SessionStatus.ACTIVE
+    ]
+    if self._hard_mode:
+      # Check every board before changing any of them.
+      for i in active:
+        check.validate_hard_mode(guess, self._boards[i].constraints)
+    codes = check.get_pattern_codes(
+        self.words.get_encoded_word(guess_id)[np.newaxis],
+        self._encoded_targets[active])[0]
+    hints = [None] * len(self._boards)
+    for i, code in zip(active, codes):
+      hints[i] = check.pattern_to_hints(code, self._target_length)
+      self._boards[i]._record(guess, hints[i])
+    self._guess_count += 1
+    return hints
+
+  def _validate_active(self):
+    if self.status != SessionStatus.ACTIVE:
+      raise ValueError("Cannot make guesses in an inactive session. "
+                       f"State: {self.status}")
+
+  def give_up(self):
+    """Ends the game. Boards that were already solved stay solved."""
+    for board in self._boards:
+      if board.status == SessionStatus.ACTIVE:
+        board.give_up()
+
+  def get_hint_alphabet(self) -> Mapping[str, Optional[check.HintCategory]]:
+    """Returns the best hint so far for each letter, over the boards that are
+    not solved yet, or over every board once the game is over."""
+    boards = [
+        board for board in self._boards if board.status == SessionStatus.ACTIVE
+    ] or self._boards
+    alphabet = bytearray(len(string.ascii_uppercase))
+    for board in boards:
+      for i, hint in enumerate(board.get_hint_alphabet().values()):
+        if hint is not None:
+          alphabet[i] = max(alphabet[i], hint.value)
+    return _HintAlphabetView(alphabet)
@@ -0,0 +1,236 @@
+import collections
+import concurrent.futures
+import json
+import random
+import time
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, TextIO)
+
+from . import session, solver, word_list
+
+# A strategy picks the next guess for an active session.
+Strategy = Callable[[session.Session, random.Random], str]
+
+# The word list and strategy of a worker process. See `_init_worker`.
+_worker_words = None
+_worker_strategy = None
+
+
+class RandomStrategy():
+  """Guesses a random word that is consistent with the hints so far."""
+
+  def __call__(self, sess: session.Session, rng: random.Random) -> str:
+    candidates = sess.candidate_indices
+    idx = candidates[rng.randrange(len(candidates))]
+    return sess.words.get_words(sess.target_length)[idx]
+
+
+class SolverStrategy():
+  """Guesses the word with the most expected information.
+
+  The opening guess does not depend on the target, so it is computed once per
+  word length and reused."""
+
+  def __init__(self, metric: solver.Metric = solver.Metric.ENTROPY):
+    self._metric = metric
+    self._openers = {}
+
+  def __call__(self, sess: session.Session, rng: random.Random) -> str:
+    if sess.guess_count > 0:
+      return solver.best_guess(sess, metric=self._metric)
+    key = (sess.target_length, sess.hard_mode)
+    if key not in self._openers:
+      self._openers[key] = solver.best_guess(sess, metric=self._metric)
+    return self._openers[key]
+
+
+STRATEGIES: Dict[str, Callable[[], Strategy]] = {
+    "random": RandomStrategy,
+    "solver": SolverStrategy,
+}
+
+
+class GameResult(NamedTuple):
+  game: int
+  target_length: int
+  total_guesses: int
+  target: str
+  won: bool
+  guesses: List[str]
+
+  def to_json(self) -> dict:
+    result = self._asdict()
+    result["guess_count"] = len(self.guesses)
+    return result
+
+
+class GameConfig(NamedTuple):
+  target_length: int
+  total_guesses: int
+  hard_mode: bool = False
+
+
+def play_game(words: word_list.WordList,
+              target: str,
+              total_guesses: int,
+              strategy: Strategy,
+              rng: random.Random,
+              hard_mode: bool = False,
+              game: int = 0) -> GameResult:
+  """Plays one game to completion without any UI."""
+  sess = session.Session(
+      target=target,
+      total_guesses=total_guesses,
+      words=words,
+      hard_mode=hard_mode)
+  while sess.status == session.SessionStatus.ACTIVE:
+    sess.guess(strategy(sess, rng))
+  return GameResult(
+      game=game,
+      target_length=len(target),
+      total_guesses=total_guesses,
+      target=sess.target,
+      won=sess.status == session.SessionStatus.VICTORY,
+      guesses=list(sess.guess_history))
+
+
+def play_games(words: word_list.WordList, strategy: Strategy,
+               config: GameConfig, seed: int, start: int,
+               end: int) -> List[GameResult]:
+  """Plays games `start` to `end`.
+
+  Game `i` is seeded from (`seed`, `i`), so it plays out the same no matter
+  which process runs it."""
+  targets = words.get_answer_indices(config.target_length)
+  if len(targets) == 0:
+    raise ValueError(f"There are no words of length {config.target_length}.")
+  bucket = words.get_words(config.target_length)
+  results = []
+  for game in range(start, end):
+    rng = random.Random(f"{seed}:{config.target_length}:{game}")
+    target = bucket[targets[rng.randrange(len(targets))]]
+    results.append(
+        play_game(
+            words,
+            target,
+            config.total_guesses,
+            strategy,
+            rng,
+            hard_mode=config.hard_mode,
+            game=game))
+  return results
+
+
+def run_simulation(
+    num_games: int,
+    config: GameConfig,
+    strategy: str = "random",
+    seed: int = 0,
+    processes: Optional[int] = None,
+    chunk_size: int = 1000,
+    words: Optional[word_list.WordList] = None) -> Iterator[List[GameResult]]:
+  """Plays `num_games` games and yields the results one chunk at a time.
+
+  With `processes` > 1 the chunks are played across a process pool, where
+  each worker loads the default word list once. Chunks are yielded in order.
+  """
+  bounds = list(range(0, num_games, chunk_size)) + [num_games]
+  ranges = list(zip(bounds[:-1], bounds[1:]))
+  if processes is None or processes <= 1:
+    if words is None:
+      words = word_list.WordList()
+    strategy_fn = STRATEGIES[strategy]()
+    for start, end in ranges:
+      yield play_games(words, strategy_fn, config, seed, start, end)
+    return
+  if words is not None:
+    raise ValueError("Parallel simulations always use the default word list.")
+  with concurrent.futures.ProcessPoolExecutor(
+      max_workers=processes, initializer=_init_worker,
+      initargs=(strategy,)) as executor:
+    futures = [
+        executor.submit(_play_worker_games, config, seed, start, end)
+        for start, end in ranges
+    ]
+    for future in futures:
+      yield future.result()
+
+
+def _init_worker(strategy: str):
+  global _worker_words, _worker_strategy
+  _worker_words = word_list.WordList()
+  _worker_strategy = STRATEGIES[strategy]()
+
+
+def _play_worker_games(config: GameConfig, seed: int, start: int,
+                       end: int) -> List[GameResult]:
+  return play_games(_worker_words, _worker_strategy, config, seed, start, end)
+
+
+def write_jsonl(results: Iterable[GameResult], out: TextIO):
+  """Writes one JSON object per game."""
+  for result in results:
+    out.write(json.dumps(result.to_json()))
+    out.write("\n")
+
+
+def write_columnar(results: List[GameResult], out: TextIO):
+  """Writes one JSON object per chunk, holding one list per column."""
+  rows = [r.to_json() for r in results]
+  if not rows:
+    return
+  columns = {name: [row[name] for row in rows] for name in rows[0]}
+  out.write(json.dumps(columns))
+  out.write("\n")
+
+
+class SimulationSummary():
+  """Aggregates results into win rates and guess histograms."""
+
+  def __init__(self):
+    self._start = time.perf_counter()
+    self._games = collections.Counter()
+    self._wins = collections.Counter()
+    self._histograms = collections.defaultdict(collections.Counter)
+
+  def add(self, result: GameResult):
+    key = (result.target_length, result.total_guesses)
+    self._games[key] += 1
+    if result.won:
+      self._wins[key] += 1
+      self._histograms[key][len(result.guesses)] += 1
+
+  @property
+  def total_games(self) -> int:
+    return sum(self._games.values())
+
+  def win_rate(self, target_length: int, total_guesses: int) -> float:
+    key = (target_length, total_guesses)
+    if not self._games[key]:
+      return 0.0
+    return self._wins[key] / self._games[key]
+
+  def histogram(self, target_length: int, total_guesses: int) -> Dict[int, int]:
+    """Maps guess counts to the number of games won in that many guesses."""
+    return dict(self._histograms[(target_length, total_guesses)])
+
+  def report(self) -> str:
+    elapsed = time.perf_counter() - self._start
+    lines = [
+        f"{self.total_games} games in {elapsed:.2f}s "
+        f"({self.total_games / max(elapsed, 1e-9):.1f} games/sec)"
+    ]
+    for target_length, total_guesses in sorted(self._games):
+      games = self._games[(target_length, total_guesses)]
+      lines.append(f"length={target_length} guesses={total_guesses}: "
+                   f"{games} games, win rate "
+                   f"{self.win_rate(target_length, total_guesses):.1%}")
+      histogram = self.histogram(target_length, total_guesses)
+      widest = max(histogram.values(), default=0)
+      for count in range(1, total_guesses + 1):
+        wins = histogram.get(count, 0)
+        bar = "#" * (round(40 * wins / widest) if widest else 0)
+        lines.append(f"  {count:>3}: {wins:>8} {bar}")
+      losses = games - self._wins[(target_length, total_guesses)]
+      lines.append(f"    X: {losses:>8}")
+    return "\n".join(lines)
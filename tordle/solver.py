@@ -0,0 +1,193 @@
+import concurrent.futures
+import enum
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from . import check, letter_index, pattern_table, session, word_list
+
+# Upper bound on the number of (guess, candidate) pairs scored at once.
+_SCORE_BLOCK_PAIRS = 1 << 21
+
+# The arrays shared by every task of a worker process. See `_init_worker`.
+_worker_guesses = None
+_worker_candidates = None
+_worker_table = None
+
+
+class Metric(enum.Enum):
+  # The expected information of a guess, in bits. Higher is better.
+  ENTROPY = 1
+  # The expected number of candidates left after a guess. Lower is better.
+  EXPECTED_SIZE = 2
+
+
+def score_guesses(guesses: np.ndarray,
+                  candidates: np.ndarray,
+                  metric: Metric = Metric.ENTROPY,
+                  processes: Optional[int] = None,
+                  table: Optional[np.memmap] = None) -> np.ndarray:
+  """Scores every encoded guess against the encoded candidate targets.
+
+  With a `table` from `pattern_table.find_pattern_table`, `guesses` and
+  `candidates` are word indices instead, and their patterns are read from the
+  table rather than computed.
+
+  With `processes` > 1, the guesses are split across a process pool. The
+  arrays are handed to each worker once, when it starts, and every task only
+  carries the range of guesses to score. Workers map the table themselves."""
+  num_guesses = guesses.shape[0]
+  if processes is None or processes <= 1 or num_guesses == 0:
+    return _score_range(guesses, candidates, metric, 0, num_guesses, table)
+  # A few tasks per worker keeps them busy if some ranges finish early.
+  num_tasks = min(num_guesses, processes * 4)
+  bounds = np.linspace(0, num_guesses, num_tasks + 1, dtype=int)
+  with concurrent.futures.ProcessPoolExecutor(
+      max_workers=processes,
+      initializer=_init_worker,
+      initargs=(guesses, candidates,
+                None if table is None else table.filename)) as executor:
+    futures = [
+        executor.submit(_score_worker_range, metric, start, end)
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+    return np.concatenate([f.result() for f in futures])
+
+
+def best_guess(sess: session.Session,
+               metric: Metric = Metric.ENTROPY,
+               processes: Optional[int] = None) -> str:
+  """Returns the guess that best narrows down the session's candidates.
+
+  In hard mode, only words consistent with the hints so far are considered,
+  which are exactly the guesses hard mode allows. They include words that
+  cannot be the target when the list has a smaller set of answers."""
+  pool = None
+  if sess.hard_mode:
+    index = letter_index.get_letter_index(sess.words, sess.target_length)
+    pool = index.indices(sess.constraints, answers_only=False)
+  return _best_guess(
+      sess.words,
+      sess.target_length,
+      sess.candidate_indices,
+      metric=metric,
+      processes=processes,
+      pool=pool)
+
+
+def best_guess_from_history(guess_history: Iterable[str],
+                            hint_history: Iterable[Sequence[
+                                check.HintCategory]],
+                            words: word_list.WordList,
+                            length: int,
+                            metric: Metric = Metric.ENTROPY,
+                            processes: Optional[int] = None) -> str:
+  """Returns the best next guess for a game played outside a Session."""
+  candidates = session.find_candidates(words, length, guess_history,
+                                       hint_history)
+  return _best_guess(
+      words, length, candidates, metric=metric, processes=processes)
+
+
+def score_words(words: word_list.WordList,
+                length: int,
+                guesses: np.ndarray,
+                candidates: np.ndarray,
+                metric: Metric = Metric.ENTROPY,
+                processes: Optional[int] = None) -> np.ndarray:
+  """Like `score_guesses`, for the indices of words of `length`, through the
+  cached pattern table if there is one."""
+  table = pattern_table.find_pattern_table(words, length)
+  if table is not None:
+    return score_guesses(
+        guesses, candidates, metric=metric, processes=processes, table=table)
+  encoded = words.get_encoded(length)
+  return score_guesses(
+      encoded[guesses], encoded[candidates], metric=metric, processes=processes)
+
+
+def _best_guess(words: word_list.WordList,
+                length: int,
+                candidates: np.ndarray,
+                metric: Metric,
+                processes: Optional[int],
+                pool: Optional[np.ndarray] = None) -> str:
+  if len(candidates) == 0:
+    raise ValueError("No words are consistent with the hints.")
+  encoded = words.get_encoded(length)
+  # With two or fewer candidates, guessing one of them is always optimal.
+  if len(candidates) <= 2:
+    pool = candidates
+  elif pool is None:
+    pool = np.flatnonzero(check.valid_word_mask(encoded))
+  scores = score_words(
+      words, length, pool, candidates, metric=metric, processes=processes)
+  if metric == Metric.EXPECTED_SIZE:
+    scores = -scores
+  # Between equal scores, prefer a guess that could be the target.
+  is_candidate = np.isin(pool, candidates)
+  best = np.lexsort((is_candidate, scores))[-1]
+  return words.get_words(length)[pool[best]]
+
+
+def _init_worker(guesses: np.ndarray, candidates: np.ndarray,
+                 table_path: Optional[str]):
+  global _worker_guesses, _worker_candidates, _worker_table
+  _worker_guesses = guesses
+  _worker_candidates = candidates
+  _worker_table = None
+  if table_path is not None:
+    _worker_table = np.load(table_path, mmap_mode="r")
+
+
+def _score_worker_range(metric: Metric, start: int, end: int) -> np.ndarray:
+  return _score_range(_worker_guesses, _worker_candidates, metric, start, end,
+                      _worker_table)
+
+
+def _score_range(guesses: np.ndarray,
+                 candidates: np.ndarray,
+                 metric: Metric,
+                 start: int,
+                 end: int,
+                 table: Optional[np.memmap] = None) -> np.ndarray:
+  scores = np.zeros(end - start, dtype=np.float64)
+  num_candidates = candidates.shape[0]
+  if num_candidates == 0:
+    return scores
+  block_size = max(1, _SCORE_BLOCK_PAIRS // num_candidates)
+  for block_start in range(start, end, block_size):
+    block_end = min(end, block_start + block_size)
+    if table is None:
+      codes = check.get_pattern_codes(guesses[block_start:block_end],
+                                      candidates)
+    else:
+      codes = table[np.ix_(guesses[block_start:block_end], candidates)]
+    group_sizes = _get_group_sizes(codes)
+    if metric == Metric.ENTROPY:
+      # Each candidate contributes -log2(p) of its group, weighted by 1/n.
+      block_scores = np.log2(num_candidates) - np.log2(group_sizes).mean(axis=1)
+    elif metric == Metric.EXPECTED_SIZE:
+      block_scores = group_sizes.mean(axis=1)
+    else:
+      raise ValueError(f"Unsupported metric: {metric}")
+    scores[block_start - start:block_end - start] = block_scores
+  return scores
+
+
+def _get_group_sizes(codes: np.ndarray) -> np.ndarray:
+  """Returns, for each entry, how many entries in its row share its code.
+
+  The entries of each row come back in sorted order, which is all the metrics
+  need."""
+  codes = np.sort(codes, axis=1)
+  num_cols = codes.shape[1]
+  cols = np.broadcast_to(np.arange(num_cols), codes.shape)
+  is_start = np.ones(codes.shape, dtype=bool)
+  is_start[:, 1:] = codes[:, 1:] != codes[:, :-1]
+  is_end = np.ones(codes.shape, dtype=bool)
+  is_end[:, :-1] = is_start[:, 1:]
+  group_start = np.maximum.accumulate(np.where(is_start, cols, 0), axis=1)
+  group_end = np.minimum.accumulate(
+      np.where(is_end, cols, num_cols)[:, ::-1], axis=1)[:, ::-1]
+  return group_end - group_start + 1
@@ -1,59 +1,17 @@
+import itertools
+
 import click
-from rich import table
-from textual import app
-
-from . import render, session, util, widgets, word_list
-
-
-class TordleApp(app.App):
-
-  def __init__(self, *args, target_length: int, total_guesses: int,
-               alphabet: bool, **kwargs):
-    super().__init__(*args, **kwargs)
-    assert target_length >= 0
-    assert total_guesses >= 0
-    self._total_guesses = total_guesses
-    self._target_length = target_length
-    self._words = word_list.WordList()
-    self._session = session.Session(
-        target=self._words.get_random_word(self._target_length),
-        total_guesses=self._total_guesses,
-        words=self._words)
-    self._root_grid = widgets.RootGrid(self._session, show_alphabet=alphabet)
-
-  async def on_mount(self):
-    await self.view.dock(self._root_grid)
-
-  def on_key(self, event):
-    self._root_grid.error_panel.message = ""
-    if self._session.status != session.SessionStatus.ACTIVE:
-      if event.key == "escape":
-        exit()
-      return
-    try:
-      if event.key == "enter":
-        self._session.guess(self._root_grid.pending_guess.pending_guess)
-        self._root_grid.pending_guess.clear_guess()
-      elif event.key in {"ctrl+h", "delete"}:
-        self._root_grid.pending_guess.remove_letter()
-      elif event.key == "escape":
-        self._session.give_up()
-      elif len(event.key) == 1:
-        self._root_grid.pending_guess.add_letter(event.key)
-
-      if self._session.status == session.SessionStatus.VICTORY:
-        self._root_grid.title_panel.set_victory()
-      elif self._session.status == session.SessionStatus.DEFEAT:
-        self._root_grid.title_panel.set_defeat(self._session.target)
-      if self._session.status != session.SessionStatus.ACTIVE:
-        self._root_grid.error_panel.message = "Press Esc to Exit."
-    except ValueError as e:
-      self._root_grid.error_panel.message = str(e)
-    finally:
-      self._root_grid.refresh()
 
+from . import profiling
 
-@click.command()
+# The choices of `simulate.STRATEGIES` and `difficulty.BANDS`. They are
+# repeated here so that parsing arguments imports neither module, and numpy
+# with them. tests/test_startup.py keeps them in sync.
+_STRATEGIES = ("random", "solver")
+_BANDS = ("easy", "medium", "hard")
+
+
+@click.group(invoke_without_command=True)
 @click.option(
     "-l",
     "--target-length",
@@ -62,14 +20,412 @@ class TordleApp(app.App):
 @click.option(
     "-g",
     "--total-guesses",
-    default=6,
-    help="The number of guesses you have to get the right word.")
+    type=int,
+    default=None,
+    help="The number of guesses you have to get the right word. Defaults to "
+    "6, plus one per extra board.")
 @click.option(
     "--alphabet/--no-alphabet",
     default=True,
     help="Whether or not to show the 'hint alphabet' while guessing.")
-def main(**kwargs):
-  TordleApp.run(**kwargs)
+@click.option(
+    "--hard/--no-hard",
+    default=False,
+    help="Whether or not later guesses must use the hints revealed so far.")
+@click.option(
+    "--evil/--no-evil",
+    default=False,
+    help="Whether or not the target should dodge your guesses.")
+@click.option(
+    "--log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Append the game to this log. See 'tordle stats'.")
+@click.option(
+    "--daily/--no-daily",
+    default=False,
+    help="Play today's puzzle, the same everywhere.")
+@click.option(
+    "--seed",
+    default=None,
+    help="Pick the target from this seed, the same everywhere.")
+@click.option(
+    "--answers",
+    type=click.File("r"),
+    default=None,
+    help="Only pick targets from this file, one word per line.")
+@click.option(
+    "-b",
+    "--boards",
+    default=1,
+    help="Play this many boards at once. Each guess goes to every board.")
+@click.option(
+    "--difficulty",
+    "difficulty_band",
+    type=click.Choice(_BANDS),
+    default=None,
+    help="Only pick targets this hard for the solver. See "
+    "'tordle build-difficulty'.")
+@click.option(
+    "--profile/--no-profile",
+    default=False,
+    envvar=profiling.ENV_VAR,
+    help="Time the hot paths and print a summary on exit.")
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write the profile summary, with histograms, here instead.")
+@click.pass_context
+def main(ctx, profile, profile_output, **kwargs):
+  if profile:
+    profiling.enable()
+    profiling.dump_at_exit(profile_output)
+  if ctx.invoked_subcommand is None:
+    if kwargs["evil"] and (kwargs["daily"] or kwargs["seed"] is not None):
+      raise click.UsageError("--evil never picks a target, so it cannot be "
+                             "combined with --daily or --seed.")
+    if kwargs["daily"] and kwargs["seed"] is not None:
+      raise click.UsageError("Pass at most one of --daily and --seed.")
+    if kwargs["boards"] < 1:
+      raise click.UsageError("--boards must be at least 1.")
+    if kwargs["boards"] > 1 and (kwargs["evil"] or kwargs["log"] is not None):
+      raise click.UsageError("--boards cannot be combined with --evil or "
+                             "--log.")
+    if kwargs["difficulty_band"] is not None and (kwargs["evil"] or
+                                                  kwargs["daily"] or
+                                                  kwargs["seed"] is not None):
+      raise click.UsageError("--difficulty cannot be combined with --evil, "
+                             "--daily or --seed.")
+    if kwargs["total_guesses"] is None:
+      kwargs["total_guesses"] = 5 + kwargs["boards"]
+    from . import tui
+    tui.TordleApp.run(**kwargs)
+
+
+@main.command("build-patterns")
+@click.option(
+    "-l",
+    "--target-length",
+    "lengths",
+    multiple=True,
+    type=int,
+    help="Only build tables for these word lengths. Defaults to all lengths.")
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Where to store the tables. Defaults to $TORDLE_CACHE_DIR.")
+def build_patterns(lengths, cache_dir):
+  """Precomputes the guess x target pattern tables."""
+  from . import pattern_table, word_list
+  words = word_list.WordList()
+  paths = pattern_table.build_pattern_tables(
+      words, cache_dir=cache_dir, lengths=lengths or None)
+  for length, path in sorted(paths.items()):
+    click.echo(f"{length}: {path}")
+
+
+@main.command("compile-wordlist")
+@click.argument("source", type=click.File("r"))
+@click.argument("destination", type=click.Path(dir_okay=False))
+@click.option(
+    "--answers",
+    type=click.File("r"),
+    default=None,
+    help="The words that can be targets, one per line. Defaults to all.")
+def compile_wordlist(source, destination, answers):
+  """Compiles a text word list, one word per line, to the binary format."""
+  from . import word_list
+  word_list.compile_word_list(source, destination, answers=answers)
+
+
+@main.command("build-wordlist")
+@click.argument("sources", nargs=-1, type=click.File("r", errors="replace"))
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="Where to write the words, one per line.")
+@click.option(
+    "--capacity",
+    default=100000,
+    help="The most words counted per length. Bounds memory.")
+@click.option(
+    "--min-count", default=1, help="Drop words seen fewer times than this.")
+@click.option("--min-length", default=1, help="Drop shorter words.")
+@click.option("--max-length", type=int, default=None, help="Drop longer words.")
+@click.option(
+    "--top", type=int, default=None, help="Keep this many words per length.")
+@click.option(
+    "--compile",
+    "compiled",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Also write a compiled word list here.")
+@click.option(
+    "--answers",
+    type=int,
+    default=None,
+    help="With --compile, only the most frequent words of each length are "
+    "answers.")
+def build_wordlist(sources, output, capacity, min_count, min_length, max_length,
+                   top, compiled, answers):
+  """Builds a word list from text, by default from stdin.
+
+  Words are grouped by length and ranked by how often they appear."""
+  from . import corpus, word_list
+  counter = corpus.FrequencyCounter(capacity)
+  for source in sources or [click.open_file("-", errors="replace")]:
+    counter.update(corpus.iter_words(source, min_length, max_length))
+  ranked = corpus.get_ranked_words(counter, min_count=min_count, top=top)
+  corpus.write_ranked_words(ranked, output)
+  if compiled is not None:
+    all_words = [w for length in sorted(ranked) for w in ranked[length]]
+    answer_words = None
+    if answers is not None:
+      answer_words = [w for words in ranked.values() for w in words[:answers]]
+    word_list.compile_word_list(all_words, compiled, answers=answer_words)
+  message = f"{counter.total} words read, {len(ranked)} lengths"
+  if not counter.exact:
+    message += ", counts are approximate (raise --capacity for exact counts)"
+  click.echo(message, err=True)
+
+
+@main.command("build-difficulty")
+@click.option(
+    "-l",
+    "--target-length",
+    "lengths",
+    multiple=True,
+    type=int,
+    help="Only score these word lengths. Defaults to all lengths.")
+@click.option(
+    "-p",
+    "--processes",
+    default=1,
+    help="The number of worker processes to score targets in.")
+@click.option(
+    "--wordlist",
+    "word_list_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Score this compiled word list. Defaults to the bundled one.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Where to write the index. Defaults to next to the word list.")
+def build_difficulty(lengths, processes, word_list_path, output):
+  """Scores how hard every target is for the solver, for --difficulty."""
+  from . import difficulty
+  if output is None:
+    output = difficulty.get_index_path(word_list_path)
+  difficulty.build_index(
+      output,
+      lengths=lengths or None,
+      processes=processes,
+      word_list_path=word_list_path)
+  click.echo(output)
+
+
+@main.command("simulate")
+@click.option(
+    "-n",
+    "--games",
+    default=1000,
+    help="The number of games to play per setup.")
+@click.option(
+    "-l",
+    "--target-length",
+    "target_lengths",
+    multiple=True,
+    type=int,
+    help="The number of letters in the target word. May be repeated.")
+@click.option(
+    "-g",
+    "--total-guesses",
+    "total_guesses",
+    multiple=True,
+    type=int,
+    help="The number of guesses per game. May be repeated.")
+@click.option(
+    "--strategy",
+    type=click.Choice(_STRATEGIES),
+    default="random",
+    help="How to pick each guess.")
+@click.option("--hard/--no-hard", default=False, help="Play in hard mode.")
+@click.option("--seed", default=0, help="Seeds the target and guess choices.")
+@click.option(
+    "-p",
+    "--processes",
+    default=1,
+    help="The number of worker processes to play games in.")
+@click.option(
+    "--chunk-size", default=1000, help="The number of games per work unit.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default=None,
+    help="Where to stream per-game results. Use '-' for stdout.")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["jsonl", "columnar"]),
+    default="jsonl",
+    help="One JSON object per game, or one object of columns per chunk.")
+def simulate_games(games, target_lengths, total_guesses, strategy, hard, seed,
+                   processes, chunk_size, output, output_format):
+  """Plays games without a UI and reports how they went."""
+  from . import simulate
+  summary = simulate.SimulationSummary()
+  for target_length, guesses in itertools.product(
+      target_lengths or (5,), total_guesses or (6,)):
+    config = simulate.GameConfig(
+        target_length=target_length, total_guesses=guesses, hard_mode=hard)
+    for chunk in simulate.run_simulation(
+        games,
+        config,
+        strategy=strategy,
+        seed=seed,
+        processes=processes,
+        chunk_size=chunk_size):
+      for result in chunk:
+        summary.add(result)
+      if output is not None:
+        if output_format == "jsonl":
+          simulate.write_jsonl(chunk, output)
+        else:
+          simulate.write_columnar(chunk, output)
+  click.echo(summary.report(), err=True)
+
+
+@main.command("serve")
+@click.option("--host", default="127.0.0.1", help="The TCP host to bind.")
+@click.option("--port", default=7573, help="The TCP port to bind.")
+@click.option(
+    "--unix",
+    "unix_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Listen on this Unix socket instead of TCP.")
+@click.option(
+    "--idle-timeout",
+    default=600.0,
+    help="Seconds before an idle game is dropped.")
+@click.option(
+    "--log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Append every game to this log. See 'tordle stats'.")
+@click.option(
+    "--answers",
+    type=click.File("r"),
+    default=None,
+    help="Only pick targets from this file, one word per line.")
+@click.option(
+    "--cache-size",
+    default=65536,
+    help="How many word lookups and hints to cache. 0 disables the caches.")
+def serve(host, port, unix_path, idle_timeout, log, answers, cache_size):
+  """Hosts games for many players over a JSON-lines socket protocol."""
+  import asyncio
+
+  from . import game_log, server, word_list
+  log_writer = None if log is None else game_log.GameLogWriter(log)
+  words = word_list.WordList(answers=answers)
+  words.set_cache_size(cache_size)
+  game_server = server.GameServer(
+      words, idle_timeout=idle_timeout, log=log_writer)
+
+  async def run():
+    if unix_path is not None:
+      listener = await game_server.start_unix(unix_path)
+      click.echo(f"Listening on {unix_path}", err=True)
+    else:
+      listener = await game_server.start_tcp(host, port)
+      click.echo(f"Listening on {host}:{port}", err=True)
+    try:
+      async with listener:
+        await listener.serve_forever()
+    finally:
+      game_server.close()
+
+  try:
+    asyncio.run(run())
+  except KeyboardInterrupt:
+    pass
+  finally:
+    if log_writer is not None:
+      log_writer.close()
+    for name, lru in [("lookup", words.lookup_cache),
+                      ("hint", words.hint_cache)]:
+      if lru is not None:
+        stats = lru.stats()
+        click.echo(
+            f"{name} cache: {stats.hits} hits, {stats.misses} misses "
+            f"({stats.hit_rate:.1%}), {stats.evictions} evictions",
+            err=True)
+
+
+@main.command("loadtest")
+@click.option("--host", default="127.0.0.1", help="The server's TCP host.")
+@click.option("--port", default=7573, help="The server's TCP port.")
+@click.option(
+    "--unix",
+    "unix_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Connect to this Unix socket instead of TCP.")
+@click.option(
+    "-c",
+    "--connections",
+    default=1000,
+    help="The number of concurrent connections.")
+@click.option(
+    "-n", "--games", default=1, help="The number of games per connection.")
+@click.option(
+    "-l",
+    "--target-length",
+    default=5,
+    help="The number of letters in the target word.")
+@click.option(
+    "-g", "--total-guesses", default=6, help="The number of guesses per game.")
+@click.option("--seed", default=0, help="Seeds the guess choices.")
+def loadtest(host, port, unix_path, connections, games, target_length,
+             total_guesses, seed):
+  """Plays random games against a server and reports guess latency."""
+  import asyncio
+
+  from . import loadgen
+  report = asyncio.run(
+      loadgen.run_load(
+          connections,
+          games,
+          target_length=target_length,
+          total_guesses=total_guesses,
+          host=host,
+          port=port,
+          unix_path=unix_path,
+          seed=seed))
+  click.echo(report.report())
+
+
+@main.command("stats")
+@click.argument("log", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--hardest", default=10, help="The number of hardest words to list.")
+@click.option(
+    "--min-games",
+    default=1,
+    help="Only rank words that were the target this many times.")
+def stats(log, hardest, min_games):
+  """Reports streaks, guess counts and the hardest words of a game log."""
+  from . import game_log
+  click.echo(game_log.get_stats(log).report(hardest, min_games))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""The full-screen game.
+
+Textual and Rich take longer to import than the rest of tordle combined, so
+`tordle` only imports this module once a game is launched.
+"""
+from typing import Optional, TextIO
+
+from textual import app
+
+from . import difficulty, game_log, profiling, session, widgets, word_list
+
+
+class TordleApp(app.App):
+
+  def __init__(self, *args, target_length: int, total_guesses: int,
+               alphabet: bool, hard: bool, evil: bool, log: str, daily: bool,
+               seed: str, answers: Optional[TextIO], boards: int,
+               difficulty_band: Optional[str], **kwargs):
+    super().__init__(*args, **kwargs)
+    assert target_length >= 0
+    assert total_guesses >= 0
+    self._total_guesses = total_guesses
+    self._target_length = target_length
+    self._words = word_list.WordList(answers=answers)
+    self._log = None if log is None else game_log.GameLogWriter(log)
+    index = None
+    if difficulty_band is not None:
+      index = difficulty.load_index(self._words)
+    if boards > 1:
+      if index is not None:
+        targets = index.get_random_words(self._target_length, difficulty_band,
+                                         boards)
+      elif daily:
+        targets = self._words.get_daily_words(self._target_length, boards)
+      elif seed is not None:
+        targets = self._words.get_seeded_words(self._target_length, boards,
+                                               seed)
+      else:
+        targets = self._words.get_random_words(self._target_length, boards)
+      self._session = session.MultiSession(
+          targets=targets,
+          total_guesses=self._total_guesses,
+          words=self._words,
+          hard_mode=hard)
+    elif evil:
+      self._session = session.EvilSession(
+          target_length=self._target_length,
+          total_guesses=self._total_guesses,
+          words=self._words,
+          hard_mode=hard,
+          log=self._log)
+    else:
+      if index is not None:
+        target = index.get_random_word(self._target_length, difficulty_band)
+      elif daily:
+        target = self._words.get_daily_word(self._target_length)
+      elif seed is not None:
+        target = self._words.get_seeded_word(self._target_length, seed)
+      else:
+        target = self._words.get_random_word(self._target_length)
+      self._session = session.Session(
+          target=target,
+          total_guesses=self._total_guesses,
+          words=self._words,
+          hard_mode=hard,
+          log=self._log)
+    self._root_grid = widgets.RootGrid(self._session, show_alphabet=alphabet)
+
+  async def on_mount(self):
+    await self.view.dock(self._root_grid)
+
+  def _get_view_state(self):
+    return (self._session.status, self._session.guess_count,
+            self._root_grid.pending_guess.pending_guess,
+            self._root_grid.error_panel.message,
+            self._root_grid.title_panel.message)
+
+  @profiling.timed
+  def on_key(self, event):
+    view_state = self._get_view_state()
+    self._root_grid.error_panel.message = ""
+    if self._session.status != session.SessionStatus.ACTIVE:
+      if event.key == "escape":
+        exit()
+      return
+    try:
+      if event.key == "enter":
+        self._session.guess(self._root_grid.pending_guess.pending_guess)
+        self._root_grid.pending_guess.clear_guess()
+      elif event.key in {"ctrl+h", "delete"}:
+        self._root_grid.pending_guess.remove_letter()
+      elif event.key == "escape":
+        self._session.give_up()
+      elif len(event.key) == 1:
+        self._root_grid.pending_guess.add_letter(event.key)
+      pending_guess = self._root_grid.pending_guess
+      if not pending_guess.is_possible:
+        self._root_grid.error_panel.message = (
+            f"No word starts with '{pending_guess.pending_guess}'.")
+
+      if self._session.status == session.SessionStatus.VICTORY:
+        self._root_grid.title_panel.set_victory()
+      elif self._session.status == session.SessionStatus.DEFEAT:
+        if isinstance(self._session, session.MultiSession):
+          target = ", ".join(self._session.targets)
+        else:
+          target = self._session.target
+        self._root_grid.title_panel.set_defeat(target)
+      if self._session.status != session.SessionStatus.ACTIVE:
+        self._root_grid.error_panel.message = "Press Esc to Exit."
+    except ValueError as e:
+      self._root_grid.error_panel.message = str(e)
+    finally:
+      # Keys that change nothing, like typing past the end of the guess, skip
+      # the redraw. Otherwise, only widgets whose state changed rebuild.
+      if self._get_view_state() != view_state:
+        self._root_grid.refresh()
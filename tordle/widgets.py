@@ -1,9 +1,9 @@
-from typing import List, Optional
+from typing import Hashable, List, Optional, Tuple, Union
 
 from rich import align, box, layout, panel, table, text
 from textual import app, reactive, widget
 
-from . import check, session, util, word_list
+from . import check, profiling, session, util, word_list
 
 
 def _create_simple_box_table():
@@ -27,11 +27,40 @@ def get_guess_text(letter: str,
   return guess_text
 
 
-class GuessTable(widget.Widget):
+class _CachedWidget(widget.Widget):
+  """A widget that only rebuilds its renderable when its state changes.
+
+  Subclasses return a hashable snapshot of everything they draw from
+  `_get_state`, and build the renderable in `_build`."""
+
+  def __init__(self):
+    super().__init__()
+    self._cached_state = None
+    self._cached_renderable = None
+
+  def _get_state(self) -> Hashable:
+    raise NotImplementedError()
+
+  def _build(self):
+    raise NotImplementedError()
+
+  @profiling.timed
+  def render(self):
+    state = self._get_state()
+    if self._cached_renderable is None or state != self._cached_state:
+      self._cached_renderable = self._build()
+      self._cached_state = state
+    return self._cached_renderable
+
+
+class GuessTable(_CachedWidget):
 
   def __init__(self, sess: session.Session):
     super().__init__()
     self._session = sess
+    # One row of styled letters per completed guess. Past guesses never
+    # change, so rows are only ever appended.
+    self._rows: List[Tuple[text.Text, ...]] = []
 
   @property
   def total_guesses(self) -> int:
@@ -39,47 +68,75 @@ class GuessTable(widget.Widget):
 
   @property
   def target_length(self) -> int:
-    return len(self._session.target)
+    return self._session.target_length
 
   @property
   def guess_history(self) -> List[str]:
     return self._session.guess_history
 
   @property
-  def hint_history(self) -> List[check.HintCategory]:
+  def hint_history(self) -> List[check.Hints]:
     return self._session.hint_history
 
-  def render(self):
+  def _get_state(self) -> Hashable:
+    return self._session.guess_count
+
+  @profiling.timed
+  def _build(self):
+    guess_history = self.guess_history
+    hint_history = self.hint_history
+    for idx in range(len(self._rows), len(hint_history)):
+      guess = guess_history[idx]
+      hint = hint_history[idx]
+      self._rows.append(
+          tuple(get_guess_text(g, h) for g, h in zip(guess, hint)))
     guess_table = _create_simple_box_table()
     for _ in range(self.target_length):
       guess_table.add_column(justify="center", width=1)
+    empty_guess = [" "] * self.target_length
     for idx in range(self.total_guesses):
-      if idx < len(self.guess_history):
-        guess = self.guess_history[idx]
-        hint = self.hint_history[idx]
-        texts = [get_guess_text(g, h) for g, h in zip(guess, hint)]
-        guess_table.add_row(*texts)
+      if idx < len(self._rows):
+        guess_table.add_row(*self._rows[idx])
       else:
-        empty_guess = [" "] * self.target_length
         guess_table.add_row(*empty_guess)
     return align.Align(guess_table, align="center")
 
 
-class PendingGuessPanel(widget.Widget):
+class PendingGuessPanel(_CachedWidget):
   pending_guess = reactive.Reactive("")
 
-  def __init__(self, target_length: int):
+  def __init__(self,
+               target_length: int,
+               words: Optional[word_list.WordList] = None):
     super().__init__()
     assert target_length > 0
     self._target_length = target_length
+    self._words = words
 
-  def render(self):
+  @property
+  def is_possible(self) -> bool:
+    """Whether some word of the target length starts with the pending guess.
+
+    Always true without a word list."""
+    if self._words is None:
+      return True
+    return self._words.get_dawg(self._target_length).has_prefix(
+        self.pending_guess, self._target_length)
+
+  def _get_state(self) -> Hashable:
+    return self.pending_guess
+
+  @profiling.timed
+  def _build(self):
     pending_table = _create_simple_box_table()
     for _ in range(self._target_length):
       pending_table.add_column()
     guess_w_padding = self.pending_guess + " " * (
         self._target_length - len(self.pending_guess))
     texts = [get_guess_text(g, None) for g in guess_w_padding]
+    if not self.is_possible:
+      for t in texts:
+        t.stylize("red")
     pending_table.add_row(*texts)
     grid = table.Table.grid()
     grid.add_row(text.Text("Guess:"))
@@ -104,6 +161,7 @@ class TitlePanel(widget.Widget):
   message = reactive.Reactive("Tordle!")
   style = "bold"
 
+  @profiling.timed
   def render(self):
     return text.Text(self.message, style=self.style)
 
@@ -119,18 +177,25 @@ class TitlePanel(widget.Widget):
 class ErrorPanel(widget.Widget):
   message = reactive.Reactive("")
 
+  @profiling.timed
   def render(self):
     return text.Text(self.message)
 
 
-class HintAlphabet(widget.Widget):
+class HintAlphabet(_CachedWidget):
   _GRID_WIDTH = 13
 
   def __init__(self, sess: session.Session):
     super().__init__()
     self._session = sess
 
-  def render(self):
+  def _get_state(self) -> Hashable:
+    # The alphabet changes when a guess is scored, and a multi-board alphabet
+    # also when the game ends.
+    return self._session.guess_count, self._session.status
+
+  @profiling.timed
+  def _build(self):
     hint_alphabet = sorted(list(self._session.get_hint_alphabet().items()))
     alphabet_table = _create_simple_box_table()
     for _ in range(self._GRID_WIDTH):
@@ -148,27 +213,48 @@ class HintAlphabet(widget.Widget):
 
 
 class RootGrid(widget.Widget):
+  # The most boards shown side by side in a multi-board game.
+  _BOARD_COLUMNS = 4
 
-  def __init__(self, sess: session.Session, show_alphabet: bool):
+  def __init__(self, sess: Union[session.Session, session.MultiSession],
+               show_alphabet: bool):
     super().__init__()
     self._session = sess
-    self.guess_table = GuessTable(sess)
-    self.pending_guess = PendingGuessPanel(len(sess.target))
+    boards = sess.boards if isinstance(sess, session.MultiSession) else [sess]
+    # Each board caches its own table, so a guess only rebuilds the boards it
+    # changed, and a key press rebuilds none of them.
+    self.guess_tables = [GuessTable(board) for board in boards]
+    self.guess_table = self.guess_tables[0]
+    self.pending_guess = PendingGuessPanel(sess.target_length, sess.words)
     self.error_panel = ErrorPanel()
     self.title_panel = TitlePanel()
     self.alphabet = HintAlphabet(sess)
     self._components = [
         self.title_panel,
         self.error_panel,
-        self.guess_table,
+        self._layout_boards(),
         self.pending_guess,
     ]
     if show_alphabet:
       self._components.append(self.alphabet)
-
-  def render(self):
-    grid = table.Table.grid(expand=True)
-    grid.add_column(justify="center")
+    # Rich asks each component for its renderable whenever the grid is drawn,
+    # so the grid itself never needs to be rebuilt.
+    self._grid = table.Table.grid(expand=True)
+    self._grid.add_column(justify="center")
     for c in self._components:
-      grid.add_row(c)
-    return grid
+      self._grid.add_row(c)
+
+  def _layout_boards(self):
+    if len(self.guess_tables) == 1:
+      return self.guess_table
+    columns = min(len(self.guess_tables), self._BOARD_COLUMNS)
+    boards = table.Table.grid(padding=(0, 1))
+    for _ in range(columns):
+      boards.add_column()
+    for start in range(0, len(self.guess_tables), columns):
+      boards.add_row(*self.guess_tables[start:start + columns])
+    return align.Align(boards, align="center")
+
+  @profiling.timed
+  def render(self):
+    return self._grid
@@ -1,51 +1,502 @@
 import bisect
+import datetime
+import hashlib
+import mmap
 import pathlib
 import random
+import struct
 from collections import defaultdict
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
-from . import util
+import numpy as np
+
+from . import cache, dawg, profiling, util
 
 _DEFAULT_WORD_LIST = pathlib.Path(__file__).parent.joinpath("usa_english.txt")
+_DEFAULT_COMPILED_WORD_LIST = _DEFAULT_WORD_LIST.with_suffix(".twl")
+
+# Compiled word lists start with this magic, followed by the header and then
+# one index entry per word length. Each entry points at a block of `count`
+# sorted, fixed-width ASCII records of `length` bytes, and at the bucket's
+# answers in daily order: `daily_count` uint32 word indices. All ints are
+# little endian. Version 1 files have no answers, so every word made of
+# letters is an answer.
+_COMPILED_MAGIC = b"TWL2"
+_COMPILED_MAGIC_V1 = b"TWL1"
+_COMPILED_HEADER = struct.Struct("<4sII")  # magic, num_buckets, total_count
+# length, count, offset, daily_offset, daily_count
+_COMPILED_INDEX_ENTRY = struct.Struct("<IIQQI")
+_COMPILED_INDEX_ENTRY_V1 = struct.Struct("<IIQ")  # length, count, offset
+
+# The daily order of the answers of each length sorts them by the SHA-256 of
+# this salt and the word. It only depends on the words, so every process on
+# every machine agrees on it, and adding a word never reorders the others.
+_DAILY_SALT = b"tordle-daily:"
+# Day 0 of the daily puzzles.
+_DAILY_EPOCH = datetime.date(2022, 1, 1)
+
+# Marks a lookup that is not in the lookup cache, since None means the word is
+# not in the list.
+_NOT_CACHED = object()
 
 
 class WordList:
+  """The words that may be guessed, and the smaller set of possible answers.
+
+  Answers are stored as indices into the sorted guess words of their length,
+  so they take no extra copy of the words. Without a list of `answers`, every
+  word made of letters is an answer.
+
+  Every word also has an integer ID: the words are numbered by length and
+  then in sorted order, so `get_words(length)[i]` has ID
+  `get_id_offset(length) + i`. IDs are the same for any two lists with the
+  same fingerprint."""
+
+  @profiling.timed
+  def __init__(self,
+               words: Optional[Iterable[str]] = None,
+               answers: Optional[Iterable[str]] = None):
+    self._encoded_by_size = {}
+    self._fingerprint = None
+    self._dawgs = {}
+    self._answers_by_size = {}
+    self._custom_answers = False
+    self._daily_orders = {}
+    # Maps lengths to the (offset, count) of their daily order in a compiled
+    # list. Each is only read once it is first used.
+    self._compiled_daily_orders = {}
+    # The sorted lengths and the ID of the first word of each. See `word_id`.
+    self._id_offsets = None
+    # Off until `set_cache_size`.
+    self._lookup_cache = None
+    self._hint_cache = None
+    self._compiled = None
+    if words is None and _DEFAULT_COMPILED_WORD_LIST.is_file():
+      self._load_compiled(_DEFAULT_COMPILED_WORD_LIST)
+    else:
+      if words is None:
+        words = _load_default_word_list()
+      self._count = 0
+      self._words_by_size = defaultdict(list)
+      for word in words:
+        word = util.clean_text(word)
+        self._words_by_size[len(word)].append(word)
+        self._count += 1
+      # Sort each list so we can binary search for words later.
+      for size in self._words_by_size:
+        self._words_by_size[size].sort()
+    if answers is not None:
+      self._set_answers(answers)
+
+  def _set_answers(self, answers: Iterable[str]):
+    indices_by_size = defaultdict(list)
+    for answer in answers:
+      answer = util.clean_text(answer)
+      if not answer:
+        continue
+      idx = self._find(answer)
+      if idx is None:
+        raise ValueError(f"The answer '{answer}' is not in the word list.")
+      indices_by_size[len(answer)].append(idx)
+    self._answers_by_size = {
+        length: np.unique(np.array(indices, dtype=np.uint32))
+        for length, indices in indices_by_size.items()
+    }
+    # Lengths without answers have none, rather than every word.
+    self._custom_answers = True
+    self._daily_orders = {}
+    self._compiled_daily_orders = {}
+
+  @classmethod
+  def from_compiled(cls, path: Union[str, pathlib.Path]) -> "WordList":
+    """Opens a word list written by `compile_word_list`.
 
-  def __init__(self, words: Optional[Iterable[str]] = None):
-    if words is None:
-      words = _load_default_word_list()
-    self._count = 0
-    self._words_by_size = defaultdict(list)
-    for word in words:
-      self._words_by_size[len(word)].append(util.clean_text(word))
-      self._count += 1
-    # Sort each list so we can binary search for words later.
-    for size in self._words_by_size:
-      self._words_by_size[size].sort()
+    The file is memory-mapped and each length bucket is only read once it is
+    first used."""
+    words = cls([])
+    words._load_compiled(pathlib.Path(path))
+    return words
+
+  @profiling.timed
+  def _load_compiled(self, path: pathlib.Path):
+    with open(path, "rb") as word_file:
+      buffer = mmap.mmap(word_file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, num_buckets, count = _COMPILED_HEADER.unpack_from(buffer, 0)
+    if magic == _COMPILED_MAGIC:
+      entry = _COMPILED_INDEX_ENTRY
+    elif magic == _COMPILED_MAGIC_V1:
+      entry = _COMPILED_INDEX_ENTRY_V1
+    else:
+      raise ValueError(f"'{path}' is not a compiled word list.")
+    self._compiled = buffer
+    self._count = count
+    self._compiled_index = {}
+    for i in range(num_buckets):
+      length, bucket_count, offset, *daily = entry.unpack_from(
+          buffer, _COMPILED_HEADER.size + i * entry.size)
+      self._compiled_index[length] = (bucket_count, offset)
+      if daily:
+        self._compiled_daily_orders[length] = tuple(daily)
+    self._words_by_size = {}
 
   def __len__(self):
     return self._count
 
+  def lengths(self) -> List[int]:
+    """Returns the sorted word lengths that have at least one word."""
+    if self._compiled is not None:
+      return sorted(s for s, (c, _) in self._compiled_index.items() if c)
+    return sorted(s for s, words in self._words_by_size.items() if words)
+
+  def get_words(self, length: int) -> Sequence[str]:
+    """Returns the sorted words of the given length."""
+    if length not in self._words_by_size:
+      if self._compiled is None or length not in self._compiled_index:
+        return []
+      count, offset = self._compiled_index[length]
+      self._words_by_size[length] = _CompiledBucket(self._compiled, offset,
+                                                    count, length)
+    return self._words_by_size[length]
+
+  def get_encoded(self, length: int) -> np.ndarray:
+    """Returns the words of `length` as a (num_words, length) uint8 array.
+
+    Rows follow the order of `get_words`. Entries are ASCII codes, so words
+    with non-letters are kept; they simply never match a real letter."""
+    if length not in self._encoded_by_size:
+      words = self.get_words(length)
+      if isinstance(words, _CompiledBucket):
+        encoded = words.encoded()
+      else:
+        encoded = np.frombuffer(
+            "".join(words).encode("ascii", "replace"), dtype=np.uint8)
+      self._encoded_by_size[length] = encoded.reshape(len(words), length)
+    return self._encoded_by_size[length]
+
+  def fingerprint(self) -> str:
+    """Returns a hash that identifies the contents of this word list."""
+    if self._fingerprint is None:
+      digest = hashlib.sha256()
+      for length in self.lengths():
+        for word in self.get_words(length):
+          digest.update(word.encode("utf-8"))
+          digest.update(b"\n")
+      self._fingerprint = digest.hexdigest()
+    return self._fingerprint
+
+  def get_dawg(self, length: Optional[int] = None) -> dawg.Dawg:
+    """Returns a DAWG of the words of `length`, or of every word.
+
+    Each DAWG is built on first use. The one over every word takes about half
+    a second for the default list, while a single length takes milliseconds.
+    """
+    if length not in self._dawgs:
+      lengths = self.lengths() if length is None else [length]
+      self._dawgs[length] = dawg.Dawg(
+          word for l in lengths for word in self.get_words(l))
+    return self._dawgs[length]
+
+  def get_answer_indices(self, length: int) -> np.ndarray:
+    """Returns the sorted indices into `get_words(length)` of the answers."""
+    if length not in self._answers_by_size:
+      if self._custom_answers:
+        return np.zeros(0, dtype=np.uint32)
+      order = self._get_stored_daily_order(length)
+      if order is not None:
+        answers = np.sort(order)
+      else:
+        answers = _get_letter_indices(self.get_words(length))
+      self._answers_by_size[length] = answers
+    return self._answers_by_size[length]
+
+  @property
+  def has_custom_answers(self) -> bool:
+    """Whether the answers were given, rather than all words of letters."""
+    return self._custom_answers
+
+  def is_answer(self, query: str) -> bool:
+    """Whether `query` can be picked as the target."""
+    query = util.clean_text(query)
+    idx = self._find(query)
+    if idx is None:
+      return False
+    answers = self.get_answer_indices(len(query))
+    pos = np.searchsorted(answers, idx)
+    return pos < len(answers) and answers[pos] == idx
+
+  def get_daily_order(self, length: int) -> np.ndarray:
+    """Returns the indices of the answers of `length` in their daily order.
+
+    See `_DAILY_SALT`."""
+    order = self._get_stored_daily_order(length)
+    if order is None:
+      order = _get_daily_order(
+          self.get_words(length), self.get_answer_indices(length))
+      self._daily_orders[length] = order
+    return order
+
+  def _get_stored_daily_order(self, length: int) -> Optional[np.ndarray]:
+    """Returns the daily order of `length` if it has been computed or is in
+    the compiled list."""
+    if (length not in self._daily_orders and
+        length in self._compiled_daily_orders):
+      daily_offset, daily_count = self._compiled_daily_orders[length]
+      self._daily_orders[length] = np.frombuffer(
+          self._compiled, dtype="<u4", count=daily_count, offset=daily_offset)
+    return self._daily_orders.get(length)
+
+  def get_daily_word(self,
+                     length: int,
+                     day: Optional[datetime.date] = None) -> Optional[str]:
+    """Returns the puzzle of `day`, by default today in UTC.
+
+    Consecutive days walk through the daily order, so no answer repeats
+    until every answer has been used. Returns None if there are no answers.
+    """
+    if day is None:
+      day = datetime.datetime.now(datetime.timezone.utc).date()
+    return self._get_daily_word(length, (day - _DAILY_EPOCH).days)
+
+  def get_seeded_word(self, length: int, seed: str) -> Optional[str]:
+    """Returns the answer that `seed` picks, the same one on every machine.
+
+    Returns None if there are no answers."""
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    return self._get_daily_word(length, int.from_bytes(digest[:8], "little"))
+
+  def _get_daily_word(self, length: int, position: int) -> Optional[str]:
+    order = self.get_daily_order(length)
+    if len(order) == 0:
+      return None
+    return self.get_words(length)[order[position % len(order)]]
+
+  def get_daily_words(self,
+                      length: int,
+                      count: int,
+                      day: Optional[datetime.date] = None) -> List[str]:
+    """Returns the `count` distinct puzzles of `day`, for multi-board games.
+
+    Each day takes the next `count` answers of the daily order."""
+    if day is None:
+      day = datetime.datetime.now(datetime.timezone.utc).date()
+    return self._get_daily_words(length, count,
+                                 (day - _DAILY_EPOCH).days * count)
+
+  def get_seeded_words(self, length: int, count: int, seed: str) -> List[str]:
+    """Returns the `count` distinct answers that `seed` picks."""
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    return self._get_daily_words(length, count,
+                                 int.from_bytes(digest[:8], "little"))
+
+  def _get_daily_words(self, length: int, count: int,
+                       position: int) -> List[str]:
+    self._check_answer_count(length, count)
+    return [self._get_daily_word(length, position + i) for i in range(count)]
+
   def get_random_word(self, desired_length: int) -> Optional[str]:
-    """Returns a word from the input list of the desired length.
+    """Returns a random answer of the desired length.
 
-        Returns none if no words of the desired length are available."""
-    if desired_length not in self._words_by_size:
+        Returns none if no answers of the desired length are available."""
+    answers = self.get_answer_indices(desired_length)
+    if len(answers) == 0:
       return None
-    return random.choice(self._words_by_size[desired_length])
+    return self.get_words(desired_length)[random.choice(answers)]
+
+  def get_random_words(self, length: int, count: int) -> List[str]:
+    """Returns `count` distinct random answers of `length`."""
+    self._check_answer_count(length, count)
+    words = self.get_words(length)
+    answers = self.get_answer_indices(length)
+    return [
+        words[answers[i]] for i in random.sample(range(len(answers)), count)
+    ]
 
+  def _check_answer_count(self, length: int, count: int):
+    num_answers = len(self.get_answer_indices(length))
+    if count > num_answers:
+      raise ValueError(f"Expected at most {num_answers} words of length "
+                       f"{length}. Got: {count}")
+
+  @profiling.timed
   def __contains__(self, query: str) -> bool:
-    query = util.clean_text(query)
-    words = self._words_by_size[len(query)]
+    """Whether `query` may be guessed."""
+    return self.word_id(query) is not None
+
+  def set_cache_size(self, maxsize: int):
+    """Caches up to `maxsize` lookups and `maxsize` hints, or none if 0.
+
+    Lookups by `word_id` and `in` are cached here, and `check.get_hints`
+    caches its results in `hint_cache`. Both caches are thread safe, so every
+    game that shares this list shares them too."""
+    if maxsize:
+      self._lookup_cache = cache.LRUCache(maxsize)
+      self._hint_cache = cache.LRUCache(maxsize)
+    else:
+      self._lookup_cache = None
+      self._hint_cache = None
+
+  @property
+  def lookup_cache(self) -> Optional[cache.LRUCache]:
+    return self._lookup_cache
+
+  @property
+  def hint_cache(self) -> Optional[cache.LRUCache]:
+    """Maps a clean (guess, target) to its hints, filled by `check`."""
+    return self._hint_cache
+
+  @profiling.timed
+  def word_id(self, word: str) -> Optional[int]:
+    """Returns the ID of `word`, or None if it may not be guessed."""
+    lookups = self._lookup_cache
+    if lookups is not None:
+      word_id = lookups.get(word, _NOT_CACHED)
+      if word_id is not _NOT_CACHED:
+        return word_id
+    clean = util.clean_text(word)
+    idx = self._find(clean)
+    word_id = None if idx is None else self.get_id_offset(len(clean)) + idx
+    if lookups is not None:
+      lookups.put(word, word_id)
+    return word_id
+
+  def word_from_id(self, word_id: int) -> str:
+    """Returns the word with ID `word_id`."""
+    length, idx = self.split_id(word_id)
+    return self.get_words(length)[idx]
+
+  def get_encoded_word(self, word_id: int) -> np.ndarray:
+    """Returns the row of `get_encoded` for the word with ID `word_id`."""
+    length, idx = self.split_id(word_id)
+    return self.get_encoded(length)[idx]
+
+  def get_id_offset(self, length: int) -> int:
+    """Returns the ID of the first word of `length`."""
+    lengths, offsets = self._get_id_offsets()
+    pos = bisect.bisect_left(lengths, length)
+    if pos == len(lengths) or lengths[pos] != length:
+      raise ValueError(f"There are no words of length {length}.")
+    return offsets[pos]
+
+  def split_id(self, word_id: int) -> Tuple[int, int]:
+    """Returns the length of the word with ID `word_id`, and its index in
+    `get_words(length)`."""
+    lengths, offsets = self._get_id_offsets()
+    if word_id < 0 or word_id >= offsets[-1]:
+      raise ValueError(f"Word ID {word_id} out of range.")
+    pos = bisect.bisect_right(offsets, word_id) - 1
+    return lengths[pos], word_id - offsets[pos]
+
+  def _get_id_offsets(self) -> Tuple[List[int], List[int]]:
+    # `offsets` has one extra entry, the number of IDs. Both are built before
+    # they are stored, so other threads never see them partly filled.
+    if self._id_offsets is None:
+      lengths = self.lengths()
+      offsets = [0]
+      for length in lengths:
+        offsets.append(offsets[-1] + len(self.get_words(length)))
+      self._id_offsets = (lengths, offsets)
+    return self._id_offsets
+
+  def _find(self, word: str) -> Optional[int]:
+    """Returns the index of a cleaned word in `get_words`, if it is there."""
+    words = self.get_words(len(word))
     if not words:
-      return False
-    idx = bisect.bisect_left(words, query)
-    if idx < 0 or idx >= len(words):
-      return False
-    return words[idx] == query
+      return None
+    idx = bisect.bisect_left(words, word)
+    if idx < 0 or idx >= len(words) or words[idx] != word:
+      return None
+    return idx
+
+
+class _CompiledBucket(Sequence[str]):
+  """A read-only view of the fixed-width records of one word length."""
+
+  def __init__(self, buffer: mmap.mmap, offset: int, count: int, length: int):
+    self._buffer = buffer
+    self._offset = offset
+    self._count = count
+    self._length = length
+
+  def __len__(self):
+    return self._count
+
+  def __getitem__(self, idx):
+    if isinstance(idx, slice):
+      return [self[i] for i in range(*idx.indices(self._count))]
+    if idx < 0:
+      idx += self._count
+    if idx < 0 or idx >= self._count:
+      raise IndexError(f"Word index {idx} out of range.")
+    start = self._offset + idx * self._length
+    return self._buffer[start:start + self._length].decode("ascii")
+
+  def encoded(self) -> np.ndarray:
+    """Returns the records as a flat uint8 array, without copying."""
+    return np.frombuffer(
+        self._buffer,
+        dtype=np.uint8,
+        count=self._count * self._length,
+        offset=self._offset)
+
+
+def compile_word_list(words: Iterable[str],
+                      path: Union[str, pathlib.Path],
+                      answers: Optional[Iterable[str]] = None):
+  """Writes `words` in the compiled format read by `WordList.from_compiled`.
+
+  Without `answers`, every word made of letters is an answer."""
+  word_list = WordList(words, answers=answers)
+  lengths = word_list.lengths()
+  offset = (_COMPILED_HEADER.size + len(lengths) * _COMPILED_INDEX_ENTRY.size)
+  index = []
+  blocks = []
+  for length in lengths:
+    bucket = word_list.get_words(length)
+    for word in bucket:
+      if not word.isascii():
+        raise ValueError(
+            f"Compiled word lists only support ASCII. Got: '{word}'")
+    records = "".join(bucket).encode("ascii")
+    # Pad the records so the daily order is aligned for uint32 reads.
+    records += bytes(-len(records) % 4)
+    daily_order = word_list.get_daily_order(length).astype("<u4")
+    index.append(
+        _COMPILED_INDEX_ENTRY.pack(length, len(bucket), offset,
+                                   offset + len(records), len(daily_order)))
+    blocks.append(records)
+    blocks.append(daily_order.tobytes())
+    offset += len(records) + daily_order.nbytes
+  with open(path, "wb") as word_file:
+    word_file.write(
+        _COMPILED_HEADER.pack(_COMPILED_MAGIC, len(lengths), len(word_list)))
+    word_file.writelines(index)
+    word_file.writelines(blocks)
+
+
+def _get_letter_indices(words: Sequence[str]) -> np.ndarray:
+  """Returns the indices of the words made only of letters."""
+  return np.array(
+      [i for i, word in enumerate(words) if word.isascii() and word.isalpha()],
+      dtype=np.uint32)
+
+
+def _get_daily_order(words: Sequence[str], indices: np.ndarray) -> np.ndarray:
+  """Returns `indices`, ordered by the daily key of their words."""
+  order = sorted(indices.tolist(), key=lambda i: _get_daily_key(words[i]))
+  return np.array(order, dtype=np.uint32)
+
+
+def _get_daily_key(word: str) -> bytes:
+  return hashlib.sha256(_DAILY_SALT + word.encode("ascii")).digest()
+
+
+def get_default_compiled_path() -> pathlib.Path:
+  """Returns the path of the bundled compiled word list."""
+  return _DEFAULT_COMPILED_WORD_LIST
 
 
 def _load_default_word_list():
   assert _DEFAULT_WORD_LIST.is_file()
   with open(_DEFAULT_WORD_LIST) as word_file:
-    return [util.clean_text(l) for l in word_file]
+    # WordList cleans each word, so there is no need to do it here.
+    return word_file.readlines()